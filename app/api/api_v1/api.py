@@ -1,12 +1,22 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import comments, friendships, likes, login, messages, posts, users
+from app.api.endpoints import badges, batch, blocks, comments, feed, friendships, likes, login, mentions, messages, metrics, notifications, posts, presence, realtime, trending, users
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(posts.router, prefix="/posts", tags=["posts"])
+api_router.include_router(feed.router, prefix="/feed", tags=["feed"])
+api_router.include_router(trending.router, prefix="/trending", tags=["trending"])
 api_router.include_router(comments.router, prefix="/comments", tags=["comments"])
 api_router.include_router(likes.router, prefix="/likes", tags=["likes"])
 api_router.include_router(friendships.router, prefix="/friendships", tags=["friendships"])
-api_router.include_router(messages.router, prefix="/messages", tags=["messages"])
\ No newline at end of file
+api_router.include_router(blocks.router, prefix="/blocks", tags=["blocks"])
+api_router.include_router(messages.router, prefix="/messages", tags=["messages"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
+api_router.include_router(badges.router, prefix="/badges", tags=["badges"])
+api_router.include_router(realtime.router, tags=["realtime"])
+api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
+api_router.include_router(mentions.router, prefix="/mentions", tags=["mentions"])
+api_router.include_router(presence.router, prefix="/presence", tags=["presence"])
\ No newline at end of file
@@ -0,0 +1,106 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.db.tarantool.response_cache import (
+    CachedResponse,
+    comment_key,
+    post_comments_keys,
+    post_key,
+    response_cache,
+    user_key,
+)
+from app.models.comment import Comment
+from app.models.post import Post
+
+# Keys dropped per Tarantool call when a profile changes
+INVALIDATE_BATCH_SIZE = 1000
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Serialise content exactly like FastAPI does for a JSON response.
+    """
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def cached_response(request: Request, entry: CachedResponse) -> Response:
+    """
+    Build a response from a cache entry, answering conditional requests.
+    """
+    headers = {"ETag": entry.etag}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cache_response(
+    request: Request,
+    key: str,
+    content: Any,
+    meta: Optional[Dict[str, Any]] = None,
+    generation: Optional[int] = None,
+) -> Response:
+    """
+    Render content, store it in the response cache and return it.
+    
+    ``generation`` comes from the lookup that missed, before the content
+    was loaded; the body is not stored if the key was invalidated since.
+    """
+    entry = response_cache.set(key, render_json(content), meta, generation)
+    return cached_response(request, entry)
+
+
+def multi_get_response(
+    ids: List[int],
+    key: Callable[[int], str],
+    load: Callable[[List[int]], Dict[int, Tuple[Any, Dict[str, Any]]]],
+) -> Response:
+    """
+    Resolve a list of ids through the response cache.
+
+    Only ids missing from the cache are passed to ``load``, which must
+    fetch them in one go and return ``{id: (content, meta)}``; the meta is
+    stored with the body like in ``cache_response``, so single reads can
+    use the entries too. The JSON array is assembled from the cached
+    bodies in request order; unknown ids are left out.
+    """
+    ids = list(dict.fromkeys(ids))
+    keys = {id_: key(id_) for id_ in ids}
+    cached, generations = response_cache.lookup(keys.values())
+    bodies = {id_: cached[keys[id_]].body for id_ in ids if keys[id_] in cached}
+    
+    missing = [id_ for id_ in ids if id_ not in bodies]
+    if missing:
+        loaded = load(missing)
+        rendered = {id_: render_json(content) for id_, (content, _) in loaded.items()}
+        response_cache.set_many(
+            {keys[id_]: body for id_, body in rendered.items()},
+            {keys[id_]: meta for id_, (_, meta) in loaded.items()},
+            generations,
+        )
+        bodies.update(rendered)
+    
+    content = b"[" + b",".join(bodies[id_] for id_ in ids if id_ in bodies) + b"]"
+    return Response(content=content, media_type="application/json")
+
+
+def invalidate_user_profile(db: Session, user_id: int) -> None:
+    """
+    Drop the cached bodies that embed the public profile of a user: the
+    profile, their posts, their comments and the first comment pages of
+    the posts they commented on.
+    """
+    keys = [user_key(user_id)]
+    keys.extend(post_key(post_id) for (post_id,) in db.query(Post.id).filter(Post.user_id == user_id))
+    commented_post_ids = set()
+    for comment_id, post_id in db.query(Comment.id, Comment.post_id).filter(Comment.user_id == user_id):
+        keys.append(comment_key(comment_id))
+        commented_post_ids.add(post_id)
+    for post_id in commented_post_ids:
+        keys.extend(post_comments_keys(post_id))
+    for start in range(0, len(keys), INVALIDATE_BATCH_SIZE):
+        response_cache.invalidate(*keys[start:start + INVALIDATE_BATCH_SIZE])
@@ -1,6 +1,6 @@
 from typing import Generator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -18,10 +18,15 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-def get_db() -> Generator:
+def get_db(request: Request) -> Generator:
     """
     Dependency for getting the database session.
     """
+    # Sub-requests of POST /batch reuse the session of the batch
+    batch_db = getattr(request.state, "db", None)
+    if batch_db is not None:
+        yield batch_db
+        return
     try:
         db = SessionLocal()
         yield db
@@ -41,22 +46,70 @@ def get_tarantool() -> Generator:
 
 
 def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2),
 ) -> User:
     """
     Dependency for getting the current authenticated user.
     """
+    # Sub-requests of POST /batch are already authenticated, each loads
+    # the user into its own session
+    batch_user_id = getattr(request.state, "user_id", None)
+    if batch_user_id is not None:
+        return get_active_user(db, batch_user_id)
+    return get_user_from_token(db, token)
+
+
+def get_current_user_id(
+    request: Request,
+    token: str = Depends(reusable_oauth2),
+) -> int:
+    """
+    Dependency for getting the current user id from the token alone,
+    without a database query; for cheap, frequent requests.
+    """
+    batch_user_id = getattr(request.state, "user_id", None)
+    if batch_user_id is not None:
+        return batch_user_id
+    token_data = decode_token(token)
+    if token_data.sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    return token_data.sub
+
+
+def decode_token(token: str) -> TokenPayload:
+    """
+    Validate an access token and return its payload.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
+
+
+def get_user_from_token(db: Session, token: str) -> User:
+    """
+    Resolve an access token to an active user.
+    """
+    token_data = decode_token(token)
+    return get_active_user(db, token_data.sub)
+
+
+def get_active_user(db: Session, user_id: int) -> User:
+    """
+    Load an authenticated user, who must still exist and be active.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -0,0 +1,27 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user, get_db
+from app.db.tarantool import badges
+from app.models.user import User
+from app.schemas.badge import Badges
+
+router = APIRouter()
+
+
+@router.get("/", response_model=Badges)
+def read_badges(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get all badge counters of the current user.
+    """
+    counters = badges.get_badges(current_user.id)
+    if counters is None:
+        # Tarantool is unavailable, count in Postgres instead
+        counters = badges.count_badges(db, [current_user.id]).get(current_user.id, {})
+    return Badges(**counters)
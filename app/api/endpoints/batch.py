@@ -0,0 +1,148 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user, get_db
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.batch import (
+    BatchRequest,
+    BatchRequestItem,
+    BatchResponse,
+    BatchResponseItem,
+)
+
+router = APIRouter()
+
+# Response headers that make no sense inside a batch item
+SKIPPED_HEADERS = {"content-length", "transfer-encoding", "connection"}
+
+# Paths that cannot be part of a batch: nested batches, and streams that
+# never finish and have no JSON body
+UNBATCHABLE_PATHS = {
+    "/batch": "Batch requests cannot be nested",
+    "/events": "Streaming endpoints cannot be batched",
+    "/ws": "Streaming endpoints cannot be batched",
+}
+
+
+async def dispatch(
+    request: Request, item: BatchRequestItem, state: Dict[str, Any]
+) -> BatchResponseItem:
+    """
+    Run one sub-request through the application in-process.
+    """
+    path, _, query_string = item.path.partition("?")
+    body = b"" if item.body is None else json.dumps(item.body).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+
+    full_path = settings.API_V1_STR + path
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": item.method.upper(),
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": full_path,
+        "raw_path": full_path.encode(),
+        "query_string": query_string.encode(),
+        "headers": headers,
+        "state": state,
+    }
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status_code = 500
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for key, value in message.get("headers", []):
+                if key.decode().lower() not in SKIPPED_HEADERS:
+                    response_headers[key.decode()] = value.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The error middleware has already sent a 500 response
+        pass
+
+    raw = b"".join(chunks)
+    if response_headers.get("content-type", "").startswith("application/json") and raw:
+        response_body = json.loads(raw)
+    else:
+        response_body = raw.decode() or None
+
+    return BatchResponseItem(
+        id=item.id, status=status_code, headers=response_headers, body=response_body
+    )
+
+
+@router.post("/", response_model=BatchResponse)
+async def batch(
+    *,
+    request: Request,
+    batch_in: BatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Execute several API calls in one round trip.
+
+    Sub-requests are authenticated once and load the batch user by id
+    into the session they run with. Writes run in request order on the
+    batch database session; runs of consecutive GET requests between them
+    are executed concurrently, each with its own session because a
+    session cannot be used by several threads at once.
+    """
+    items = batch_in.requests
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_REQUESTS} requests can be batched",
+        )
+    for item in items:
+        detail = UNBATCHABLE_PATHS.get(item.path.split("?")[0].rstrip("/"))
+        if detail:
+            raise HTTPException(status_code=400, detail=detail)
+
+    # Only the id is passed on: the instance belongs to the batch session
+    user_id = current_user.id
+    responses: List[BatchResponseItem] = []
+    reads: List[BatchRequestItem] = []
+
+    async def flush_reads() -> None:
+        if reads:
+            results = await asyncio.gather(
+                *[dispatch(request, item, {"user_id": user_id}) for item in reads]
+            )
+            responses.extend(results)
+            reads.clear()
+
+    for item in items:
+        if item.method.upper() == "GET":
+            reads.append(item)
+            continue
+        await flush_reads()
+        responses.append(await dispatch(request, item, {"db": db, "user_id": user_id}))
+    await flush_reads()
+
+    return BatchResponse(responses=responses)
@@ -0,0 +1,104 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.dependencies import get_current_user, get_db
+from app.api.endpoints.friendships import friendship_removed, publish_friendship_changed
+from app.db.tarantool import block_lists
+from app.models.block import Block
+from app.models.friendship import Friendship, FriendshipStatus
+from app.models.user import User
+from app.schemas.block import Block as BlockSchema, BlockCreate
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[BlockSchema])
+def read_blocks(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Retrieve the users blocked by the current user.
+    """
+    return db.query(Block).filter(
+        Block.blocker_id == current_user.id
+    ).options(selectinload(Block.blocked)).order_by(Block.created_at.desc()).all()
+
+
+@router.post("/", response_model=BlockSchema)
+def block_user(
+    *,
+    db: Session = Depends(get_db),
+    block_in: BlockCreate,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Block a user.
+    
+    Both users stop seeing each other's posts, and a friendship or pending
+    request between them is removed.
+    """
+    if block_in.user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot block yourself")
+    
+    user = db.query(User).filter(User.id == block_in.user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    existing_block = db.query(Block).filter(
+        Block.blocker_id == current_user.id,
+        Block.blocked_id == block_in.user_id
+    ).first()
+    if existing_block:
+        raise HTTPException(status_code=400, detail="User is already blocked")
+    
+    user_low_id, user_high_id = Friendship.pair(current_user.id, block_in.user_id)
+    friendship = db.query(Friendship).filter(
+        Friendship.user_low_id == user_low_id,
+        Friendship.user_high_id == user_high_id
+    ).first()
+    if friendship:
+        was_accepted = friendship.status == FriendshipStatus.ACCEPTED
+        pending_for = friendship.recipient_id if friendship.status == FriendshipStatus.PENDING else None
+        if was_accepted:
+            publish_friendship_changed(db, user_low_id, user_high_id, False)
+        db.delete(friendship)
+    
+    block = Block(blocker_id=current_user.id, blocked_id=block_in.user_id)
+    db.add(block)
+    db.commit()
+    db.refresh(block)
+    
+    block_lists.invalidate([current_user.id, block_in.user_id])
+    if friendship:
+        friendship_removed((user_low_id, user_high_id), was_accepted, pending_for)
+    
+    return block
+
+
+@router.delete("/{user_id}", response_model=BlockSchema)
+def unblock_user(
+    *,
+    db: Session = Depends(get_db),
+    user_id: int,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Unblock a user blocked by the current user.
+    """
+    block = db.query(Block).filter(
+        Block.blocker_id == current_user.id,
+        Block.blocked_id == user_id
+    ).first()
+    if not block:
+        raise HTTPException(status_code=404, detail="Block not found")
+    
+    response = BlockSchema.from_orm(block)
+    db.delete(block)
+    db.commit()
+    block_lists.invalidate([current_user.id, user_id])
+    
+    return response
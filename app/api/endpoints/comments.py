@@ -1,58 +1,195 @@
-from typing import Any, List
+import json
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, joinedload
 
+from app.api.caching import multi_get_response, render_json
 from app.api.dependencies import get_current_user, get_db
-from app.models.comment import Comment
+from app.api.endpoints.likes import liked_comment_ids
+from app.core import events
+from app.core.config import settings
+from app.core.mentions import notify_mentions, record_mentions
+from app.core.notifications import notification_buffer
+from app.core.visibility import can_view_post, visible_posts
+from app.db.tarantool.response_cache import (
+    CachedResponse,
+    comment_key,
+    make_etag,
+    post_comments_key,
+    response_cache,
+)
+from app.models.comment import MAX_COMMENT_DEPTH, PATH_END, Comment, comment_path, path_ids
 from app.models.like import Like
-from app.models.post import Post
+from app.models.notification import NotificationKind
+from app.models.post import Post, PostVisibility
 from app.models.user import User
 from app.schemas.comment import Comment as CommentSchema, CommentCreate, CommentUpdate
 
 router = APIRouter()
 
 
+def load_comments(db: Session, comment_ids: List[int]) -> Dict[int, CommentSchema]:
+    """
+    Load comments with their authors and like counts using a fixed number of queries.
+    """
+    comments = (
+        db.query(Comment)
+        .options(joinedload(Comment.user))
+        .filter(Comment.id.in_(comment_ids))
+        .all()
+    )
+    like_counts = dict(
+        db.query(Like.comment_id, func.count(Like.id))
+        .filter(Like.comment_id.in_([comment.id for comment in comments]), Like.post_id == None)
+        .group_by(Like.comment_id)
+        .all()
+    ) if comments else {}
+    
+    result = {}
+    for comment in comments:
+        comment_dict = CommentSchema.from_orm(comment).dict()
+        comment_dict["like_count"] = like_counts.get(comment.id, 0)
+        result[comment.id] = CommentSchema(**comment_dict)
+    return result
+
+
+def like_counts_query(db: Session):
+    """
+    Comments with their like counts, for thread queries.
+    """
+    return (
+        db.query(Comment, func.count(Like.id).label("like_count"))
+        .outerjoin(Like, (Like.comment_id == Comment.id) & (Like.post_id == None))
+    )
+
+
+def to_schemas(rows) -> List[CommentSchema]:
+    result = []
+    for comment, like_count in rows:
+        comment_dict = CommentSchema.from_orm(comment).dict()
+        comment_dict["like_count"] = like_count
+        result.append(CommentSchema(**comment_dict))
+    return result
+
+
+def with_liked_flags(
+    request: Request, db: Session, user: User, entry: CachedResponse
+) -> Response:
+    """
+    Add the per-user liked_by_me flags to a cached page of comments.
+    """
+    comments = json.loads(entry.body)
+    liked = liked_comment_ids(db, user.id, [comment["id"] for comment in comments])
+    for comment in comments:
+        comment["liked_by_me"] = comment["id"] in liked
+    
+    # The shared page ETag is combined with the user's likes on it
+    etag = make_etag(entry.etag.encode() + repr(sorted(liked)).encode())
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=comments, headers={"ETag": etag})
+
+
+@router.get("/", response_model=List[CommentSchema])
+def read_comments(
+    *,
+    db: Session = Depends(get_db),
+    ids: List[int] = Query(...),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get comments by IDs, in request order. Unknown ids are skipped.
+    """
+    if len(ids) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MULTI_GET_MAX_IDS} ids can be requested at once",
+        )
+    # Cached bodies are shared by all users, check visibility of the posts first
+    visible = {
+        comment_id for (comment_id,) in db.query(Comment.id).join(Post, Post.id == Comment.post_id).filter(
+            Comment.id.in_(ids), visible_posts(db, current_user.id)
+        )
+    }
+    ids = [comment_id for comment_id in ids if comment_id in visible]
+    return multi_get_response(ids, comment_key, lambda missing: {
+        comment_id: (comment, {}) for comment_id, comment in load_comments(db, missing).items()
+    })
+
+
 @router.get("/post/{post_id}", response_model=List[CommentSchema])
 def read_comments_by_post(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     post_id: int,
     skip: int = 0,
     limit: int = 100,
+    max_depth: Optional[int] = Query(None, ge=0),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Get all comments for a post.
+    Get the comment threads of a post, newest first.
+    
+    ``skip`` and ``limit`` count top-level comments. Each is followed by its
+    replies in thread order, down to ``max_depth`` levels when given; use
+    ``parent_id`` and ``depth`` to nest them.
     """
+    # The first page is served from the response cache; the entry carries
+    # the author and visibility of the post for the access check
+    cache_key = generation = None
+    if skip == 0 and max_depth is None and limit in settings.RESPONSE_CACHE_COMMENT_PAGE_SIZES:
+        cache_key = post_comments_key(post_id, limit)
+        cached, generation = response_cache.get_with_generation(cache_key)
+        if cached is not None and "user_id" in cached.meta:
+            if not can_view_post(
+                db, current_user.id, cached.meta["user_id"], PostVisibility(cached.meta["visibility"])
+            ):
+                raise HTTPException(status_code=404, detail="Post not found")
+            return with_liked_flags(request, db, current_user, cached)
+    
     # Check if post exists
     post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+    if not post or not can_view_post(db, current_user.id, post.user_id, post.visibility):
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Get comments with like count
-    comments = (
-        db.query(
-            Comment,
-            func.count(Like.id).label("like_count")
-        )
-        .outerjoin(Like, (Like.comment_id == Comment.id) & (Like.post_id == None))
-        .filter(Comment.post_id == post_id)
-        .group_by(Comment.id)
-        .order_by(Comment.created_at.desc())
+    # The page of top-level comments, then the whole thread of each with
+    # like counts in the same query: a thread is one range of the
+    # (post_id, path) index
+    roots = (
+        db.query(Comment.id, Comment.path, Comment.created_at)
+        .filter(Comment.post_id == post_id, Comment.parent_id == None)
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
         .offset(skip)
         .limit(limit)
+        .subquery()
+    )
+    query = like_counts_query(db).join(roots, and_(
+        Comment.post_id == post_id,
+        Comment.path >= roots.c.path,
+        Comment.path < roots.c.path + PATH_END,
+    ))
+    if max_depth is not None:
+        query = query.filter(Comment.depth <= max_depth)
+    result = to_schemas(
+        query.group_by(Comment.id, roots.c.created_at, roots.c.id)
+        .order_by(roots.c.created_at.desc(), roots.c.id.desc(), Comment.path)
         .all()
     )
     
-    # Convert to schema format
-    result = []
-    for comment, like_count in comments:
-        comment_dict = CommentSchema.from_orm(comment).dict()
-        comment_dict["like_count"] = like_count
-        result.append(CommentSchema(**comment_dict))
+    if cache_key is not None:
+        entry = response_cache.set(
+            cache_key, render_json(result), {"user_id": post.user_id, "visibility": post.visibility.value},
+            generation
+        )
+        return with_liked_flags(request, db, current_user, entry)
     
+    liked = liked_comment_ids(db, current_user.id, [comment.id for comment in result])
+    for comment in result:
+        comment.liked_by_me = comment.id in liked
     return result
 
 
@@ -68,17 +205,42 @@ def create_comment(
     """
     # Check if post exists
     post = db.query(Post).filter(Post.id == comment_in.post_id).first()
-    if not post:
+    if not post or not can_view_post(db, current_user.id, post.user_id, post.visibility):
         raise HTTPException(status_code=404, detail="Post not found")
     
+    parent = None
+    if comment_in.parent_id is not None:
+        parent = db.query(Comment).filter(Comment.id == comment_in.parent_id).first()
+        if not parent or parent.post_id != post.id:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+        if parent.depth >= MAX_COMMENT_DEPTH:
+            raise HTTPException(status_code=400, detail="Comment thread is too deep")
+    
     comment = Comment(
         user_id=current_user.id,
         post_id=comment_in.post_id,
+        parent_id=comment_in.parent_id,
+        depth=parent.depth + 1 if parent else 0,
         content=comment_in.content,
     )
     db.add(comment)
+    db.flush()
+    # The path needs the id of the new comment
+    comment.path = comment_path(parent.path if parent else None, comment.id)
+    ancestor_ids = path_ids(comment.path)[:-1]
+    if ancestor_ids:
+        db.query(Comment).filter(Comment.id.in_(ancestor_ids)).update(
+            {Comment.reply_count: Comment.reply_count + 1}, synchronize_session=False
+        )
+    if post.user_id != current_user.id:
+        events.publish(db, "comment.created", CommentSchema.from_orm(comment), [post.user_id])
+    mentioned = record_mentions(db, current_user.id, post, comment.content, comment)
     db.commit()
     db.refresh(comment)
+    notify_mentions(mentioned)
+    response_cache.invalidate_post(comment.post_id)
+    response_cache.invalidate(*[comment_key(ancestor_id) for ancestor_id in ancestor_ids])
+    notification_buffer.add(post.user_id, NotificationKind.POST_COMMENT, post.id, current_user.id)
     
     # Add user information for response
     comment_dict = CommentSchema.from_orm(comment).dict()
@@ -112,12 +274,51 @@ def read_comment(
         raise HTTPException(status_code=404, detail="Comment not found")
     
     comment_obj, like_count = comment
+    if not can_view_post(db, current_user.id, comment_obj.post.user_id, comment_obj.post.visibility):
+        raise HTTPException(status_code=404, detail="Comment not found")
     comment_dict = CommentSchema.from_orm(comment_obj).dict()
     comment_dict["like_count"] = like_count
     
     return CommentSchema(**comment_dict)
 
 
+@router.get("/{comment_id}/replies", response_model=List[CommentSchema])
+def read_comment_replies(
+    *,
+    db: Session = Depends(get_db),
+    comment_id: int,
+    max_depth: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the replies below a comment in thread order, for expanding a
+    collapsed thread; ``max_depth`` counts levels below the comment.
+    """
+    comment = (
+        db.query(Comment)
+        .options(joinedload(Comment.post))
+        .filter(Comment.id == comment_id)
+        .first()
+    )
+    if not comment or not can_view_post(db, current_user.id, comment.post.user_id, comment.post.visibility):
+        raise HTTPException(status_code=404, detail="Comment not found")
+    
+    # The subtree is one range of the (post_id, path) index
+    query = like_counts_query(db).filter(
+        Comment.post_id == comment.post_id,
+        Comment.path > comment.path,
+        Comment.path < comment.path + PATH_END,
+    )
+    if max_depth is not None:
+        query = query.filter(Comment.depth <= comment.depth + max_depth)
+    result = to_schemas(query.group_by(Comment.id).order_by(Comment.path).all())
+    
+    liked = liked_comment_ids(db, current_user.id, [reply.id for reply in result])
+    for reply in result:
+        reply.liked_by_me = reply.id in liked
+    return result
+
+
 @router.put("/{comment_id}", response_model=CommentSchema)
 def update_comment(
     *,
@@ -142,6 +343,8 @@ def update_comment(
     db.add(comment)
     db.commit()
     db.refresh(comment)
+    response_cache.invalidate_post(comment.post_id)
+    response_cache.invalidate(comment_key(comment.id))
     
     # Get like count for response
     like_count = (
@@ -172,11 +375,29 @@ def delete_comment(
     if comment.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db.delete(comment)
-    db.commit()
+    # The comment and its replies at any depth are one range of the
+    # (post_id, path) index, deleted with their likes in two statements
+    post_id = comment.post_id
+    subtree = db.query(Comment).filter(
+        Comment.post_id == post_id,
+        Comment.path >= comment.path,
+        Comment.path < comment.path + PATH_END,
+    )
+    subtree_ids = [reply_id for (reply_id,) in subtree.with_entities(Comment.id)]
+    ancestor_ids = path_ids(comment.path)[:-1]
+    if ancestor_ids:
+        db.query(Comment).filter(Comment.id.in_(ancestor_ids)).update(
+            {Comment.reply_count: Comment.reply_count - len(subtree_ids)}, synchronize_session=False
+        )
     
     # For response format
     comment_dict = CommentSchema.from_orm(comment).dict()
     comment_dict["like_count"] = 0
     
+    db.query(Like).filter(Like.comment_id.in_(subtree_ids)).delete(synchronize_session=False)
+    subtree.delete(synchronize_session=False)
+    db.commit()
+    response_cache.invalidate_post(post_id)
+    response_cache.invalidate(*[comment_key(id) for id in subtree_ids + ancestor_ids])
+    
     return CommentSchema(**comment_dict)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user, get_current_user_id, get_db
+from app.api.endpoints.likes import liked_post_ids
+from app.api.endpoints.posts import load_posts, post_counts
+from app.core.config import settings
+from app.core.mutual_friends import load_friend_ids
+from app.core.ranking import rank, score_candidates
+from app.core.visibility import hidden_user_ids, visible_feed_entries, visible_posts
+from app.db.tarantool import feed_affinity, news_feed, seen_posts
+from app.db.tarantool.news_feed import FeedEntry
+from app.models.friendship import friend_edges
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.post import FeedPage, FeedSeen
+
+router = APIRouter()
+
+# Tarantool pages read per request when most entries are filtered out
+FEED_MAX_SCANS = 5
+
+
+def decode_feed_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        created_at, post_id = cursor.split(",")
+        return int(created_at), int(post_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def read_feed_entries(
+    db: Session, user_id: int, before_ts: int, before_id: int, limit: int, skip_seen: List[Sequence[int]]
+) -> Optional[Tuple[List[FeedEntry], Optional[str]]]:
+    """
+    Visible entries of a feed page from Tarantool and the cursor of the
+    next page, or None if Tarantool is unavailable. Posts in the
+    ``skip_seen`` filters are left out.
+    """
+    hidden = hidden_user_ids(db, user_id)
+    friend_ids = load_friend_ids(db, [user_id])[user_id]
+    entries = []
+    for _ in range(FEED_MAX_SCANS):
+        page = news_feed.get_page(user_id, before_ts, before_id, limit + 1)
+        if page is None:
+            return None
+        visible = visible_feed_entries(page, user_id, hidden, friend_ids)
+        if skip_seen:
+            visible = [entry for entry in visible if not seen_posts.is_seen(skip_seen, entry.post_id)]
+        entries.extend(visible)
+        if len(entries) > limit or len(page) <= limit:
+            if len(entries) > limit:
+                return entries[:limit], f"{entries[limit - 1].created_at},{entries[limit - 1].post_id}"
+            return entries, None
+        before_ts, before_id = page[-1].created_at, page[-1].post_id
+    # Feed not exhausted but mostly filtered: return what was found and
+    # continue after the last scanned entry
+    return entries, f"{before_ts},{before_id}"
+
+
+def rank_entries(db: Session, user_id: int, entries: List[FeedEntry], seen: List[Sequence[int]]) -> List[FeedEntry]:
+    """
+    Feed entries by descending score of affinity, engagement and recency.
+    """
+    if not entries:
+        return entries
+    counts = post_counts(db, [entry.post_id for entry in entries])
+    affinity_author_ids, affinity = feed_affinity.get(user_id)
+    scores = score_candidates(
+        author_ids=np.array([entry.author_id for entry in entries]),
+        ages=time.time() - np.array([entry.created_at for entry in entries], dtype=np.float64),
+        likes=np.array([counts[entry.post_id][0] for entry in entries], dtype=np.float64),
+        comments=np.array([counts[entry.post_id][1] for entry in entries], dtype=np.float64),
+        seen=np.array([seen_posts.is_seen(seen, entry.post_id) for entry in entries], dtype=bool),
+        affinity_author_ids=np.array(affinity_author_ids, dtype=np.int64),
+        affinity=np.array(affinity, dtype=np.float64),
+    )
+    return [entries[i] for i in rank(scores)]
+
+
+@router.get("/", response_model=FeedPage)
+def read_feed(
+    *,
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_seen: bool = False,
+    ranked: bool = False,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    News feed of the current user: posts of friends and own posts, newest first.
+    
+    Served from the per-user feeds in Tarantool that posts are fanned out
+    to on creation, dropping posts the user can no longer see. Posts
+    reported with ``POST /feed/seen`` are skipped, or with ``include_seen``
+    shown after the new posts of each page. Without Tarantool the feed is
+    read from PostgreSQL. Pages are continued with ``next_cursor`` of the
+    previous one.
+    
+    With ``ranked`` the newest FEED_RANK_CANDIDATES posts are scored by
+    affinity to the author, engagement and recency, and the best ``limit``
+    are returned. Ranked pages have no cursor: clients report the posts
+    shown as seen and request the feed again.
+    """
+    if ranked and cursor:
+        raise HTTPException(status_code=400, detail="Ranked feed pages have no cursor")
+    before_ts, before_id = decode_feed_cursor(cursor) if cursor else (0, 0)
+    seen = seen_posts.get(current_user.id)
+    skip_seen = [] if include_seen else seen
+    result = read_feed_entries(
+        db, current_user.id, before_ts, before_id,
+        settings.FEED_RANK_CANDIDATES if ranked else limit, skip_seen
+    )
+    if result is not None:
+        entries, next_cursor = result
+        if ranked:
+            # Seen posts were skipped unless include_seen, then they are down-ranked
+            entries, next_cursor = rank_entries(db, current_user.id, entries, seen if include_seen else [])[:limit], None
+        elif include_seen and seen:
+            # Stable sort: unseen posts first, each group still newest first
+            entries.sort(key=lambda entry: seen_posts.is_seen(seen, entry.post_id))
+        post_ids = [entry.post_id for entry in entries]
+    else:
+        edges = friend_edges()
+        friends = select(edges.c.friend_id).where(edges.c.user_id == current_user.id)
+        query = db.query(Post.id, Post.created_at).filter(
+            or_(Post.user_id == current_user.id, Post.user_id.in_(friends)),
+            visible_posts(db, current_user.id),
+        )
+        if before_id:
+            query = query.filter(Post.id < before_id)
+        rows = query.order_by(Post.id.desc()).limit(limit + 1).all()
+        post_ids = [post_id for post_id, _ in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and not ranked:
+            next_cursor = f"{int(rows[limit - 1].created_at.timestamp())},{rows[limit - 1].id}"
+    
+    posts = load_posts(db, post_ids)
+    liked = liked_post_ids(db, current_user.id, post_ids)
+    items = [posts[post_id] for post_id in post_ids if post_id in posts]
+    for post in items:
+        post.liked_by_me = post.id in liked
+    return FeedPage(items=items, next_cursor=next_cursor)
+
+
+@router.post("/seen", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
+def mark_seen(
+    *,
+    seen_in: FeedSeen,
+    current_user_id: int = Depends(get_current_user_id),
+) -> Response:
+    """
+    Record feed posts the current user has scrolled past.
+    
+    Only the token is checked, no database query is made. Posts are added
+    to a per-user Bloom filter in Tarantool and left out of later feed
+    pages for one to two FEED_SEEN_ROTATION_SECONDS periods.
+    """
+    if len(seen_in.post_ids) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MULTI_GET_MAX_IDS} ids can be recorded at once",
+        )
+    seen_posts.add(current_user_id, seen_in.post_ids)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,22 +1,87 @@
-from typing import Any, List
+import time
+from typing import Any, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, selectinload
 
-from app.api.dependencies import get_current_user, get_db
-from app.models.friendship import Friendship, FriendshipStatus
+from app.api.dependencies import get_current_user, get_current_user_id, get_db
+from app.core import events
+from app.core.config import settings
+from app.core.graph import FRIENDSHIP_CHANGED
+from app.core.mutual_friends import mutual_friend_ids
+from app.core.notifications import notification_buffer
+from app.core.suggestions import mutual_friend_counts, suggestion_updater
+from app.core.visibility import hidden_user_ids, is_blocked
+from app.db.tarantool import badges, friend_suggestions, presence
+from app.db.tarantool import friend_ids as friend_ids_cache
+from app.models.friendship import Friendship, FriendshipStatus, friend_edges
+from app.models.notification import NotificationKind
 from app.models.user import User
 from app.schemas.friendship import (
     Friendship as FriendshipSchema,
     FriendshipCreate,
     FriendshipUpdate,
-    FriendRequest
+    FriendRequest,
+    FriendSuggestion,
+    MutualFriendCount,
+    MutualFriends,
 )
+from app.schemas.presence import UserPresence
 from app.schemas.user import UserBasic
 
 router = APIRouter()
 
 
+def publish_friendship_changed(db: Session, user_id: int, friend_id: int, accepted: bool) -> None:
+    """
+    Let every worker update its social graph delta log after commit.
+    """
+    events.publish(db, FRIENDSHIP_CHANGED, {
+        "user_id": user_id,
+        "friend_id": friend_id,
+        "accepted": accepted,
+        "changed_at": time.time(),
+    })
+
+
+def friendship_out(friendship: Friendship, user_id: int) -> FriendshipSchema:
+    """
+    A friendship as seen by one of its users: ``user_id`` is that user and
+    ``friend`` the other one.
+    """
+    friend = friendship.other(user_id)
+    return FriendshipSchema(
+        id=friendship.id,
+        user_id=user_id,
+        friend_id=friend.id,
+        status=friendship.status,
+        created_at=friendship.created_at,
+        updated_at=friendship.updated_at,
+        friend=UserBasic.from_orm(friend),
+    )
+
+
+def friendship_removed(pair: Tuple[int, int], was_accepted: bool, pending_for: Optional[int]) -> None:
+    """
+    Update counters and caches after a friendship or request was deleted.
+    """
+    if pending_for is not None:
+        badges.increment([(pending_for, badges.PENDING_FRIEND_REQUESTS, -1)])
+    if was_accepted:
+        friend_ids_cache.invalidate(pair)
+        suggestion_updater.add(*pair, accepted=False)
+
+
+def friend_request_out(friendship: Friendship) -> FriendRequest:
+    return FriendRequest(
+        id=friendship.id,
+        user=UserBasic.from_orm(friendship.requester),
+        status=friendship.status,
+        created_at=friendship.created_at,
+    )
+
+
 @router.post("/", response_model=FriendshipSchema)
 def create_friendship_request(
     *,
@@ -36,45 +101,64 @@ def create_friendship_request(
     if friendship_in.friend_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot send friend request to yourself")
     
-    # Check if friendship request already exists
-    existing_request = db.query(Friendship).filter(
-        Friendship.user_id == current_user.id,
-        Friendship.friend_id == friendship_in.friend_id
+    if is_blocked(db, current_user.id, friendship_in.friend_id):
+        raise HTTPException(status_code=403, detail="Cannot send friend request to this user")
+    
+    # A request or friendship in either direction is stored in one row
+    user_low_id, user_high_id = Friendship.pair(current_user.id, friendship_in.friend_id)
+    friendship = db.query(Friendship).filter(
+        Friendship.user_low_id == user_low_id,
+        Friendship.user_high_id == user_high_id
     ).first()
     
-    if existing_request:
+    if friendship and (
+        friendship.requester_id == current_user.id or friendship.status == FriendshipStatus.ACCEPTED
+    ):
         raise HTTPException(status_code=400, detail="Friendship request already exists")
     
-    # Check if reverse friendship request exists
-    reverse_request = db.query(Friendship).filter(
-        Friendship.user_id == friendship_in.friend_id,
-        Friendship.friend_id == current_user.id
-    ).first()
-    
-    if reverse_request:
-        # Auto-accept if reverse request exists
-        reverse_request.status = FriendshipStatus.ACCEPTED
-        db.add(reverse_request)
-        
-        # Create new friendship with accepted status
-        friendship = Friendship(
-            user_id=current_user.id,
-            friend_id=friendship_in.friend_id,
-            status=FriendshipStatus.ACCEPTED
-        )
+    # Auto-accept if reverse request exists
+    accepted_reverse = friendship is not None
+    was_pending = accepted_reverse and friendship.status == FriendshipStatus.PENDING
+    if accepted_reverse:
+        friendship.status = FriendshipStatus.ACCEPTED
     else:
         # Create new friendship request
         friendship = Friendship(
-            user_id=current_user.id,
-            friend_id=friendship_in.friend_id,
+            user_low_id=user_low_id,
+            user_high_id=user_high_id,
+            requester_id=current_user.id,
             status=FriendshipStatus.PENDING
         )
     
     db.add(friendship)
+    db.flush()
+    if accepted_reverse:
+        publish_friendship_changed(db, current_user.id, friendship_in.friend_id, True)
+        events.publish(db, "friend_request.accepted", {
+            "friendship_id": friendship.id,
+            "user": UserBasic.from_orm(current_user),
+        }, [friendship.requester_id])
+    else:
+        events.publish(db, "friend_request.created", friend_request_out(friendship), [friendship_in.friend_id])
     db.commit()
     db.refresh(friendship)
     
-    return friendship
+    if accepted_reverse:
+        if was_pending:
+            # The request sent to the current user is no longer pending
+            badges.increment([(current_user.id, badges.PENDING_FRIEND_REQUESTS, -1)])
+        friend_ids_cache.invalidate([current_user.id, friendship_in.friend_id])
+        suggestion_updater.add(current_user.id, friendship_in.friend_id, accepted=True)
+        notification_buffer.add(
+            friendship.requester_id, NotificationKind.FRIEND_ACCEPT, friendship.id, current_user.id
+        )
+    else:
+        badges.increment([(friendship_in.friend_id, badges.PENDING_FRIEND_REQUESTS, 1)])
+        notification_buffer.add(
+            friendship_in.friend_id, NotificationKind.FRIEND_REQUEST, friendship.id, current_user.id
+        )
+    
+    return friendship_out(friendship, current_user.id)
 
 
 @router.get("/", response_model=List[FriendshipSchema])
@@ -85,17 +169,18 @@ def read_friendships(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Retrieve all friendships for the current user.
+    Retrieve all friendships for the current user: friends and sent requests.
     """
     query = db.query(Friendship).filter(
-        Friendship.user_id == current_user.id
-    )
+        or_(Friendship.user_low_id == current_user.id, Friendship.user_high_id == current_user.id),
+        or_(Friendship.requester_id == current_user.id, Friendship.status == FriendshipStatus.ACCEPTED)
+    ).options(selectinload(Friendship.user_low), selectinload(Friendship.user_high))
     
     if status:
         query = query.filter(Friendship.status == status)
     
     friendships = query.all()
-    return friendships
+    return [friendship_out(friendship, current_user.id) for friendship in friendships]
 
 
 @router.get("/requests", response_model=List[FriendRequest])
@@ -108,11 +193,113 @@ def read_friendship_requests(
     Retrieve all pending friendship requests sent to the current user.
     """
     requests = db.query(Friendship).filter(
-        Friendship.friend_id == current_user.id,
+        or_(Friendship.user_low_id == current_user.id, Friendship.user_high_id == current_user.id),
+        Friendship.requester_id != current_user.id,
         Friendship.status == FriendshipStatus.PENDING
-    ).all()
+    ).options(selectinload(Friendship.requester)).all()
+    
+    return [friend_request_out(friendship) for friendship in requests]
+
+
+@router.get("/suggestions", response_model=List[FriendSuggestion])
+def read_friend_suggestions(
+    *,
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=settings.FRIEND_SUGGESTIONS_SIZE),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get "people you may know": friends of friends with the most mutual
+    friends, excluding pending requests in either direction and users
+    hidden by a block.
     
-    return requests
+    Served from the suggestions precomputed in Tarantool; a user without
+    them gets them computed on the spot.
+    """
+    suggestions = friend_suggestions.get(current_user.id)
+    if suggestions is None:
+        suggestions = mutual_friend_counts(db, current_user.id, settings.FRIEND_SUGGESTIONS_SIZE)
+    if not suggestions:
+        return []
+    
+    # Stored suggestions can lag behind requests sent since
+    candidate_ids = [candidate_id for candidate_id, _ in suggestions]
+    related = {
+        user_low_id if user_low_id != current_user.id else user_high_id
+        for user_low_id, user_high_id in db.query(Friendship.user_low_id, Friendship.user_high_id).filter(or_(
+            and_(Friendship.user_low_id == current_user.id, Friendship.user_high_id.in_(candidate_ids)),
+            and_(Friendship.user_high_id == current_user.id, Friendship.user_low_id.in_(candidate_ids)),
+        ))
+    }
+    hidden = hidden_user_ids(db, current_user.id)
+    candidates = [
+        (candidate_id, mutual) for candidate_id, mutual in suggestions
+        if candidate_id not in related and candidate_id not in hidden
+    ][:limit]
+    users = {
+        user.id: user for user in db.query(User).filter(
+            User.id.in_([candidate_id for candidate_id, _ in candidates]),
+            User.is_active == True
+        )
+    }
+    return [
+        FriendSuggestion(**UserBasic.from_orm(users[candidate_id]).dict(), mutual_friends=mutual)
+        for candidate_id, mutual in candidates
+        if candidate_id in users
+    ]
+
+
+@router.get("/mutual", response_model=List[MutualFriendCount])
+def read_mutual_friend_counts(
+    *,
+    db: Session = Depends(get_db),
+    user_ids: List[int] = Query(...),
+    current_user_id: int = Depends(get_current_user_id),
+) -> Any:
+    """
+    Get the number of mutual friends with several users in request order,
+    e.g. for a page of profiles. Users hidden by a block get 0.
+    
+    Friend ids are read from Tarantool with one call; only users missing
+    from the cache are loaded from the database.
+    """
+    if len(user_ids) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MULTI_GET_MAX_IDS} ids can be requested at once",
+        )
+    hidden = hidden_user_ids(db, current_user_id)
+    user_ids = list(dict.fromkeys(user_ids))
+    mutual = mutual_friend_ids(db, current_user_id, [user_id for user_id in user_ids if user_id not in hidden])
+    return [
+        MutualFriendCount(user_id=user_id, mutual_friends=len(mutual.get(user_id, [])))
+        for user_id in user_ids
+    ]
+
+
+@router.get("/mutual/{user_id}", response_model=MutualFriends)
+def read_mutual_friends(
+    *,
+    db: Session = Depends(get_db),
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the mutual friends of the current user and another user: their
+    number and the first ``limit`` of them.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or is_blocked(db, current_user.id, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    mutual = mutual_friend_ids(db, current_user.id, [user_id])[user_id]
+    friends = db.query(User).filter(User.id.in_(mutual[:limit])).order_by(User.id).all()
+    return MutualFriends(
+        user_id=user_id,
+        mutual_friends=len(mutual),
+        friends=[UserBasic.from_orm(friend) for friend in friends],
+    )
 
 
 @router.put("/{friendship_id}", response_model=FriendshipSchema)
@@ -131,36 +318,37 @@ def update_friendship(
         raise HTTPException(status_code=404, detail="Friendship not found")
     
     # Only the recipient can update the status
-    if friendship.friend_id != current_user.id:
+    if friendship.recipient_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Only pending requests can be updated
     if friendship.status != FriendshipStatus.PENDING:
         raise HTTPException(status_code=400, detail="Can only update pending requests")
+    if friendship_in.status == FriendshipStatus.PENDING:
+        raise HTTPException(status_code=400, detail="A request can only be accepted or declined")
     
     friendship.status = friendship_in.status
     db.add(friendship)
     
-    # If accepted, create reverse friendship
     if friendship_in.status == FriendshipStatus.ACCEPTED:
-        # Check if reverse friendship already exists
-        reverse_friendship = db.query(Friendship).filter(
-            Friendship.user_id == friendship.friend_id,
-            Friendship.friend_id == friendship.user_id
-        ).first()
-        
-        if not reverse_friendship:
-            reverse_friendship = Friendship(
-                user_id=friendship.friend_id,
-                friend_id=friendship.user_id,
-                status=FriendshipStatus.ACCEPTED
-            )
-            db.add(reverse_friendship)
+        publish_friendship_changed(db, friendship.requester_id, current_user.id, True)
+        events.publish(db, "friend_request.accepted", {
+            "friendship_id": friendship.id,
+            "user": UserBasic.from_orm(current_user),
+        }, [friendship.requester_id])
     
     db.commit()
     db.refresh(friendship)
     
-    return friendship
+    badges.increment([(current_user.id, badges.PENDING_FRIEND_REQUESTS, -1)])
+    if friendship.status == FriendshipStatus.ACCEPTED:
+        notification_buffer.add(
+            friendship.requester_id, NotificationKind.FRIEND_ACCEPT, friendship.id, current_user.id
+        )
+        friend_ids_cache.invalidate([friendship.requester_id, current_user.id])
+        suggestion_updater.add(friendship.requester_id, current_user.id, accepted=True)
+    
+    return friendship_out(friendship, friendship.requester_id)
 
 
 @router.delete("/{friendship_id}", response_model=FriendshipSchema)
@@ -178,40 +366,50 @@ def delete_friendship(
         raise HTTPException(status_code=404, detail="Friendship not found")
     
     # Only the sender or recipient can delete
-    if friendship.user_id != current_user.id and friendship.friend_id != current_user.id:
+    if current_user.id not in (friendship.user_low_id, friendship.user_high_id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # If it's an accepted friendship, also delete the reverse friendship
-    if friendship.status == FriendshipStatus.ACCEPTED:
-        reverse_friendship = db.query(Friendship).filter(
-            Friendship.user_id == friendship.friend_id,
-            Friendship.friend_id == friendship.user_id
-        ).first()
-        
-        if reverse_friendship:
-            db.delete(reverse_friendship)
+    was_accepted = friendship.status == FriendshipStatus.ACCEPTED
+    pending_for = friendship.recipient_id if friendship.status == FriendshipStatus.PENDING else None
+    pair = (friendship.user_low_id, friendship.user_high_id)
+    # A request is shown as sent by the requester, a friendship from the current user's side
+    response = friendship_out(friendship, current_user.id if was_accepted else friendship.requester_id)
+    if was_accepted:
+        publish_friendship_changed(db, *pair, False)
     
     db.delete(friendship)
     db.commit()
+    friendship_removed(pair, was_accepted, pending_for)
     
-    return friendship
+    return response
 
 
-@router.get("/friends", response_model=List[UserBasic])
+@router.get("/friends", response_model=Union[List[UserPresence], List[UserBasic]])
 def read_friends(
     *,
     db: Session = Depends(get_db),
+    with_presence: bool = False,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Get all friends of the current user (accepted friendships).
+
+    With ``with_presence`` every friend also gets ``online`` and
+    ``last_seen``, read from Tarantool with a single lookup.
     """
-    friendships = db.query(Friendship).filter(
-        Friendship.user_id == current_user.id,
-        Friendship.status == FriendshipStatus.ACCEPTED
-    ).all()
-    
-    friend_ids = [friendship.friend_id for friendship in friendships]
+    edges = friend_edges()
+    friend_ids = db.execute(
+        select(edges.c.friend_id).where(edges.c.user_id == current_user.id)
+    ).scalars().all()
     friends = db.query(User).filter(User.id.in_(friend_ids)).all()
     
-    return friends
\ No newline at end of file
+    if with_presence:
+        found = presence.get_presence(friend_ids)
+        return [
+            UserPresence(
+                **UserBasic.from_orm(friend).dict(),
+                **(found[friend.id]._asdict() if friend.id in found else {}),
+            )
+            for friend in friends
+        ]
+    return [UserBasic.from_orm(friend) for friend in friends]
\ No newline at end of file
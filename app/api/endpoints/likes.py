@@ -1,19 +1,58 @@
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Set
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.api.dependencies import get_current_user, get_db, get_tarantool
+from app.core import events
+from app.core.notifications import notification_buffer
+from app.core.visibility import can_view_post
+from app.db.tarantool.response_cache import (
+    comment_key,
+    post_comments_keys,
+    post_key,
+    response_cache,
+)
 from app.models.comment import Comment
 from app.models.like import Like
+from app.models.notification import NotificationKind
 from app.models.post import Post
 from app.models.user import User
 from app.schemas.like import Like as LikeSchema, LikeCreate
+from app.schemas.user import UserBasic
 
 router = APIRouter()
 
 
+def liked_post_ids(db: Session, user_id: int, post_ids: List[int]) -> Set[int]:
+    """
+    Ids of the given posts liked by a user, in a single query.
+    """
+    if not post_ids:
+        return set()
+    rows = db.query(Like.post_id).filter(
+        Like.user_id == user_id,
+        Like.post_id.in_(post_ids),
+        Like.comment_id == None
+    ).all()
+    return {post_id for (post_id,) in rows}
+
+
+def liked_comment_ids(db: Session, user_id: int, comment_ids: List[int]) -> Set[int]:
+    """
+    Ids of the given comments liked by a user, in a single query.
+    """
+    if not comment_ids:
+        return set()
+    rows = db.query(Like.comment_id).filter(
+        Like.user_id == user_id,
+        Like.comment_id.in_(comment_ids),
+        Like.post_id == None
+    ).all()
+    return {comment_id for (comment_id,) in rows}
+
+
 @router.post("/", response_model=LikeSchema)
 def create_like(
     *,
@@ -27,7 +66,7 @@ def create_like(
     # Check if target exists
     if like_in.post_id is not None:
         target = db.query(Post).filter(Post.id == like_in.post_id).first()
-        if not target:
+        if not target or not can_view_post(db, current_user.id, target.user_id, target.visibility):
             raise HTTPException(status_code=404, detail="Post not found")
         
         # Check if already liked
@@ -86,8 +125,13 @@ def create_like(
             print(f"Error updating post popularity in Tarantool: {e}")
         
     elif like_in.comment_id is not None:
-        target = db.query(Comment).filter(Comment.id == like_in.comment_id).first()
-        if not target:
+        target = (
+            db.query(Comment)
+            .options(joinedload(Comment.post))
+            .filter(Comment.id == like_in.comment_id)
+            .first()
+        )
+        if not target or not can_view_post(db, current_user.id, target.post.user_id, target.post.visibility):
             raise HTTPException(status_code=404, detail="Comment not found")
         
         # Check if already liked
@@ -110,9 +154,27 @@ def create_like(
         raise HTTPException(status_code=400, detail="Must specify either post_id or comment_id")
     
     db.add(like)
+    db.flush()
+    if target.user_id != current_user.id:
+        events.publish(db, "like.created", {
+            "id": like.id,
+            "post_id": like.post_id,
+            "comment_id": like.comment_id,
+            "created_at": like.created_at,
+            "user": UserBasic.from_orm(current_user),
+        }, [target.user_id])
     db.commit()
     db.refresh(like)
     
+    # Like counts are part of cached post and comment pages
+    if like.post_id is not None:
+        response_cache.invalidate(post_key(like.post_id))
+        kind = NotificationKind.POST_LIKE
+    else:
+        response_cache.invalidate(comment_key(target.id), *post_comments_keys(target.post_id))
+        kind = NotificationKind.COMMENT_LIKE
+    notification_buffer.add(target.user_id, kind, target.id, current_user.id)
+    
     return like
 
 
@@ -165,6 +227,7 @@ def delete_post_like(
     
     db.delete(like)
     db.commit()
+    response_cache.invalidate(post_key(post_id))
     
     return like
 
@@ -188,8 +251,13 @@ def delete_comment_like(
     if not like:
         raise HTTPException(status_code=404, detail="Like not found")
     
+    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    
     db.delete(like)
     db.commit()
+    response_cache.invalidate(comment_key(comment_id))
+    if comment is not None:
+        response_cache.invalidate(*post_comments_keys(comment.post_id))
     
     return like
 
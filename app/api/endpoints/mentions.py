@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user, get_db
+from app.core.visibility import visible_posts
+from app.db.tarantool import badges
+from app.models.comment import Comment
+from app.models.mention import Mention
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.mention import Mention as MentionSchema, MentionPage
+from app.schemas.user import UserBasic
+
+router = APIRouter()
+
+
+def encode_cursor(mention: Mention) -> str:
+    return f"{mention.created_at.isoformat()},{mention.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, mention_id = cursor.split(",")
+        return datetime.fromisoformat(created_at), int(mention_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/", response_model=MentionPage)
+def read_mentions(
+    *,
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the posts and comments mentioning the current user, latest first.
+
+    Reading the first page clears the unread mentions badge.
+    """
+    query = (
+        db.query(Mention, Post.content, Comment.content)
+        .join(Post, Post.id == Mention.post_id)
+        .outerjoin(Comment, Comment.id == Mention.comment_id)
+        .filter(Mention.mentioned_user_id == current_user.id, visible_posts(db, current_user.id))
+    )
+    if cursor:
+        # Keyset pagination: continue after the last mention of the previous page
+        query = query.filter(tuple_(Mention.created_at, Mention.id) < decode_cursor(cursor))
+    rows = query.order_by(Mention.created_at.desc(), Mention.id.desc()).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # Authors of the whole page in one query
+    author_ids = {mention.author_id for mention, _, _ in rows}
+    authors = {
+        user.id: UserBasic.from_orm(user)
+        for user in db.query(User).filter(User.id.in_(author_ids))
+    } if author_ids else {}
+    
+    items = [
+        MentionSchema(
+            id=mention.id,
+            post_id=mention.post_id,
+            comment_id=mention.comment_id,
+            author=authors[mention.author_id],
+            content=comment_content if mention.comment_id is not None else post_content,
+            created_at=mention.created_at,
+        )
+        for mention, post_content, comment_content in rows
+        if mention.author_id in authors
+    ]
+    if not cursor:
+        badges.reset(current_user.id, [badges.UNREAD_MENTIONS])
+    next_cursor = encode_cursor(rows[-1][0]) if has_more else None
+    return MentionPage(items=items, next_cursor=next_cursor)
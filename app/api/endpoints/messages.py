@@ -1,22 +1,177 @@
+import html
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import or_, and_, func, desc
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_, case, func, desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
 from app.api.dependencies import get_current_user, get_db, get_tarantool
-from app.models.message import Message
+from app.core import events
+from app.core.config import settings
+from app.core.visibility import is_blocked
+from app.db.tarantool import badges, recent_messages
+from app.models.conversation import Conversation
+from app.models.message import MESSAGE_SEARCH_CONFIG, Message, message_search_vector
 from app.models.user import User
 from app.schemas.message import (
     Message as MessageSchema,
     MessageCreate,
     MessageUpdate,
-    MessagePreview
+    MessagePreview,
+    MessageSearchPage,
+    MessageSearchResult,
 )
+from app.schemas.user import UserBasic
 
 router = APIRouter()
 
+SEARCH_QUERY_MAX_LENGTH = 200
+
+# At most two fragments of the text around the matches
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def between(user_a: int, user_b: int):
+    """
+    Filter for the messages exchanged by two users.
+    """
+    return or_(
+        and_(Message.sender_id == user_a, Message.recipient_id == user_b),
+        and_(Message.sender_id == user_b, Message.recipient_id == user_a)
+    )
+
+
+def conversation_query(db: Session, user_a: int, user_b: int):
+    low, high = Conversation.pair(user_a, user_b)
+    return db.query(Conversation).filter(
+        Conversation.user_low_id == low,
+        Conversation.user_high_id == high
+    )
+
+
+def lock_conversation(db: Session, user_a: int, user_b: int) -> Optional[Conversation]:
+    """
+    Get the conversation of two users, locking its row until commit.
+    """
+    return conversation_query(db, user_a, user_b).with_for_update().populate_existing().first()
+
+
+def record_message(db: Session, message: Message) -> Conversation:
+    """
+    Add a flushed message to its conversation, creating the conversation if needed.
+    """
+    conversation = lock_conversation(db, message.sender_id, message.recipient_id)
+    if conversation is None:
+        low, high = Conversation.pair(message.sender_id, message.recipient_id)
+        conversation = Conversation(
+            user_low_id=low, user_high_id=high,
+            unread_low=0, unread_high=0,
+            last_read_low=0, last_read_high=0,
+            version=0
+        )
+        try:
+            with db.begin_nested():
+                db.add(conversation)
+        except IntegrityError:
+            # Created concurrently by the other participant
+            conversation = lock_conversation(db, message.sender_id, message.recipient_id)
+    
+    if conversation.last_message_id is None or message.id > conversation.last_message_id:
+        conversation.last_message_id = message.id
+        conversation.last_activity = message.created_at
+    conversation.add_unread(message.recipient_id, 1)
+    recent_messages.queue_update(
+        db, conversation, "append", recent_messages.message_to_dict(message)
+    )
+    return conversation
+
+
+def mark_read(
+    db: Session, reader_id: int, sender_id: int, up_to_id: int,
+    read_at: Optional[datetime] = None
+) -> int:
+    """
+    Move the reader's watermark in a conversation up to a message id.
+    
+    Costs one UPDATE of the conversation plus one set-based UPDATE keeping
+    Message.is_read in sync. Messages loaded in the session are updated in
+    place. The conversation is only locked if the watermark moves. Returns
+    how many messages became read.
+    """
+    conversation = conversation_query(db, reader_id, sender_id).first()
+    if conversation is not None:
+        if up_to_id <= conversation.last_read_for(reader_id):
+            return 0
+        conversation = lock_conversation(db, reader_id, sender_id)
+        if up_to_id <= conversation.last_read_for(reader_id):
+            # Moved by a concurrent request meanwhile
+            return 0
+    
+    read_at = read_at or datetime.utcnow()
+    marked = db.query(Message).filter(
+        Message.sender_id == sender_id,
+        Message.recipient_id == reader_id,
+        Message.id <= up_to_id,
+        Message.is_read == False
+    ).update(
+        {Message.is_read: True, Message.read_at: read_at},
+        synchronize_session="evaluate"
+    )
+    
+    if conversation is not None:
+        conversation.set_last_read(reader_id, up_to_id)
+        # Unread count is whatever arrived after the watermark
+        unread = db.query(func.count(Message.id)).filter(
+            Message.sender_id == sender_id,
+            Message.recipient_id == reader_id,
+            Message.id > up_to_id
+        ).scalar()
+        conversation.set_unread(reader_id, unread)
+        recent_messages.queue_update(db, conversation, "read", {
+            "reader_id": reader_id,
+            "up_to_id": up_to_id,
+            "read_at": read_at.isoformat(),
+        })
+    return marked
+
+
+def mark_unread(db: Session, reader_id: int, sender_id: int, from_id: int) -> int:
+    """
+    Move the reader's watermark in a conversation back below a message id,
+    so that message and everything after it is unread again.
+    
+    Returns how many messages became unread.
+    """
+    conversation = lock_conversation(db, reader_id, sender_id)
+    if conversation is not None and from_id > conversation.last_read_for(reader_id):
+        return 0
+    
+    unmarked = db.query(Message).filter(
+        Message.sender_id == sender_id,
+        Message.recipient_id == reader_id,
+        Message.id >= from_id,
+        Message.is_read == True
+    ).update(
+        {Message.is_read: False, Message.read_at: None},
+        synchronize_session="evaluate"
+    )
+    
+    if conversation is not None:
+        conversation.set_last_read(reader_id, from_id - 1)
+        unread = db.query(func.count(Message.id)).filter(
+            Message.sender_id == sender_id,
+            Message.recipient_id == reader_id,
+            Message.id >= from_id
+        ).scalar()
+        conversation.set_unread(reader_id, unread)
+        recent_messages.queue_update(db, conversation, "unread", {
+            "reader_id": reader_id,
+            "from_id": from_id,
+        })
+    return unmarked
+
 
 @router.post("/", response_model=MessageSchema)
 def create_message(
@@ -36,6 +191,8 @@ def create_message(
     # Check if trying to message self
     if message_in.recipient_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot send message to yourself")
+    if is_blocked(db, current_user.id, message_in.recipient_id):
+        raise HTTPException(status_code=403, detail="Cannot send message to this user")
     
     message = Message(
         sender_id=current_user.id,
@@ -43,9 +200,17 @@ def create_message(
         text=message_in.text,
     )
     db.add(message)
+    db.flush()
+    record_message(db, message)
+    # Delivered to the recipient's open WebSockets when the commit succeeds
+    events.publish(
+        db, "message.created", MessageSchema.from_orm(message), [message.recipient_id]
+    )
     db.commit()
     db.refresh(message)
     
+    badges.increment([(message.recipient_id, badges.UNREAD_MESSAGES, 1)])
+    
     return message
 
 
@@ -56,42 +221,146 @@ def read_messages(
     user_id: int,
     skip: int = 0,
     limit: int = 100,
+    before_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Retrieve messages between current user and another user.
+    
+    The latest page is served from the recent messages cache in Tarantool.
+    Older history is read from Postgres: pass the id of the oldest message
+    received as before_id.
     """
     # Check if other user exists
     other_user = db.query(User).filter(User.id == user_id).first()
     if not other_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get messages between users
-    messages = db.query(Message).filter(
-        or_(
-            and_(Message.sender_id == current_user.id, Message.recipient_id == user_id),
-            and_(Message.sender_id == user_id, Message.recipient_id == current_user.id)
+    users = {user.id: UserBasic.from_orm(user) for user in (current_user, other_user)}
+    
+    def to_schema(data: Dict[str, Any]) -> MessageSchema:
+        return MessageSchema(
+            **data, sender=users[data["sender_id"]], recipient=users[data["recipient_id"]]
         )
-    ).order_by(Message.created_at.desc()).offset(skip).limit(limit).all()
     
-    # Mark unread messages as read
-    unread_messages = [
-        msg for msg in messages 
-        if msg.recipient_id == current_user.id and not msg.is_read
-    ]
+    messages = None
+    first_page = skip == 0 and before_id is None and limit <= settings.RECENT_MESSAGES_SIZE
+    conversation = None
+    key = recent_messages.pair_key(current_user.id, user_id)
+    if first_page:
+        # The conversation is read before the messages, so a cache fill
+        # never claims a version newer than the messages it stores
+        conversation = conversation_query(db, current_user.id, user_id).first()
+        if conversation is not None:
+            cached = recent_messages.get_recent(key, conversation.version, limit)
+            if cached is not None:
+                messages = [to_schema(data) for data in cached]
+    
+    if messages is None:
+        # Get messages between users
+        query = db.query(Message).filter(between(current_user.id, user_id))
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        rows = query.order_by(Message.id.desc()).offset(skip).limit(
+            settings.RECENT_MESSAGES_SIZE if first_page else limit
+        ).all()
+        if conversation is not None:
+            recent_messages.fill(
+                key, conversation.version, rows,
+                complete=len(rows) < settings.RECENT_MESSAGES_SIZE
+            )
+        messages = [to_schema(recent_messages.message_to_dict(msg)) for msg in rows[:limit]]
     
-    if unread_messages:
-        for msg in unread_messages:
-            msg.is_read = True
-            msg.read_at = datetime.utcnow()
-        
-        db.add_all(unread_messages)
+    # Move the read watermark up to the newest incoming message on the page
+    incoming = [msg for msg in messages if msg.recipient_id == current_user.id]
+    if incoming:
+        read_at = datetime.utcnow()
+        up_to_id = max(msg.id for msg in incoming)
+        marked = mark_read(db, current_user.id, user_id, up_to_id, read_at)
         db.commit()
+        if marked:
+            for msg in incoming:
+                if not msg.is_read:
+                    msg.is_read = True
+                    msg.read_at = read_at
+        badges.increment([(current_user.id, badges.UNREAD_MESSAGES, -marked)])
     
     # Return in chronological order (oldest first)
     return sorted(messages, key=lambda x: x.created_at)
 
 
+def escape_html(column):
+    return func.replace(func.replace(func.replace(column, "&", "&amp;"), "<", "&lt;"), ">", "&gt;")
+
+
+@router.get("/search", response_model=MessageSearchPage)
+def search_messages(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=SEARCH_QUERY_MAX_LENGTH),
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Search the current user's messages, newest first.
+    
+    ``user_id`` limits the search to the conversation with that user.
+    Every result has a ``snippet`` of the text with the matches in
+    ``<b>`` tags; the rest of the snippet is HTML-escaped. Pages are
+    continued with ``next_cursor`` of the previous one.
+    """
+    postgres = db.get_bind().dialect.name == "postgresql"
+    if postgres:
+        ts_query = func.websearch_to_tsquery(MESSAGE_SEARCH_CONFIG, q)
+        match = message_search_vector.op("@@")(ts_query)
+    else:
+        # Other databases (SQLite in tests): all words as substrings
+        match = and_(*[Message.text.ilike(f"%{word}%") for word in q.split() or [q]])
+    
+    # One branch per side of the conversation, each answered by one of the
+    # (user id, search_vector) GIN indexes
+    sent = [Message.sender_id == current_user.id, match]
+    received = [Message.recipient_id == current_user.id, match]
+    if user_id is not None:
+        sent.append(Message.recipient_id == user_id)
+        received.append(Message.sender_id == user_id)
+    query = db.query(Message).options(
+        joinedload(Message.sender), joinedload(Message.recipient)
+    ).filter(or_(and_(*sent), and_(*received)))
+    if cursor:
+        try:
+            before_id = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(Message.id < before_id)
+    messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    
+    # Highlighting is slow, so it is done for the page only
+    snippets = {}
+    if postgres and messages:
+        snippets = dict(
+            db.query(
+                Message.id,
+                func.ts_headline(MESSAGE_SEARCH_CONFIG, escape_html(Message.text), ts_query, HEADLINE_OPTIONS),
+            ).filter(Message.id.in_([message.id for message in messages]))
+        )
+    
+    items = [
+        MessageSearchResult(
+            **MessageSchema.from_orm(message).dict(),
+            snippet=snippets.get(message.id) or html.escape(message.text, quote=False),
+        )
+        for message in messages
+    ]
+    next_cursor = str(messages[-1].id) if has_more else None
+    return MessageSearchPage(items=items, next_cursor=next_cursor)
+
+
 @router.get("/conversations", response_model=List[MessagePreview])
 def read_conversations(
     *,
@@ -101,26 +370,19 @@ def read_conversations(
     """
     Get a list of conversations (latest message from each user).
     """
-    # This query gets the latest message from each conversation
-    # It uses a subquery to find the max message ID for each user pair
-    latest_message_ids = db.query(
-        func.max(Message.id).label('max_id')
+    # Conversations are kept up to date by the write paths, so the inbox
+    # is a scan of the user's conversations ordered by last activity
+    conversations = db.query(Conversation).options(
+        joinedload(Conversation.last_message)
     ).filter(
         or_(
-            Message.sender_id == current_user.id,
-            Message.recipient_id == current_user.id
-        )
-    ).group_by(
-        func.least(Message.sender_id, Message.recipient_id),
-        func.greatest(Message.sender_id, Message.recipient_id)
-    ).subquery()
-    
-    # Get the actual messages using the IDs from the subquery
-    latest_messages = db.query(Message).filter(
-        Message.id.in_(db.query(latest_message_ids.c.max_id))
-    ).order_by(Message.created_at.desc()).all()
+            Conversation.user_low_id == current_user.id,
+            Conversation.user_high_id == current_user.id
+        ),
+        Conversation.last_message_id != None
+    ).order_by(Conversation.last_activity.desc()).all()
     
-    return latest_messages
+    return [conversation.last_message for conversation in conversations]
 
 
 @router.get("/unread", response_model=int)
@@ -132,9 +394,17 @@ def count_unread_messages(
     """
     Count unread messages for the current user.
     """
-    count = db.query(func.count(Message.id)).filter(
-        Message.recipient_id == current_user.id,
-        Message.is_read == False
+    # Sum of the per-conversation counters derived from the read watermarks
+    count = db.query(
+        func.coalesce(func.sum(case(
+            (Conversation.user_low_id == current_user.id, Conversation.unread_low),
+            else_=Conversation.unread_high
+        )), 0)
+    ).filter(
+        or_(
+            Conversation.user_low_id == current_user.id,
+            Conversation.user_high_id == current_user.id
+        )
     ).scalar()
     
     return count
@@ -149,7 +419,11 @@ def update_message(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Mark a message as read.
+    Mark a message as read or unread.
+    
+    The read watermark of the conversation is the only read state: marking
+    a message read also reads the messages before it, marking it unread
+    makes the messages after it unread too.
     """
     message = db.query(Message).filter(Message.id == message_id).first()
     if not message:
@@ -159,14 +433,15 @@ def update_message(
     if message.recipient_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    message.is_read = message_in.is_read
-    if message.is_read:
-        message.read_at = datetime.utcnow()
-    
-    db.add(message)
+    if message_in.is_read:
+        unread_delta = -mark_read(db, current_user.id, message.sender_id, message.id)
+    else:
+        unread_delta = mark_unread(db, current_user.id, message.sender_id, message.id)
     db.commit()
     db.refresh(message)
     
+    badges.increment([(current_user.id, badges.UNREAD_MESSAGES, unread_delta)])
+    
     return message
 
 
@@ -188,7 +463,31 @@ def delete_message(
     if message.sender_id != current_user.id and message.recipient_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    conversation = lock_conversation(db, message.sender_id, message.recipient_id)
+    if conversation is not None:
+        was_unread = message.id > conversation.last_read_for(message.recipient_id)
+    else:
+        was_unread = not message.is_read
+    
     db.delete(message)
+    db.flush()
+    
+    if conversation:
+        recent_messages.queue_update(db, conversation, "delete", {"id": message.id})
+        if was_unread:
+            conversation.add_unread(message.recipient_id, -1)
+        if conversation.last_message_id == message.id:
+            latest = db.query(Message).filter(
+                between(message.sender_id, message.recipient_id)
+            ).order_by(Message.id.desc()).first()
+            if latest is None:
+                db.delete(conversation)
+            else:
+                conversation.last_message_id = latest.id
+                conversation.last_activity = latest.created_at
     db.commit()
     
+    if was_unread:
+        badges.increment([(message.recipient_id, badges.UNREAD_MESSAGES, -1)])
+    
     return message
\ No newline at end of file
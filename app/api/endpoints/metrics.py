@@ -0,0 +1,30 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_current_active_superuser
+from app.core.hub import hub
+from app.db.tarantool.response_cache import response_cache
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+def read_cache_metrics(
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Response cache hit ratio and bytes saved for this worker. Only for superusers.
+    """
+    return response_cache.stats()
+
+
+@router.get("/realtime", response_model=Dict[str, Any])
+def read_realtime_metrics(
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Connected clients and event delivery counters for this worker. Only for superusers.
+    """
+    return hub.stats()
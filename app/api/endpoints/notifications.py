@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user, get_db
+from app.models.notification import Notification
+from app.models.user import User
+from app.schemas.notification import (
+    Notification as NotificationSchema,
+    NotificationPage,
+)
+from app.schemas.user import UserBasic
+
+router = APIRouter()
+
+
+def encode_cursor(notification: Notification) -> str:
+    return f"{notification.updated_at.isoformat()},{notification.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        updated_at, notification_id = cursor.split(",")
+        return datetime.fromisoformat(updated_at), int(notification_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/", response_model=NotificationPage)
+def read_notifications(
+    *,
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the notifications of the current user, latest activity first.
+    """
+    query = db.query(Notification).filter(Notification.recipient_id == current_user.id)
+    if cursor:
+        # Keyset pagination: continue after the last notification of the previous page
+        query = query.filter(
+            tuple_(Notification.updated_at, Notification.id) < decode_cursor(cursor)
+        )
+    notifications = query.order_by(
+        Notification.updated_at.desc(), Notification.id.desc()
+    ).limit(limit + 1).all()
+    
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    
+    # Actors of the whole page in one query
+    actor_ids = {actor_id for n in notifications for actor_id in n.sample_actor_ids}
+    actors = {
+        user.id: UserBasic.from_orm(user)
+        for user in db.query(User).filter(User.id.in_(actor_ids))
+    } if actor_ids else {}
+    
+    items = [
+        NotificationSchema(
+            id=n.id,
+            kind=n.kind,
+            target_id=n.target_id,
+            actor_count=n.actor_count,
+            actors=[actors[actor_id] for actor_id in n.sample_actor_ids if actor_id in actors],
+            created_at=n.created_at,
+            updated_at=n.updated_at,
+        )
+        for n in notifications
+    ]
+    next_cursor = encode_cursor(notifications[-1]) if has_more else None
+    return NotificationPage(items=items, next_cursor=next_cursor)
@@ -1,29 +1,161 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import REAL, and_, cast, func, literal, tuple_
 from sqlalchemy.orm import Session, joinedload
 
+from app.api.caching import cache_response, cached_response, multi_get_response
 from app.api.dependencies import get_current_user, get_db, get_tarantool
+from app.api.endpoints.likes import liked_post_ids
+from app.core import events
+from app.core.config import settings
+from app.core.mentions import notify_mentions, record_mentions
+from app.core.trending import HASHTAGS_USED
+from app.core.visibility import can_view_post, feed_audience, visible_posts
+from app.db.tarantool import news_feed
+from app.db.tarantool.response_cache import comment_key, post_key, response_cache
 from app.models.comment import Comment
+from app.models.hashtag import PostHashtag, extract_hashtags, normalize_hashtag
 from app.models.like import Like
-from app.models.post import Post
+from app.models.post import POST_SEARCH_CONFIG, Post, PostVisibility, post_search_vector
 from app.models.user import User
-from app.schemas.post import Post as PostSchema, PostCreate, PostUpdate
+from app.schemas.post import Post as PostSchema, PostCreate, PostSearchPage, PostTagPage, PostUpdate
 
 router = APIRouter()
 
+SEARCH_QUERY_MAX_LENGTH = 200
+
+
+def post_counts(db: Session, post_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    Like and comment counts for a set of posts, one grouped query each.
+    """
+    if not post_ids:
+        return {}
+    like_counts = dict(
+        db.query(Like.post_id, func.count(Like.id))
+        .filter(Like.post_id.in_(post_ids), Like.comment_id == None)
+        .group_by(Like.post_id)
+        .all()
+    )
+    comment_counts = dict(
+        db.query(Comment.post_id, func.count(Comment.id))
+        .filter(Comment.post_id.in_(post_ids))
+        .group_by(Comment.post_id)
+        .all()
+    )
+    return {
+        post_id: (like_counts.get(post_id, 0), comment_counts.get(post_id, 0))
+        for post_id in post_ids
+    }
+
+
+def load_posts(db: Session, post_ids: List[int]) -> Dict[int, PostSchema]:
+    """
+    Load posts with their authors and counters using a fixed number of queries.
+    """
+    posts = (
+        db.query(Post)
+        .options(joinedload(Post.user))
+        .filter(Post.id.in_(post_ids))
+        .all()
+    )
+    counts = post_counts(db, [post.id for post in posts])
+    
+    result = {}
+    for post in posts:
+        post_dict = PostSchema.from_orm(post).dict()
+        post_dict["like_count"], post_dict["comment_count"] = counts[post.id]
+        result[post.id] = PostSchema(**post_dict)
+    return result
+
+
+def post_meta(post: Union[Post, PostSchema]) -> Dict[str, Any]:
+    """
+    Author and visibility stored with a cached post for the access check.
+    """
+    return {"user_id": post.user_id, "visibility": post.visibility.value}
+
+
+def feed_data(post: Post, author: User) -> Dict[str, Any]:
+    """
+    Post data stored in the news feeds it is fanned out to.
+    """
+    return {
+        "content": post.content or "",
+        "image_url": post.image_url or "",
+        "user_id": author.id,
+        "username": author.username,
+        "visibility": post.visibility.value,
+    }
+
+
+def set_hashtags(db: Session, post: Post) -> None:
+    """
+    Index the hashtags of a post's content and count the new ones of a
+    public post as trending, both with the transaction of ``db``.
+    """
+    tags = extract_hashtags(post.content)
+    old_tags = {hashtag.tag for hashtag in post.hashtags}
+    added = [tag for tag in tags if tag not in old_tags]
+    post.hashtags = [hashtag for hashtag in post.hashtags if hashtag.tag in tags] + [
+        PostHashtag(tag=tag) for tag in added
+    ]
+    if added and post.visibility == PostVisibility.PUBLIC:
+        events.publish(db, HASHTAGS_USED, {"tags": added})
+
+
+def search_criteria(db: Session, q: str) -> Tuple[Any, Any]:
+    """
+    Match condition and rank of posts for a search query.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Uses the GIN index on post.search_vector
+        ts_query = func.websearch_to_tsquery(POST_SEARCH_CONFIG, q)
+        return post_search_vector.op("@@")(ts_query), func.ts_rank(post_search_vector, ts_query)
+    # Other databases (SQLite in tests): all words as substrings, no ranking
+    words = q.split() or [q]
+    return and_(*[Post.content.ilike(f"%{word}%") for word in words]), literal(0.0)
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        rank, post_id = cursor.split(",")
+        return float(rank), int(post_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.get("/", response_model=List[PostSchema])
 def read_posts(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    ids: Optional[List[int]] = Query(None),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Retrieve posts.
+    Retrieve posts the current user can see.
+    
+    With ``ids`` the given posts are returned in request order; unknown ids are skipped.
     """
+    if ids is not None:
+        if len(ids) > settings.MULTI_GET_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.MULTI_GET_MAX_IDS} ids can be requested at once",
+            )
+        # Cached bodies are shared by all users, check visibility first
+        visible = {
+            post_id for (post_id,) in db.query(Post.id).filter(
+                Post.id.in_(ids), visible_posts(db, current_user.id)
+            )
+        }
+        ids = [post_id for post_id in ids if post_id in visible]
+        return multi_get_response(ids, post_key, lambda missing: {
+            post_id: (post, post_meta(post)) for post_id, post in load_posts(db, missing).items()
+        })
+    
     # Get posts with user information and count likes and comments
     posts = (
         db.query(
@@ -33,6 +165,7 @@ def read_posts(
         )
         .outerjoin(Like, (Like.post_id == Post.id) & (Like.comment_id == None))
         .outerjoin(Comment, Comment.post_id == Post.id)
+        .filter(visible_posts(db, current_user.id))
         .group_by(Post.id)
         .order_by(Post.created_at.desc())
         .offset(skip)
@@ -41,11 +174,13 @@ def read_posts(
     )
     
     # Convert to schema format
+    liked = liked_post_ids(db, current_user.id, [post.id for post, _, _ in posts])
     result = []
     for post, like_count, comment_count in posts:
         post_dict = PostSchema.from_orm(post).dict()
         post_dict["like_count"] = like_count
         post_dict["comment_count"] = comment_count
+        post_dict["liked_by_me"] = post.id in liked
         result.append(PostSchema(**post_dict))
     
     return result
@@ -65,37 +200,109 @@ def create_post(
         user_id=current_user.id,
         content=post_in.content,
         image_url=post_in.image_url,
+        visibility=post_in.visibility,
     )
     db.add(post)
+    set_hashtags(db, post)
+    db.flush()
+    mentioned = record_mentions(db, current_user.id, post, post.content)
     db.commit()
     db.refresh(post)
+    notify_mentions(mentioned)
     
-    # Add to Tarantool cache for news feed
-    try:
-        tarantool = get_tarantool_connection()
-        # Add to user's followers' news feeds
-        # This is a simplified example - in a real app, you'd get the user's followers
-        # and add the post to their feeds
-        tarantool.call(
-            "box.space.news_feed_cache:insert",
-            [current_user.id, post.id, int(post.created_at.timestamp()), {
-                "content": post.content or "",
-                "image_url": post.image_url or "",
-                "user_id": current_user.id,
-                "username": current_user.username
-            }]
-        )
-        tarantool.close()
-    except Exception as e:
-        # Log the error but don't fail the request
-        print(f"Error adding post to Tarantool cache: {e}")
+    # Fan out to the news feeds of the author and their friends; users
+    # hidden from the author are left out here already
+    news_feed.fan_out(
+        feed_audience(db, current_user.id), post.id, int(post.created_at.timestamp()),
+        feed_data(post, current_user)
+    )
     
     return post
 
 
+@router.get("/search", response_model=PostSearchPage)
+def search_posts(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=SEARCH_QUERY_MAX_LENGTH),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Full-text search of posts, best matches first.
+    
+    ``q`` supports quoted phrases, ``or`` and ``-word``. Pages are
+    continued with ``next_cursor`` of the previous one.
+    """
+    match, rank = search_criteria(db, q)
+    query = db.query(Post.id, rank.label("rank")).filter(match, visible_posts(db, current_user.id))
+    if cursor:
+        # Keyset pagination: continue after the last post of the previous page
+        cursor_rank, cursor_id = decode_search_cursor(cursor)
+        # ts_rank is a real, compare with the same precision
+        query = query.filter(tuple_(rank, Post.id) < tuple_(cast(cursor_rank, REAL), cursor_id))
+    rows = query.order_by(rank.desc(), Post.id.desc()).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    post_ids = [post_id for post_id, _ in rows]
+    posts = load_posts(db, post_ids)
+    liked = liked_post_ids(db, current_user.id, post_ids)
+    items = [posts[post_id] for post_id in post_ids if post_id in posts]
+    for post in items:
+        post.liked_by_me = post.id in liked
+    next_cursor = f"{float(rows[-1].rank)!r},{rows[-1].id}" if has_more else None
+    return PostSearchPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/tag/{tag}", response_model=PostTagPage)
+def read_posts_by_tag(
+    *,
+    db: Session = Depends(get_db),
+    tag: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Posts with a hashtag, newest first.
+    
+    ``tag`` is matched case-insensitively, with or without the leading "#".
+    Pages are continued with ``next_cursor`` of the previous one.
+    """
+    tag = normalize_hashtag(tag)
+    if tag is None:
+        raise HTTPException(status_code=400, detail="Invalid hashtag")
+    query = (
+        db.query(PostHashtag.post_id)
+        .join(Post, Post.id == PostHashtag.post_id)
+        .filter(PostHashtag.tag == tag, visible_posts(db, current_user.id))
+    )
+    if cursor:
+        # Keyset pagination on the (tag, post_id) index
+        try:
+            query = query.filter(PostHashtag.post_id < int(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    post_ids = [post_id for (post_id,) in query.order_by(PostHashtag.post_id.desc()).limit(limit + 1)]
+    
+    has_more = len(post_ids) > limit
+    post_ids = post_ids[:limit]
+    
+    posts = load_posts(db, post_ids)
+    liked = liked_post_ids(db, current_user.id, post_ids)
+    items = [posts[post_id] for post_id in post_ids if post_id in posts]
+    for post in items:
+        post.liked_by_me = post.id in liked
+    return PostTagPage(items=items, next_cursor=str(post_ids[-1]) if has_more else None)
+
+
 @router.get("/{post_id}", response_model=PostSchema)
 def read_post(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     post_id: int,
     current_user: User = Depends(get_current_user),
@@ -103,6 +310,16 @@ def read_post(
     """
     Get post by ID.
     """
+    # Serve the rendered body straight from the response cache if possible;
+    # the entry carries the author and visibility for the access check
+    cached, generation = response_cache.get_with_generation(post_key(post_id))
+    if cached is not None and "user_id" in cached.meta:
+        if not can_view_post(
+            db, current_user.id, cached.meta["user_id"], PostVisibility(cached.meta["visibility"])
+        ):
+            raise HTTPException(status_code=404, detail="Post not found")
+        return cached_response(request, cached)
+    
     post = (
         db.query(
             Post,
@@ -120,11 +337,16 @@ def read_post(
         raise HTTPException(status_code=404, detail="Post not found")
     
     post_obj, like_count, comment_count = post
+    if not can_view_post(db, current_user.id, post_obj.user_id, post_obj.visibility):
+        raise HTTPException(status_code=404, detail="Post not found")
     post_dict = PostSchema.from_orm(post_obj).dict()
     post_dict["like_count"] = like_count
     post_dict["comment_count"] = comment_count
     
-    return PostSchema(**post_dict)
+    return cache_response(
+        request, post_key(post_id), PostSchema(**post_dict),
+        post_meta(post_obj), generation
+    )
 
 
 @router.put("/{post_id}", response_model=PostSchema)
@@ -147,29 +369,14 @@ def update_post(
     update_data = post_in.dict(exclude_unset=True)
     for field in update_data:
         setattr(post, field, update_data[field])
+    if "content" in update_data:
+        set_hashtags(db, post)
     
     db.add(post)
     db.commit()
     db.refresh(post)
-    
-    # Update in Tarantool cache
-    try:
-        tarantool = get_tarantool_connection()
-        tarantool.call(
-            "box.space.news_feed_cache:update",
-            [[current_user.id, post.id], [
-                ["=", 4, {
-                    "content": post.content or "",
-                    "image_url": post.image_url or "",
-                    "user_id": current_user.id,
-                    "username": current_user.username
-                }]
-            ]]
-        )
-        tarantool.close()
-    except Exception as e:
-        # Log the error but don't fail the request
-        print(f"Error updating post in Tarantool cache: {e}")
+    response_cache.invalidate_post(post.id)
+    news_feed.update_post(post.id, feed_data(post, post.user))
     
     return post
 
@@ -190,20 +397,15 @@ def delete_post(
     if post.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Delete from Tarantool cache
-    try:
-        tarantool = get_tarantool_connection()
-        tarantool.call(
-            "box.space.news_feed_cache:delete",
-            [current_user.id, post.id]
-        )
-        tarantool.close()
-    except Exception as e:
-        # Log the error but don't fail the request
-        print(f"Error deleting post from Tarantool cache: {e}")
+    news_feed.delete_post(post.id)
+    
+    # Comments are deleted together with the post
+    comment_ids = [comment_id for (comment_id,) in db.query(Comment.id).filter(Comment.post_id == post_id)]
     
     db.delete(post)
     db.commit()
+    response_cache.invalidate_post(post_id)
+    response_cache.invalidate(*[comment_key(comment_id) for comment_id in comment_ids])
     
     return post
 
@@ -218,7 +420,7 @@ def read_user_posts(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Get posts by user ID.
+    Get posts by user ID that the current user can see.
     """
     # Check if user exists
     user = db.query(User).filter(User.id == user_id).first()
@@ -234,7 +436,7 @@ def read_user_posts(
         )
         .outerjoin(Like, (Like.post_id == Post.id) & (Like.comment_id == None))
         .outerjoin(Comment, Comment.post_id == Post.id)
-        .filter(Post.user_id == user_id)
+        .filter(Post.user_id == user_id, visible_posts(db, current_user.id))
         .group_by(Post.id)
         .order_by(Post.created_at.desc())
         .offset(skip)
@@ -243,11 +445,13 @@ def read_user_posts(
     )
     
     # Convert to schema format
+    liked = liked_post_ids(db, current_user.id, [post.id for post, _, _ in posts])
     result = []
     for post, like_count, comment_count in posts:
         post_dict = PostSchema.from_orm(post).dict()
         post_dict["like_count"] = like_count
         post_dict["comment_count"] = comment_count
+        post_dict["liked_by_me"] = post.id in liked
         result.append(PostSchema(**post_dict))
     
     return result
\ No newline at end of file
@@ -0,0 +1,54 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user_id, get_db
+from app.core.config import settings
+from app.core.visibility import hidden_user_ids
+from app.db.tarantool import presence
+from app.schemas.presence import Presence
+
+router = APIRouter()
+
+
+@router.post("/heartbeat", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
+def heartbeat(
+    *,
+    current_user_id: int = Depends(get_current_user_id),
+) -> Response:
+    """
+    Mark the current user as online for PRESENCE_TTL_SECONDS.
+
+    Only the token is checked, no database query is made. Clients without
+    an open WebSocket or event stream call this every ~30 seconds.
+    """
+    presence.touch(current_user_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/", response_model=List[Presence])
+def read_presence(
+    *,
+    db: Session = Depends(get_db),
+    user_ids: List[int] = Query(...),
+    current_user_id: int = Depends(get_current_user_id),
+) -> Any:
+    """
+    Get online status and last seen time of several users in request order.
+    
+    Users hidden by a block are shown offline without a last seen time.
+    """
+    if len(user_ids) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MULTI_GET_MAX_IDS} ids can be requested at once",
+        )
+    hidden = hidden_user_ids(db, current_user_id)
+    found = presence.get_presence([user_id for user_id in user_ids if user_id not in hidden])
+    return [
+        Presence(user_id=user_id, **found[user_id]._asdict()) if user_id in found
+        else Presence(user_id=user_id)
+        for user_id in dict.fromkeys(user_ids)
+    ]
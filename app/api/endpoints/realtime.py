@@ -0,0 +1,180 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.requests import HTTPConnection
+
+from app.api.dependencies import get_user_from_token
+from app.core.config import settings
+from app.core.hub import hub
+from app.db.postgresql.session import SessionLocal
+from app.db.tarantool import presence
+
+router = APIRouter()
+
+
+def authenticate_token(token: str) -> int:
+    """
+    Resolve a token to a user id with a short-lived session, so that no
+    database connection is held for the lifetime of a stream.
+    """
+    db = SessionLocal()
+    try:
+        return get_user_from_token(db, token).id
+    finally:
+        db.close()
+
+
+def bearer_token(connection: HTTPConnection) -> Optional[str]:
+    """
+    Token from the Bearer Authorization header.
+    """
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" and credentials else None
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    data = json.dumps(message["data"], separators=(",", ":"))
+    return f"id: {message['id']}\nevent: {message['type']}\ndata: {data}\n\n"
+
+
+async def keep_online(user_id: int) -> None:
+    """
+    Refresh the user's presence while a stream is open, so that connected
+    clients do not have to send heartbeats.
+    """
+    while True:
+        await run_in_threadpool(presence.touch, user_id)
+        await asyncio.sleep(settings.PRESENCE_TTL_SECONDS / 2)
+
+
+async def drain(websocket: WebSocket) -> None:
+    """
+    Read and ignore client frames until the client disconnects.
+    """
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, token: Optional[str] = None) -> None:
+    """
+    Push events of the current user (new messages, ...) over a WebSocket.
+
+    The access token is passed in a Bearer Authorization header or, as
+    browsers cannot set headers on the handshake, the ``token`` query
+    parameter. The user is shown online while the
+    socket is open. Every frame is a JSON object with ``id``,
+    ``type`` and ``data``. A client that cannot keep up is closed with
+    code 1013 and should reconnect and reload what it missed through the
+    REST API.
+    """
+    token = token or bearer_token(websocket)
+    if not token:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        user_id = await run_in_threadpool(authenticate_token, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = hub.subscribe(user_id)
+    receiver = asyncio.create_task(drain(websocket))
+    heartbeat = asyncio.create_task(keep_online(user_id))
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                # Client went away
+                getter.cancel()
+                break
+            message = getter.result()
+            if message is None:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                break
+            frame = {key: value for key, value in message.items() if key != "users"}
+            await asyncio.wait_for(
+                websocket.send_json(frame), settings.REALTIME_SEND_TIMEOUT_SECONDS
+            )
+    except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError):
+        pass
+    finally:
+        hub.unsubscribe(subscription)
+        receiver.cancel()
+        heartbeat.cancel()
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+) -> Any:
+    """
+    Server-Sent Events stream of the current user's notifications.
+
+    The token is only accepted in the Authorization header: unlike the
+    WebSocket handshake, a long-lived GET with the token in its URL would
+    leave it in every access log on the way.
+
+    A reconnecting EventSource sends ``Last-Event-ID`` and gets the events
+    it missed from a short per-user buffer; if that event is no longer
+    buffered a ``reset`` event tells the client to reload its state.
+    Idle streams only receive a comment line every
+    REALTIME_HEARTBEAT_SECONDS and hold no database connection. The user
+    is shown online while the stream is open.
+    """
+    token = bearer_token(request)
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    user_id = await run_in_threadpool(authenticate_token, token)
+
+    async def stream():
+        # Subscribing and reading the buffer without awaiting in between
+        # means no event can be missed or sent twice
+        subscription = hub.subscribe(user_id)
+        missed = hub.replay(user_id, last_event_id) if last_event_id else []
+        heartbeat = asyncio.create_task(keep_online(user_id))
+        try:
+            yield f"retry: {settings.REALTIME_RECONNECT_MILLISECONDS}\n\n"
+            if missed is None:
+                yield "event: reset\ndata: {}\n\n"
+            for message in missed or []:
+                yield format_sse(message)
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(), settings.REALTIME_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is None:
+                    # Too slow: the client reconnects and resumes from the buffer
+                    break
+                yield format_sse(message)
+        finally:
+            hub.unsubscribe(subscription)
+            heartbeat.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,25 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_current_user_id
+from app.core.config import settings
+from app.core.trending import trending_tags
+from app.schemas.hashtag import TrendingTag
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[TrendingTag])
+def read_trending(
+    *,
+    limit: int = Query(settings.TRENDING_TOP_K, ge=1, le=settings.TRENDING_TOP_K),
+    current_user_id: int = Depends(get_current_user_id),
+) -> Any:
+    """
+    Most used hashtags of public posts in the last TRENDING_WINDOW_SECONDS.
+    
+    Served from the in-memory counters of the worker, no database query is
+    made. Counts are estimates and may be slightly too high.
+    """
+    return [TrendingTag(tag=tag, count=count) for tag, count in trending_tags.top(limit)]
@@ -1,27 +1,95 @@
-from typing import Any, List
+from typing import Any, List, Optional, Union
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_current_active_superuser, get_current_user, get_db
+from app.api.caching import invalidate_user_profile, multi_get_response
+from app.api.dependencies import (
+    get_current_active_superuser,
+    get_current_user,
+    get_current_user_id,
+    get_db,
+)
+from app.core import events
+from app.core.config import settings
 from app.core.security import get_password_hash
+from app.core.user_index import USER_CHANGED, user_index
+from app.core.visibility import hidden_user_ids
+from app.db.tarantool.response_cache import response_cache, user_key
+from app.models.friendship import friend_edges
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
+from app.schemas.user import UserBasic, UserCreate, UserSuggestion, UserUpdate, User as UserSchema
 
 router = APIRouter()
 
+SUGGEST_QUERY_MAX_LENGTH = 50
 
-@router.get("/", response_model=List[UserSchema])
+
+def publish_user_changed(db: Session, user: User) -> None:
+    """
+    Let every worker update its user prefix index after commit.
+    """
+    events.publish(db, USER_CHANGED, {
+        "id": user.id,
+        "username": user.username,
+        "full_name": user.full_name,
+        "avatar_url": user.avatar_url,
+        "is_active": user.is_active,
+    })
+
+
+def invalidate_profile(db: Session, user: User, before: UserBasic) -> None:
+    """
+    Drop the cached profile of an updated user, and the cached posts and
+    comments embedding it if the public profile changed.
+    """
+    if UserBasic.from_orm(user) != before:
+        invalidate_user_profile(db, user.id)
+    else:
+        response_cache.invalidate(user_key(user.id))
+
+
+@router.get("/", response_model=Union[List[UserSchema], List[UserBasic]])
 def read_users(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_active_superuser),
+    ids: Optional[List[int]] = Query(None),
+    current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Retrieve users. Only for superusers.
+    
+    With ``ids`` any user can fetch public profiles of the given users in
+    request order; unknown, inactive and blocked users are skipped.
     """
+    if ids is not None:
+        if len(ids) > settings.MULTI_GET_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.MULTI_GET_MAX_IDS} ids can be requested at once",
+            )
+        # Cached profiles are shared by all users, drop inactive and hidden users first
+        hidden = hidden_user_ids(db, current_user.id)
+        active = {
+            user_id for (user_id,) in db.query(User.id).filter(User.id.in_(ids), User.is_active == True)
+        }
+        ids = [user_id for user_id in ids if user_id in active and user_id not in hidden]
+        return multi_get_response(
+            ids,
+            user_key,
+            lambda missing: {
+                user.id: (UserBasic.from_orm(user), {})
+                for user in db.query(User).filter(User.id.in_(missing)).all()
+            },
+        )
+    
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=400, detail="The user doesn't have enough privileges"
+        )
     users = db.query(User).offset(skip).limit(limit).all()
     return users
 
@@ -56,11 +124,67 @@ def create_user(
         avatar_url=user_in.avatar_url,
     )
     db.add(user)
+    db.flush()
+    publish_user_changed(db, user)
     db.commit()
     db.refresh(user)
     return user
 
 
+@router.get("/suggest", response_model=List[UserSuggestion])
+def suggest_users(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=SUGGEST_QUERY_MAX_LENGTH),
+    limit: int = Query(10, ge=1, le=50),
+    current_user_id: int = Depends(get_current_user_id),
+) -> Any:
+    """
+    Autocomplete users by the beginning of the username or a word of the
+    full name, friends first.
+    
+    Served from the in-memory prefix index of the worker; the only query
+    is the one for the friend ids. Users hidden from the current user by a
+    block are left out.
+    """
+    edges = friend_edges()
+    friend_ids = db.execute(
+        select(edges.c.friend_id).where(edges.c.user_id == current_user_id)
+    ).scalars().all()
+    friends = set(friend_ids)
+    hidden = hidden_user_ids(db, current_user_id)
+    
+    if not user_index.loaded:
+        # Index is still loading: plain prefix search in PostgreSQL
+        pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        users = db.query(User).filter(
+            User.is_active == True,
+            User.id != current_user_id,
+            User.id.not_in(hidden),
+            or_(User.username.ilike(pattern, escape="\\"), User.full_name.ilike(pattern, escape="\\")),
+        ).order_by(User.username).limit(limit).all()
+        users.sort(key=lambda user: user.id not in friends)
+        return [
+            UserSuggestion(**UserBasic.from_orm(user).dict(), is_friend=user.id in friends)
+            for user in users
+        ]
+    
+    result = []
+    # Hidden users are dropped after the search, ask for enough to fill the page
+    user_ids = user_index.search(q, limit + len(hidden), friend_ids, exclude_id=current_user_id)
+    for user_id in [user_id for user_id in user_ids if user_id not in hidden][:limit]:
+        user = user_index.get(user_id)
+        if user is not None:
+            result.append(UserSuggestion(
+                id=user_id,
+                username=user.username,
+                full_name=user.full_name,
+                avatar_url=user.avatar_url,
+                is_friend=user_id in friends,
+            ))
+    return result
+
+
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
     current_user: User = Depends(get_current_user),
@@ -99,6 +223,7 @@ def update_user_me(
     
     user_data = jsonable_encoder(current_user)
     update_data = user_in.dict(exclude_unset=True)
+    profile = UserBasic.from_orm(current_user)
     
     if update_data.get("password"):
         hashed_password = get_password_hash(update_data["password"])
@@ -110,8 +235,10 @@ def update_user_me(
             setattr(current_user, field, update_data[field])
     
     db.add(current_user)
+    publish_user_changed(db, current_user)
     db.commit()
     db.refresh(current_user)
+    invalidate_profile(db, current_user, profile)
     return current_user
 
 
@@ -125,7 +252,7 @@ def read_user_by_id(
     Get a specific user by id.
     """
     user = db.query(User).filter(User.id == user_id).first()
-    if user == current_user:
+    if user is not None and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -170,6 +297,7 @@ def update_user(
     
     user_data = jsonable_encoder(user)
     update_data = user_in.dict(exclude_unset=True)
+    profile = UserBasic.from_orm(user)
     
     if update_data.get("password"):
         hashed_password = get_password_hash(update_data["password"])
@@ -181,6 +309,8 @@ def update_user(
             setattr(user, field, update_data[field])
     
     db.add(user)
+    publish_user_changed(db, user)
     db.commit()
     db.refresh(user)
+    invalidate_profile(db, user, profile)
     return user
\ No newline at end of file
@@ -0,0 +1,60 @@
+import hashlib
+import math
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+WORD_BITS = 64
+
+
+class BloomParameters(NamedTuple):
+    bits: int
+    hashes: int
+
+    @property
+    def words(self) -> int:
+        return self.bits // WORD_BITS
+
+
+def bloom_parameters(capacity: int, false_positive_rate: float) -> BloomParameters:
+    """
+    Size and hash count of a Bloom filter holding ``capacity`` items at the
+    given false positive rate; the size is rounded up to whole 64-bit words.
+    """
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    bits = max(WORD_BITS, math.ceil(bits / WORD_BITS) * WORD_BITS)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return BloomParameters(bits, hashes)
+
+
+def bit_positions(item: int, parameters: BloomParameters) -> List[int]:
+    """
+    Bits of an item, by double hashing of one 128-bit digest.
+    """
+    digest = hashlib.blake2b(item.to_bytes(8, "little", signed=True), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    second = int.from_bytes(digest[8:], "little") | 1
+    return [(first + i * second) % parameters.bits for i in range(parameters.hashes)]
+
+
+def word_masks(items: Iterable[int], parameters: BloomParameters) -> Dict[int, int]:
+    """
+    Bits to set for several items, as word index -> OR mask.
+    """
+    masks: Dict[int, int] = {}
+    for item in items:
+        for position in bit_positions(item, parameters):
+            index = position // WORD_BITS
+            masks[index] = masks.get(index, 0) | (1 << (position % WORD_BITS))
+    return masks
+
+
+def contains(words: Sequence[int], item: int, parameters: BloomParameters) -> bool:
+    """
+    Whether a filter stored as 64-bit words may contain an item; False
+    positives happen at the configured rate, false negatives never.
+    """
+    if len(words) != parameters.words:
+        return False
+    return all(
+        words[position // WORD_BITS] >> (position % WORD_BITS) & 1
+        for position in bit_positions(item, parameters)
+    )
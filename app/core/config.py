@@ -53,5 +53,108 @@ class Settings(BaseSettings):
     TARANTOOL_USER: str
     TARANTOOL_PASSWORD: str
 
+    # Rendered response cache (Tarantool L2 + in-process L1)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    # L1 entries are not invalidated across workers, keep them short-lived
+    RESPONSE_CACHE_L1_TTL_SECONDS: int = 2
+    RESPONSE_CACHE_L1_MAX_ENTRIES: int = 10000
+    # First pages of comments are cached only for these page sizes
+    RESPONSE_CACHE_COMMENT_PAGE_SIZES: List[int] = [20, 50, 100]
+
+    # Maximum number of ids accepted by the multi-get endpoints
+    MULTI_GET_MAX_IDS: int = 100
+
+    # Maximum number of sub-requests in one POST /batch call
+    BATCH_MAX_REQUESTS: int = 20
+
+    # Badge counters are recomputed from Postgres this often, 0 disables it
+    BADGE_RECONCILE_INTERVAL_SECONDS: int = 600
+
+    # Real-time events (WebSocket), fanned out across workers with LISTEN/NOTIFY
+    EVENTS_CHANNEL: str = "social_events"
+    # Events buffered per connection before a slow client is disconnected
+    REALTIME_QUEUE_SIZE: int = 100
+    REALTIME_SEND_TIMEOUT_SECONDS: int = 10
+    # Recent events kept per user for Last-Event-ID resume of GET /events
+    REALTIME_REPLAY_SIZE: int = 50
+    # Upper bound of the event data held in that buffer by each worker
+    REALTIME_REPLAY_MAX_BYTES: int = 32 * 1024 * 1024
+    REALTIME_HEARTBEAT_SECONDS: int = 15
+    REALTIME_RECONNECT_MILLISECONDS: int = 3000
+
+    # Notifications of one kind on one target are coalesced within this window
+    NOTIFICATION_WINDOW_SECONDS: int = 3600
+    # Number of recent actors kept on a coalesced notification
+    NOTIFICATION_SAMPLE_SIZE: int = 3
+    # Buffered notification events are written in one statement this often
+    NOTIFICATION_FLUSH_INTERVAL_SECONDS: float = 2
+    NOTIFICATION_BUFFER_MAX_ENTRIES: int = 5000
+
+    # Latest messages of each conversation kept in Tarantool
+    # (at least the default page size of GET /messages/)
+    RECENT_MESSAGES_SIZE: int = 100
+
+    # Friends of friends kept per user for GET /friendships/suggestions
+    FRIEND_SUGGESTIONS_SIZE: int = 50
+    # Users per sparse matrix product of the full computation
+    FRIEND_SUGGESTIONS_BATCH_SIZE: int = 1000
+    # Accepted and removed friendships are applied to the suggestions this often
+    FRIEND_SUGGESTIONS_UPDATE_INTERVAL_SECONDS: float = 5
+    # Cached friend id lists (mutual friends) are reloaded after this long
+    FRIEND_IDS_CACHE_TTL_SECONDS: int = 3600
+
+    # Memory-mapped friendship graph snapshots (app/scripts/build_graph_snapshot.py)
+    GRAPH_SNAPSHOT_DIR: str = "data/graph"
+    # Workers check for a new snapshot this often
+    GRAPH_RELOAD_INTERVAL_SECONDS: float = 30
+    # Changes published up to this long before a snapshot started are kept
+    # on top of it, in case they were committed after it read the table
+    GRAPH_DELTA_MARGIN_SECONDS: float = 60
+
+    # A user is shown online this long after the last heartbeat or
+    # WebSocket/SSE activity (clients send a heartbeat every ~30 seconds)
+    PRESENCE_TTL_SECONDS: int = 60
+
+    # Cached block lists are reloaded after this long
+    BLOCK_LISTS_CACHE_TTL_SECONDS: int = 3600
+    # Invalidations of cached keys are remembered this long; a cache load
+    # running longer could write back rows read before the invalidation
+    CACHE_GENERATION_TTL_SECONDS: int = 600
+    # Feeds written per Tarantool call when a post is fanned out
+    FEED_FAN_OUT_BATCH_SIZE: int = 1000
+    # Posts a seen posts filter generation holds at FEED_SEEN_FALSE_POSITIVE_RATE
+    FEED_SEEN_CAPACITY: int = 2000
+    FEED_SEEN_FALSE_POSITIVE_RATE: float = 0.01
+    # A new filter generation is started this often; posts are remembered for one to two periods
+    FEED_SEEN_ROTATION_SECONDS: int = 86400
+    # Newest feed entries scored by GET /feed/?ranked=true
+    FEED_RANK_CANDIDATES: int = 500
+    # Ranking weights: author affinity, log engagement, recency half-life
+    # and the factor applied to posts the user has seen
+    FEED_RANK_AFFINITY_WEIGHT: float = 1.0
+    FEED_RANK_ENGAGEMENT_WEIGHT: float = 0.3
+    FEED_RANK_HALF_LIFE_HOURS: float = 12
+    FEED_RANK_SEEN_PENALTY: float = 0.1
+    # Affinity is computed from messages and likes of this many days
+    # (app/scripts/compute_feed_affinity.py), keeping the top authors per user
+    FEED_AFFINITY_DAYS: int = 90
+    FEED_AFFINITY_SIZE: int = 200
+    # Stored affinities expire if the computation stops running
+    FEED_AFFINITY_TTL_SECONDS: int = 172800
+
+    # Trending hashtags: top TRENDING_TOP_K tags of the last TRENDING_WINDOW_SECONDS,
+    # counted in TRENDING_BUCKET_SECONDS buckets of count-min sketches
+    TRENDING_TOP_K: int = 20
+    TRENDING_WINDOW_SECONDS: int = 3600
+    TRENDING_BUCKET_SECONDS: int = 300
+    TRENDING_SKETCH_WIDTH: int = 2048
+    TRENDING_SKETCH_DEPTH: int = 4
+    # Workers save their trending counters to Tarantool this often
+    TRENDING_CHECKPOINT_INTERVAL_SECONDS: float = 60
+
+    # Count new @mentions in the unread_mentions badge
+    MENTION_BADGES_ENABLED: bool = True
+
 
 settings = Settings()
\ No newline at end of file
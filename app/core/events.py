@@ -0,0 +1,136 @@
+import json
+import logging
+import secrets
+import select
+import threading
+from typing import Any, Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.hub import hub
+from app.db.postgresql.session import engine
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes and more
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+LISTEN_RETRY_SECONDS = 2
+
+# Session.info key of the events waiting for the commit (non-PostgreSQL only)
+PENDING_EVENTS_KEY = "pending_events"
+
+
+def publish(
+    db: Session, event_type: str, data: Any, user_ids: Optional[Iterable[int]] = None
+) -> None:
+    """
+    Publish an event to every worker once the transaction of ``db`` commits.
+
+    On PostgreSQL the event is sent with NOTIFY inside the transaction, so
+    it is delivered exactly when the write becomes visible and never for a
+    rolled back one. Other databases (SQLite in tests) deliver it to the
+    current worker after commit. ``user_ids`` are the users whose connected
+    clients receive the event; None makes it an internal broadcast.
+    """
+    message = {
+        "id": secrets.token_hex(8),
+        "type": event_type,
+        "users": sorted(set(user_ids)) if user_ids is not None else None,
+        "data": jsonable_encoder(data),
+    }
+    if db.get_bind().dialect.name != "postgresql":
+        db.info.setdefault(PENDING_EVENTS_KEY, []).append(message)
+        return
+
+    payload = json.dumps(message, separators=(",", ":"))
+    if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+        # Too large for NOTIFY: send a reference, the client loads the rest
+        data = message["data"]
+        message["data"] = {"id": data.get("id")} if isinstance(data, dict) else None
+        message["truncated"] = True
+        payload = json.dumps(message, separators=(",", ":"))
+    db.execute(sql_select(func.pg_notify(settings.EVENTS_CHANNEL, payload)))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending_events(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    for message in session.info.pop(PENDING_EVENTS_KEY, []):
+        hub.dispatch_threadsafe(message)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_events(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+class EventListener(threading.Thread):
+    """
+    Receives the events of all workers with LISTEN on a dedicated
+    PostgreSQL connection and hands them to the hub of this worker.
+    """
+
+    def __init__(self):
+        super().__init__(name="event-listener", daemon=True)
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(f"Event listener disconnected: {e}")
+                self._stopped.wait(LISTEN_RETRY_SECONDS)
+
+    def _listen(self) -> None:
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        conn = engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {settings.EVENTS_CHANNEL}")
+            while not self._stopped.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        hub.dispatch_threadsafe(json.loads(notify.payload))
+                    except ValueError:
+                        logger.warning(f"Malformed event payload: {notify.payload[:100]}")
+        finally:
+            conn.close()
+
+
+_listener: Optional[EventListener] = None
+
+
+def start_event_listener(loop) -> None:
+    """
+    Attach the hub to the event loop and start listening for events.
+    """
+    global _listener
+    hub.attach(loop)
+    if engine.dialect.name != "postgresql":
+        return
+    _listener = EventListener()
+    _listener.start()
+
+
+def stop_event_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=LISTEN_RETRY_SECONDS)
+        _listener = None
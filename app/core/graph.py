@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.core.hub import hub
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FRIENDSHIP_CHANGED = "friendship.changed"
+
+CURRENT_LINK = "current"
+OFFSETS_FILE = "offsets.npy"
+NEIGHBORS_FILE = "neighbors.npy"
+META_FILE = "meta.json"
+
+
+class GraphSnapshot(NamedTuple):
+    path: str
+    created_at: float
+    # Friends of user u are neighbors[offsets[u]:offsets[u + 1]], ascending
+    offsets: np.ndarray
+    neighbors: np.ndarray
+
+
+def write_snapshot(
+    directory: str, adjacency: sparse.csr_matrix, created_at: float, keep: int = 2
+) -> str:
+    """
+    Write the friendship graph as CSR arrays and make it the current snapshot.
+
+    The arrays are written to a new directory that is then published by
+    atomically replacing the ``current`` symlink, so a worker never sees a
+    half-written snapshot. Only the newest ``keep`` snapshots are kept;
+    workers that still map a deleted one keep reading it until they reload.
+    ``created_at`` is when the friendships were read.
+    """
+    adjacency.sort_indices()
+    os.makedirs(directory, exist_ok=True)
+    name = f"snapshot-{int(created_at * 1000)}"
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, OFFSETS_FILE), adjacency.indptr.astype(np.int64))
+    np.save(os.path.join(tmp_path, NEIGHBORS_FILE), adjacency.indices.astype(np.int32))
+    with open(os.path.join(tmp_path, META_FILE), "w") as f:
+        json.dump({"created_at": created_at, "users": adjacency.shape[0], "edges": adjacency.nnz // 2}, f)
+    path = os.path.join(directory, name)
+    os.rename(tmp_path, path)
+
+    link = os.path.join(directory, f".{CURRENT_LINK}.{os.getpid()}.tmp")
+    os.symlink(name, link)
+    os.replace(link, os.path.join(directory, CURRENT_LINK))
+
+    snapshots = sorted(entry for entry in os.listdir(directory) if entry.startswith("snapshot-"))
+    for old in snapshots[:-keep]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+    return path
+
+
+def open_snapshot(path: str) -> GraphSnapshot:
+    """
+    Map the arrays of a snapshot read-only; pages are shared by every
+    process through the OS page cache and read in on first access.
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    return GraphSnapshot(
+        path=path,
+        created_at=meta["created_at"],
+        offsets=np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r"),
+        neighbors=np.load(os.path.join(path, NEIGHBORS_FILE), mmap_mode="r"),
+    )
+
+
+class SocialGraph:
+    """
+    Accepted friendships of all users, for graph reads without SQL.
+
+    Reads a memory-mapped snapshot written by
+    app/scripts/build_graph_snapshot.py, overlaid with the friendships
+    changed since: the friendship endpoints publish ``friendship.changed``
+    events and every worker records the latest state of each changed pair
+    in a small delta log. Entries are dropped once a snapshot started after
+    them (minus ``GRAPH_DELTA_MARGIN_SECONDS`` for commit lag) is loaded,
+    so the log only holds the changes since the last snapshot. A worker
+    started after a change misses it until the next snapshot.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._snapshot: Optional[GraphSnapshot] = None
+        # user id -> friend id -> (accepted, changed_at), both directions.
+        # Inner dicts are replaced, never changed, so readers in the
+        # threadpool can iterate them without the lock
+        self._delta: Dict[int, Dict[int, Tuple[bool, float]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def delta_size(self) -> int:
+        with self._lock:
+            return sum(len(changes) for changes in self._delta.values()) // 2
+
+    def reload(self) -> bool:
+        """
+        Switch to the current snapshot if it changed; returns whether it did.
+        """
+        try:
+            path = os.path.realpath(os.path.join(self.directory, CURRENT_LINK))
+            if not os.path.isdir(path):
+                return False
+            if self._snapshot is not None and self._snapshot.path == path:
+                return False
+            snapshot = open_snapshot(path)
+        except Exception as e:
+            logger.warning(f"Error opening graph snapshot: {e}")
+            return False
+
+        threshold = snapshot.created_at - settings.GRAPH_DELTA_MARGIN_SECONDS
+        with self._lock:
+            self._snapshot = snapshot
+            for user_id in list(self._delta):
+                changes = {
+                    friend_id: change for friend_id, change in self._delta[user_id].items()
+                    if change[1] >= threshold
+                }
+                if changes:
+                    self._delta[user_id] = changes
+                else:
+                    del self._delta[user_id]
+        logger.info(f"Loaded graph snapshot {path}, {self.delta_size} changes since")
+        return True
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Hub handler of ``friendship.changed`` events."""
+        data = event.get("data") or {}
+        if "user_id" not in data:
+            return
+        user_id, friend_id = data["user_id"], data["friend_id"]
+        change = (bool(data["accepted"]), data["changed_at"])
+        with self._lock:
+            self._delta[user_id] = {**self._delta.get(user_id, {}), friend_id: change}
+            self._delta[friend_id] = {**self._delta.get(friend_id, {}), user_id: change}
+
+    def friend_ids(self, user_id: int) -> Optional[np.ndarray]:
+        """
+        Ascending friend ids of a user, or None without a snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        if user_id + 1 < len(snapshot.offsets):
+            friends = snapshot.neighbors[snapshot.offsets[user_id]:snapshot.offsets[user_id + 1]]
+        else:
+            friends = np.empty(0, dtype=np.int32)
+        changes = self._delta.get(user_id)
+        if not changes:
+            return friends
+        removed = [friend_id for friend_id, (accepted, _) in changes.items() if not accepted]
+        added = [friend_id for friend_id, (accepted, _) in changes.items() if accepted]
+        friends = np.setdiff1d(friends, removed, assume_unique=True)
+        return np.union1d(friends, np.array(added, dtype=np.int32))
+
+    def are_friends(self, user_id: int, other_id: int) -> Optional[bool]:
+        """
+        Whether two users are friends, or None without a snapshot.
+        """
+        changes = self._delta.get(user_id)
+        if changes and other_id in changes:
+            return changes[other_id][0]
+        friends = self.friend_ids(user_id)
+        if friends is None:
+            return None
+        position = np.searchsorted(friends, other_id)
+        return bool(position < len(friends) and friends[position] == other_id)
+
+    def adjacency(self) -> Optional[sparse.csr_matrix]:
+        """
+        The snapshot (without the delta log) as a sparse adjacency matrix.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        size = len(snapshot.offsets) - 1
+        return sparse.csr_matrix(
+            (np.ones(len(snapshot.neighbors), dtype=np.int32), snapshot.neighbors, snapshot.offsets),
+            shape=(size, size),
+        )
+
+
+social_graph = SocialGraph(settings.GRAPH_SNAPSHOT_DIR)
+hub.add_handler(FRIENDSHIP_CHANGED, social_graph.apply_event)
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough cost of a buffered event besides its serialized data (dict, id, type)
+EVENT_OVERHEAD_BYTES = 200
+
+
+class Subscription:
+    """
+    Events of one user for one connected client.
+
+    The queue is bounded: a consumer that falls more than ``queue_size``
+    events behind is cut off instead of buffering without limit, and the
+    client is expected to reconnect and catch up through the REST API.
+    """
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event: Dict[str, Any]) -> bool:
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Drop the backlog and wake the consumer with the end marker
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next event, or None once the subscription overflowed."""
+        return await self.queue.get()
+
+
+class ConnectionHub:
+    """
+    Per-worker registry of connected clients.
+
+    Events arrive from the event bus (app.core.events) on any thread and
+    are dispatched on the event loop to the subscriptions of their
+    recipients. Handlers registered with ``add_handler`` see every event
+    and are used to keep in-process state in sync across workers.
+
+    The last ``replay_size`` events of each user are kept for resuming a
+    stream. Every worker receives all events in commit order, so a client
+    can resume on any worker as long as its last event is still buffered.
+    The buffer holds at most about ``replay_max_bytes`` of event data:
+    beyond that the oldest events of the least recently active users are
+    dropped first.
+    """
+
+    def __init__(self, queue_size: int, replay_size: int = 0, replay_max_bytes: int = 0):
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.replay_max_bytes = replay_max_bytes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], Any]]] = defaultdict(list)
+        # user id -> deque of (size, event), least recently active first
+        self._recent: "OrderedDict[int, deque]" = OrderedDict()
+        self._recent_bytes = 0
+
+        self.events_dispatched = 0
+        self.events_delivered = 0
+        self.overflows = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def subscribe(self, user_id: int) -> Subscription:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def is_online(self, user_id: int) -> bool:
+        return user_id in self._subscriptions
+
+    def add_handler(self, event_type: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Call ``handler`` in the event loop for every event of this type."""
+        self._handlers[event_type].append(handler)
+
+    def _remember(self, user_id: int, event: Dict[str, Any], size: int) -> None:
+        recent = self._recent.get(user_id)
+        if recent is None:
+            recent = self._recent[user_id] = deque()
+        else:
+            self._recent.move_to_end(user_id)
+        recent.append((size, event))
+        self._recent_bytes += size
+        if len(recent) > self.replay_size:
+            self._recent_bytes -= recent.popleft()[0]
+        while self._recent_bytes > self.replay_max_bytes:
+            oldest_id, oldest = next(iter(self._recent.items()))
+            self._recent_bytes -= oldest.popleft()[0]
+            if not oldest:
+                del self._recent[oldest_id]
+
+    def replay(self, user_id: int, last_event_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events of a user after ``last_event_id``, or None if that event is
+        no longer buffered and the client has to reload its state.
+        """
+        recent = [event for _, event in self._recent.get(user_id, ())]
+        for position, event in enumerate(recent):
+            if event.get("id") == last_event_id:
+                return recent[position + 1:]
+        return None
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        """Deliver an event; must run in the event loop thread."""
+        self.events_dispatched += 1
+        for handler in self._handlers.get(event["type"], []):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Event handler for {event['type']} failed: {e}")
+        users = event.get("users") or []
+        if self.replay_size and users:
+            # Counted once per recipient: an upper bound of the memory held
+            size = EVENT_OVERHEAD_BYTES + len(json.dumps(event.get("data"), separators=(",", ":")))
+        for user_id in users:
+            if self.replay_size:
+                self._remember(user_id, event, size)
+            for subscription in list(self._subscriptions.get(user_id, ())):
+                if subscription.overflowed:
+                    continue
+                if subscription.push(event):
+                    self.events_delivered += 1
+                else:
+                    self.overflows += 1
+
+    def dispatch_threadsafe(self, event: Dict[str, Any]) -> None:
+        """Deliver an event from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # No event loop yet (scripts, tests): only handlers can run
+            self.dispatch(event)
+        else:
+            loop.call_soon_threadsafe(self.dispatch, event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users_online": len(self._subscriptions),
+            "connections": sum(len(s) for s in self._subscriptions.values()),
+            "events_dispatched": self.events_dispatched,
+            "events_delivered": self.events_delivered,
+            "overflows": self.overflows,
+            "replay_users": len(self._recent),
+            "replay_bytes": self._recent_bytes,
+        }
+
+
+hub = ConnectionHub(
+    queue_size=settings.REALTIME_QUEUE_SIZE,
+    replay_size=settings.REALTIME_REPLAY_SIZE,
+    replay_max_bytes=settings.REALTIME_REPLAY_MAX_BYTES,
+)
@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.mutual_friends import load_friend_ids
+from app.core.visibility import contains, hidden_user_ids
+from app.db.tarantool import badges
+from app.models.comment import Comment
+from app.models.mention import Mention, extract_mentions
+from app.models.post import Post, PostVisibility
+from app.models.user import User
+
+
+def record_mentions(
+    db: Session, author_id: int, post: Post, content: Optional[str], comment: Optional[Comment] = None
+) -> List[int]:
+    """
+    Add a mention of every user named in ``content`` of a post or comment
+    to the transaction of ``db``; returns their ids.
+
+    Usernames are resolved with one query. Users who cannot see the post,
+    or are hidden from the author, are not mentioned.
+    """
+    usernames = extract_mentions(content)
+    if not usernames:
+        return []
+    user_ids = db.execute(
+        select(User.id).where(User.username.in_(usernames), User.is_active, User.id != author_id)
+    ).scalars().all()
+
+    hidden = hidden_user_ids(db, post.user_id) | hidden_user_ids(db, author_id)
+    friend_ids = []
+    if post.visibility == PostVisibility.FRIENDS:
+        friend_ids = load_friend_ids(db, [post.user_id])[post.user_id]
+    mentioned = [
+        user_id for user_id in user_ids
+        if user_id == post.user_id or (
+            user_id not in hidden
+            and (post.visibility != PostVisibility.FRIENDS or contains(friend_ids, user_id))
+        )
+    ]
+    for user_id in mentioned:
+        db.add(Mention(
+            mentioned_user_id=user_id,
+            author_id=author_id,
+            post_id=post.id,
+            comment_id=comment.id if comment is not None else None,
+        ))
+    return mentioned
+
+
+def notify_mentions(user_ids: List[int]) -> None:
+    """
+    Count new mentions in the badge counters, after commit.
+    """
+    if settings.MENTION_BADGES_ENABLED:
+        badges.increment([(user_id, badges.UNREAD_MENTIONS, 1) for user_id in user_ids])
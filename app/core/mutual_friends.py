@@ -0,0 +1,64 @@
+from itertools import groupby
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.tarantool import friend_ids as friend_ids_cache
+from app.models.friendship import friend_edges
+
+
+def intersect_sorted(first: Sequence[int], second: Sequence[int]) -> List[int]:
+    """
+    Common elements of two ascending id lists, by a single linear merge.
+    """
+    common = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i] < second[j]:
+            i += 1
+        elif first[i] > second[j]:
+            j += 1
+        else:
+            common.append(first[i])
+            i += 1
+            j += 1
+    return common
+
+
+def load_friend_ids(db: Session, user_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """
+    Ascending accepted friend ids of several users.
+
+    Read from the Tarantool cache; the misses are loaded with one query and
+    written back. The friendship endpoints invalidate the users they change,
+    and lists invalidated while they were loaded are not written back.
+    """
+    user_ids = set(user_ids)
+    found, generations = friend_ids_cache.get_many(user_ids)
+    missing = user_ids - found.keys()
+    if missing:
+        edges = friend_edges()
+        rows = db.execute(
+            select(edges.c.user_id, edges.c.friend_id)
+            .where(edges.c.user_id.in_(missing))
+            .order_by(edges.c.user_id, edges.c.friend_id)
+        )
+        loaded = {user_id: [] for user_id in missing}
+        for user_id, group in groupby(rows, key=lambda row: row[0]):
+            loaded[user_id] = [friend_id for _, friend_id in group]
+        friend_ids_cache.store(list(loaded.items()), generations)
+        found.update(loaded)
+    return found
+
+
+def mutual_friend_ids(db: Session, user_id: int, other_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """
+    Mutual friends of a user and each of ``other_ids``, ascending.
+    """
+    other_ids = list(other_ids)
+    friend_ids = load_friend_ids(db, [user_id, *other_ids])
+    return {
+        other_id: intersect_sorted(friend_ids[user_id], friend_ids[other_id])
+        for other_id in other_ids
+    }
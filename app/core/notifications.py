@@ -0,0 +1,255 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.postgresql.session import SessionLocal
+from app.models.notification import Notification, NotificationActor, NotificationKind
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# (recipient_id, kind, target_id, window_start)
+NotificationKey = Tuple[int, NotificationKind, int, datetime]
+
+# Prepend the new actors to the stored sample, without duplicates
+MERGE_SAMPLE_SQL = text("""
+    (SELECT coalesce(jsonb_agg(actor ORDER BY position), '[]'::jsonb)
+     FROM (SELECT actor, min(position) AS position
+           FROM jsonb_array_elements(
+               excluded.sample_actor_ids || notification.sample_actor_ids
+           ) WITH ORDINALITY AS t(actor, position)
+           GROUP BY actor
+           ORDER BY position
+           LIMIT :sample_size) AS sample)
+""")
+
+# Record the actors of the flushed notifications and count only the ones
+# the notification did not have yet
+ADD_ACTORS_SQL = text("""
+    WITH added AS (
+        INSERT INTO notification_actor (notification_id, actor_id)
+        SELECT * FROM unnest(CAST(:notification_ids AS integer[]), CAST(:actor_ids AS integer[]))
+        ON CONFLICT DO NOTHING
+        RETURNING notification_id
+    )
+    UPDATE notification SET actor_count = notification.actor_count + counts.added
+    FROM (SELECT notification_id, count(*) AS added FROM added GROUP BY notification_id) AS counts
+    WHERE notification.id = counts.notification_id
+""")
+
+
+def merge_actors(newer: List[int], older: List[int], size: int) -> List[int]:
+    return list(dict.fromkeys(newer + older))[:size]
+
+
+class PendingNotification:
+    """
+    Events of one notification collected since the last flush.
+
+    ``actors`` holds every distinct actor, ``actor_ids`` the latest ones.
+    """
+
+    __slots__ = ("actors", "actor_ids", "created_at", "updated_at")
+
+    def __init__(self, at: datetime):
+        self.actors: Set[int] = set()
+        self.actor_ids: List[int] = []
+        self.created_at = at
+        self.updated_at = at
+
+    @property
+    def actor_count(self) -> int:
+        return len(self.actors)
+
+    def add(self, actor_id: int, at: datetime, sample_size: int) -> None:
+        self.actors.add(actor_id)
+        self.actor_ids = merge_actors([actor_id], self.actor_ids, sample_size)
+        self.created_at = min(self.created_at, at)
+        self.updated_at = max(self.updated_at, at)
+
+    def merge_older(self, older: "PendingNotification", sample_size: int) -> None:
+        self.actors |= older.actors
+        self.actor_ids = merge_actors(self.actor_ids, older.actor_ids, sample_size)
+        self.created_at = min(self.created_at, older.created_at)
+        self.updated_at = max(self.updated_at, older.updated_at)
+
+
+class NotificationBuffer:
+    """
+    Coalesces notification events in memory and writes them in batches.
+
+    Events with the same recipient, kind and target within
+    ``window_seconds`` become one Notification row with a count of
+    distinct actors and a sample of the latest actors. A flush writes
+    everything collected so far with one upsert of the notifications and
+    one insert of their new actors, so a burst of likes on a popular post
+    costs one notification row and two statements per flush; an actor
+    repeating the event adds nothing.
+    Events buffered by a worker are lost if it crashes before flushing.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int,
+        sample_size: int,
+        max_entries: int,
+        session_factory=SessionLocal,
+    ):
+        self.window_seconds = window_seconds
+        self.sample_size = sample_size
+        self.max_entries = max_entries
+        self._session_factory = session_factory
+        self._pending: Dict[NotificationKey, PendingNotification] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def window_start(self, at: datetime) -> datetime:
+        seconds = int((at - EPOCH).total_seconds())
+        return EPOCH + timedelta(seconds=seconds - seconds % self.window_seconds)
+
+    def add(
+        self,
+        recipient_id: int,
+        kind: NotificationKind,
+        target_id: int,
+        actor_id: int,
+        at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Record that ``actor_id`` did ``kind`` to ``target_id`` of ``recipient_id``.
+        """
+        if recipient_id == actor_id:
+            return
+        at = at or datetime.utcnow()
+        key = (recipient_id, kind, target_id, self.window_start(at))
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = PendingNotification(at)
+            pending.add(actor_id, at, self.sample_size)
+            full = len(self._pending) >= self.max_entries
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write the buffered notifications, returns how many rows were upserted.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            db = None
+            try:
+                db = self._session_factory()
+                self._write(db, pending)
+                db.commit()
+            except Exception as e:
+                if db is not None:
+                    db.rollback()
+                logger.error(f"Error writing notifications: {e}")
+                self._requeue(pending)
+                return 0
+            finally:
+                if db is not None:
+                    db.close()
+            return len(pending)
+
+    def _requeue(self, pending: Dict[NotificationKey, PendingNotification]) -> None:
+        with self._lock:
+            if len(self._pending) + len(pending) > self.max_entries:
+                logger.warning(f"Dropping {len(pending)} buffered notifications")
+                return
+            for key, older in pending.items():
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = older
+                else:
+                    newer.merge_older(older, self.sample_size)
+
+    def _write(self, db: Session, pending: Dict[NotificationKey, PendingNotification]) -> None:
+        # Sorted so that concurrent flushes of several workers lock rows in
+        # the same order and cannot deadlock
+        items = sorted(pending.items(), key=lambda entry: entry[0])
+        rows = [
+            {
+                "recipient_id": recipient_id,
+                "kind": kind,
+                "target_id": target_id,
+                "window_start": window_start,
+                "actor_count": 0,
+                "sample_actor_ids": item.actor_ids,
+                "created_at": item.created_at,
+                "updated_at": item.updated_at,
+            }
+            for (recipient_id, kind, target_id, window_start), item in items
+        ]
+        if db.get_bind().dialect.name == "postgresql":
+            stmt = insert(Notification).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                constraint="unique_notification_window",
+                set_={
+                    "sample_actor_ids": MERGE_SAMPLE_SQL.bindparams(sample_size=self.sample_size),
+                    "updated_at": func.greatest(Notification.updated_at, stmt.excluded.updated_at),
+                },
+            ).returning(
+                Notification.id, Notification.recipient_id, Notification.kind,
+                Notification.target_id, Notification.window_start,
+            )
+            ids = {
+                (recipient_id, kind, target_id, window_start): notification_id
+                for notification_id, recipient_id, kind, target_id, window_start in db.execute(stmt)
+            }
+            actors = sorted(
+                (ids[key], actor_id) for key, item in items for actor_id in item.actors
+            )
+            db.execute(ADD_ACTORS_SQL, {
+                "notification_ids": [notification_id for notification_id, _ in actors],
+                "actor_ids": [actor_id for _, actor_id in actors],
+            })
+            return
+
+        # Other databases (SQLite in tests): a few queries per notification
+        for (_, item), row in zip(items, rows):
+            notification = db.query(Notification).filter(
+                Notification.recipient_id == row["recipient_id"],
+                Notification.kind == row["kind"],
+                Notification.target_id == row["target_id"],
+                Notification.window_start == row["window_start"],
+            ).first()
+            if notification is None:
+                notification = Notification(**row)
+                db.add(notification)
+                db.flush()
+            else:
+                notification.sample_actor_ids = merge_actors(
+                    row["sample_actor_ids"], notification.sample_actor_ids, self.sample_size
+                )
+                notification.updated_at = max(notification.updated_at, row["updated_at"])
+            known = {
+                actor_id for (actor_id,) in db.query(NotificationActor.actor_id).filter(
+                    NotificationActor.notification_id == notification.id,
+                    NotificationActor.actor_id.in_(item.actors),
+                )
+            }
+            added = sorted(item.actors - known)
+            db.add_all(
+                NotificationActor(notification_id=notification.id, actor_id=actor_id)
+                for actor_id in added
+            )
+            notification.actor_count += len(added)
+
+
+notification_buffer = NotificationBuffer(
+    window_seconds=settings.NOTIFICATION_WINDOW_SECONDS,
+    sample_size=settings.NOTIFICATION_SAMPLE_SIZE,
+    max_entries=settings.NOTIFICATION_BUFFER_MAX_ENTRIES,
+)
@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.message import Message
+from app.models.post import Post
+
+LOAD_BATCH_SIZE = 100000
+
+# A comment counts as this many likes in the engagement of a post
+COMMENT_ENGAGEMENT_WEIGHT = 2.0
+
+
+def load_interactions(db: Session, since: datetime) -> sparse.csr_matrix:
+    """
+    Interactions of every viewer with every author since ``since``, as a
+    sparse viewer x author count matrix: messages in either direction and
+    likes of the viewer on posts and comments of the author.
+    """
+    queries = [
+        (select(Message.sender_id, Message.recipient_id, func.count())
+         .where(Message.created_at >= since)
+         .group_by(Message.sender_id, Message.recipient_id), True),
+        (select(Like.user_id, Post.user_id, func.count())
+         .join(Post, Post.id == Like.post_id)
+         .where(Like.created_at >= since)
+         .group_by(Like.user_id, Post.user_id), False),
+        (select(Like.user_id, Comment.user_id, func.count())
+         .join(Comment, Comment.id == Like.comment_id)
+         .where(Like.created_at >= since)
+         .group_by(Like.user_id, Comment.user_id), False),
+    ]
+    viewers: List[int] = []
+    authors: List[int] = []
+    counts: List[int] = []
+    for query, symmetric in queries:
+        for viewer_id, author_id, count in db.execute(query.execution_options(yield_per=LOAD_BATCH_SIZE)):
+            viewers.append(viewer_id)
+            authors.append(author_id)
+            counts.append(count)
+            if symmetric:
+                viewers.append(author_id)
+                authors.append(viewer_id)
+                counts.append(count)
+    rows = np.array(viewers, dtype=np.int32)
+    cols = np.array(authors, dtype=np.int32)
+    data = np.array(counts, dtype=np.float32)
+    # Likes of own posts are not an interaction
+    keep = rows != cols
+    size = int(max(rows.max(initial=0), cols.max(initial=0))) + 1
+    # Duplicate (viewer, author) pairs of the three queries add up
+    return sparse.csr_matrix((data[keep], (rows[keep], cols[keep])), shape=(size, size))
+
+
+def affinity_rows(
+    interactions: sparse.csr_matrix, size: int
+) -> Iterator[Tuple[int, List[int], List[float]]]:
+    """
+    Top ``size`` authors of every viewer with interactions, ascending by
+    author id, with their affinity ``log1p(interactions)``.
+    """
+    for viewer_id in np.flatnonzero(np.diff(interactions.indptr)):
+        start, end = interactions.indptr[viewer_id], interactions.indptr[viewer_id + 1]
+        author_ids = interactions.indices[start:end]
+        counts = interactions.data[start:end]
+        if len(author_ids) > size:
+            best = np.argpartition(-counts, size - 1)[:size]
+            author_ids, counts = author_ids[best], counts[best]
+        order = np.argsort(author_ids)
+        yield int(viewer_id), author_ids[order].tolist(), np.log1p(counts[order]).tolist()
+
+
+def score_candidates(
+    author_ids: np.ndarray,
+    ages: np.ndarray,
+    likes: np.ndarray,
+    comments: np.ndarray,
+    seen: np.ndarray,
+    affinity_author_ids: np.ndarray,
+    affinity: np.ndarray,
+) -> np.ndarray:
+    """
+    Scores of feed candidates, one vector operation over all of them.
+
+    ``ages`` are in seconds; ``affinity_author_ids`` is ascending. The
+    score is (1 + affinity of the author) x (1 + log engagement), halved
+    every FEED_RANK_HALF_LIFE_HOURS and cut by FEED_RANK_SEEN_PENALTY for
+    posts the viewer has seen; the weights are settings.
+    """
+    author_affinity = np.zeros(len(author_ids))
+    if len(affinity_author_ids):
+        position = np.minimum(np.searchsorted(affinity_author_ids, author_ids), len(affinity_author_ids) - 1)
+        known = affinity_author_ids[position] == author_ids
+        author_affinity = np.where(known, affinity[position], 0.0)
+    engagement = np.log1p(likes + COMMENT_ENGAGEMENT_WEIGHT * comments)
+    decay = np.exp2(-np.maximum(ages, 0) / (settings.FEED_RANK_HALF_LIFE_HOURS * 3600))
+    scores = (
+        (1 + settings.FEED_RANK_AFFINITY_WEIGHT * author_affinity)
+        * (1 + settings.FEED_RANK_ENGAGEMENT_WEIGHT * engagement)
+        * decay
+    )
+    return np.where(seen, scores * settings.FEED_RANK_SEEN_PENALTY, scores)
+
+
+def rank(scores: Sequence[float]) -> np.ndarray:
+    """
+    Candidate positions by descending score; ties keep the feed order.
+    """
+    return np.argsort(-np.asarray(scores), kind="stable")
@@ -0,0 +1,194 @@
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.postgresql.session import SessionLocal
+from app.db.tarantool import friend_suggestions
+from app.models.friendship import Friendship, FriendshipStatus, friend_edges
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 100000
+
+
+def build_adjacency(sources: np.ndarray, targets: np.ndarray, size: int) -> sparse.csr_matrix:
+    """
+    Symmetric 0/1 adjacency matrix of the friendship graph.
+    """
+    rows = np.concatenate([sources, targets])
+    cols = np.concatenate([targets, sources])
+    adjacency = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(size, size)
+    )
+    # Mirrored rows of one friendship add up, count every edge once
+    adjacency.data[:] = 1
+    return adjacency
+
+
+def load_adjacency(db: Session) -> sparse.csr_matrix:
+    """
+    Adjacency matrix of all accepted friendships.
+    """
+    rows = db.query(Friendship.user_low_id, Friendship.user_high_id).filter(
+        Friendship.status == FriendshipStatus.ACCEPTED
+    ).execution_options(yield_per=LOAD_BATCH_SIZE)
+    sources: List[int] = []
+    targets: List[int] = []
+    for user_low_id, user_high_id in rows:
+        sources.append(user_low_id)
+        targets.append(user_high_id)
+    sources_array = np.array(sources, dtype=np.int32)
+    targets_array = np.array(targets, dtype=np.int32)
+    size = int(max(sources_array.max(initial=0), targets_array.max(initial=0))) + 1
+    return build_adjacency(sources_array, targets_array, size)
+
+
+def top_suggestions(
+    adjacency: sparse.csr_matrix, user_ids: np.ndarray, size: int
+) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+    """
+    Top ``size`` friends of friends of the given users by mutual friend count.
+
+    Row ``i`` of ``A[users] @ A`` holds the number of paths of length two
+    from user ``i`` to every other user, i.e. their mutual friends. The
+    users themselves and their current friends are masked out.
+    """
+    block = adjacency[user_ids]
+    product = block @ adjacency
+    product = product - product.multiply(block)
+    own = sparse.csr_matrix(
+        (np.ones(len(user_ids), dtype=np.int32), (np.arange(len(user_ids)), user_ids)),
+        shape=product.shape,
+    )
+    product = product - product.multiply(own)
+    product.eliminate_zeros()
+
+    for i, user_id in enumerate(user_ids):
+        start, end = product.indptr[i], product.indptr[i + 1]
+        candidates = product.indices[start:end]
+        counts = product.data[start:end]
+        if len(candidates) > size:
+            best = np.argpartition(-counts, size - 1)[:size]
+            candidates, counts = candidates[best], counts[best]
+        # Most mutual friends first, then by id
+        order = np.lexsort((candidates, -counts))
+        yield int(user_id), list(zip(candidates[order].tolist(), counts[order].tolist()))
+
+
+def compute_all(
+    adjacency: sparse.csr_matrix,
+    size: int,
+    batch_size: int,
+    store: Callable[[Sequence[Tuple[int, List[Tuple[int, int]]]]], None],
+) -> int:
+    """
+    Compute the suggestions of every user with friends, ``batch_size``
+    users per matrix product, and pass each batch to ``store``.
+    """
+    user_ids = np.flatnonzero(np.diff(adjacency.indptr)).astype(np.int32)
+    for start in range(0, len(user_ids), batch_size):
+        store(list(top_suggestions(adjacency, user_ids[start:start + batch_size], size)))
+    return len(user_ids)
+
+
+def mutual_friend_counts(db: Session, user_id: int, size: int) -> List[Tuple[int, int]]:
+    """
+    Top ``size`` friends of friends of one user, computed in PostgreSQL.
+    """
+    first, second, own = friend_edges("first"), friend_edges("second"), friend_edges("own")
+    friends = select(own.c.friend_id).where(own.c.user_id == user_id)
+    mutual = func.count().label("mutual")
+    rows = (
+        db.query(second.c.friend_id, mutual)
+        .select_from(first)
+        .join(second, second.c.user_id == first.c.friend_id)
+        .filter(
+            first.c.user_id == user_id,
+            second.c.friend_id != user_id,
+            second.c.friend_id.not_in(friends),
+        )
+        .group_by(second.c.friend_id)
+        .order_by(mutual.desc(), second.c.friend_id)
+        .limit(size)
+        .all()
+    )
+    return [(candidate_id, count) for candidate_id, count in rows]
+
+
+def friend_ids(db: Session, user_id: int) -> Set[int]:
+    edges = friend_edges()
+    return set(db.execute(select(edges.c.friend_id).where(edges.c.user_id == user_id)).scalars())
+
+
+class SuggestionUpdater:
+    """
+    Keeps stored suggestions roughly current between full computations.
+
+    The friendship endpoints report accepted and removed friendships; a
+    periodic flush then recomputes the two users exactly and adjusts the
+    mutual friend counts of their friends by one. Changes are collected
+    per worker and lost if it crashes before flushing; the next full
+    computation (app/scripts/compute_friend_suggestions.py) repairs that.
+    """
+
+    def __init__(self, size: int, session_factory=SessionLocal):
+        self.size = size
+        self._session_factory = session_factory
+        # Net change of each friendship: 1 added, -1 removed, 0 both
+        self._pending: Dict[Tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, user_id: int, friend_id: int, accepted: bool) -> None:
+        """Record that two users became friends (or stopped being friends)."""
+        key = (min(user_id, friend_id), max(user_id, friend_id))
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + (1 if accepted else -1)
+
+    def flush(self) -> int:
+        """
+        Apply the recorded changes, returns how many were applied.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            db = None
+            try:
+                db = self._session_factory()
+                changes: List[Tuple[int, int, int]] = []
+                recompute: Set[int] = set()
+                for (user_a, user_b), delta in pending.items():
+                    recompute.update((user_a, user_b))
+                    if not delta:
+                        continue
+                    friends_a, friends_b = friend_ids(db, user_a), friend_ids(db, user_b)
+                    # user_a is now (or no longer) a mutual friend of user_b
+                    # and every friend of user_a, and the other way round
+                    for third in friends_a - friends_b - {user_b}:
+                        changes.append((third, user_b, delta))
+                    for third in friends_b - friends_a - {user_a}:
+                        changes.append((third, user_a, delta))
+                rows = [(user_id, mutual_friend_counts(db, user_id, self.size)) for user_id in recompute]
+                friend_suggestions.adjust(changes)
+                friend_suggestions.store(rows)
+            except Exception as e:
+                logger.error(f"Error updating friend suggestions: {e}")
+                with self._lock:
+                    for key, delta in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + delta
+                return 0
+            finally:
+                if db is not None:
+                    db.close()
+            return len(pending)
+
+
+suggestion_updater = SuggestionUpdater(size=settings.FRIEND_SUGGESTIONS_SIZE)
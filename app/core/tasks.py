@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Any, Callable, List
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+_tasks: List[asyncio.Task] = []
+
+
+async def run_periodically(name: str, interval: float, func: Callable[[], Any]) -> None:
+    """
+    Call a blocking function every ``interval`` seconds in the thread pool.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(func)
+        except Exception as e:
+            logger.error(f"Periodic task {name} failed: {e}")
+
+
+def start_periodic_task(name: str, interval: float, func: Callable[[], Any]) -> None:
+    """
+    Start a periodic background task; a non-positive interval disables it.
+    """
+    if interval <= 0:
+        return
+    _tasks.append(asyncio.create_task(run_periodically(name, interval, func), name=name))
+
+
+async def run_once(name: str, func: Callable[[], Any]) -> None:
+    try:
+        await run_in_threadpool(func)
+    except Exception as e:
+        logger.error(f"Background task {name} failed: {e}")
+
+
+def start_background_task(name: str, func: Callable[[], Any]) -> None:
+    """
+    Call a blocking function once in the thread pool without waiting for it.
+    """
+    _tasks.append(asyncio.create_task(run_once(name, func), name=name))
+
+
+async def stop_periodic_tasks() -> None:
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -0,0 +1,183 @@
+import hashlib
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.hub import hub
+from app.db.tarantool import trending as trending_checkpoints
+
+logger = logging.getLogger(__name__)
+
+HASHTAGS_USED = "hashtags.used"
+
+
+class CountMinSketch:
+    """
+    Approximate counts of strings in a ``depth`` x ``width`` table of
+    counters. Estimates never undercount; with total count N they
+    overcount by more than e * N / width with probability e ** -depth.
+    """
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.rows = np.arange(depth)
+
+    def columns(self, item: str) -> np.ndarray:
+        """Counter of the item in every row, by double hashing of one digest."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return np.array([(first + i * second) % self.width for i in range(self.depth)])
+
+    def add(self, table: np.ndarray, columns: np.ndarray, count: int = 1) -> None:
+        table[self.rows, columns] += count
+
+    def estimate(self, table: np.ndarray, columns: np.ndarray) -> int:
+        return int(table[self.rows, columns].min())
+
+
+class TrendingTags:
+    """
+    Most used hashtags of the last ``buckets`` x ``bucket_seconds`` seconds.
+
+    Every bucket of the sliding window has its own count-min sketch and the
+    window keeps their sum, so expiring a bucket is one subtraction. The
+    tags with the highest estimates are kept in a bounded candidate set
+    with a lazy min-heap: an add updates one entry, and when the set is
+    full the lowest candidate is evicted. A tag that comes back is
+    re-estimated from the sketch, so it keeps its count. Every worker
+    applies the ``hashtags.used`` events of all workers and checkpoints
+    its state to Tarantool, from where a restarted worker resumes.
+    """
+
+    def __init__(self, name: str, k: int, width: int, depth: int, bucket_seconds: int, buckets: int):
+        self.name = name
+        self.k = k
+        self.capacity = 4 * k
+        self.bucket_seconds = bucket_seconds
+        self.sketch = CountMinSketch(width, depth)
+        self._buckets = np.zeros((buckets, depth, width), dtype=np.int32)
+        self._window = np.zeros((depth, width), dtype=np.int64)
+        # Index of the current bucket, counted in bucket_seconds since the epoch
+        self._current = 0
+        self._candidates: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    def _advance(self, now: float) -> None:
+        current = int(now // self.bucket_seconds)
+        if current <= self._current:
+            return
+        if current - self._current >= len(self._buckets):
+            self._buckets[:] = 0
+            self._window[:] = 0
+        else:
+            for bucket in range(self._current + 1, current + 1):
+                slot = bucket % len(self._buckets)
+                self._window -= self._buckets[slot]
+                self._buckets[slot] = 0
+        self._current = current
+        # Counts only drop when buckets expire
+        self._reestimate()
+
+    def _reestimate(self) -> None:
+        candidates = {}
+        for tag in self._candidates:
+            count = self.sketch.estimate(self._window, self.sketch.columns(tag))
+            if count > 0:
+                candidates[tag] = count
+        self._rebuild(candidates)
+
+    def _rebuild(self, candidates: Dict[str, int]) -> None:
+        self._candidates = candidates
+        self._heap = [(count, tag) for tag, count in candidates.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, tags: Iterable[str], now: Optional[float] = None) -> None:
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            slot = self._current % len(self._buckets)
+            for tag in tags:
+                columns = self.sketch.columns(tag)
+                self.sketch.add(self._buckets[slot], columns)
+                self.sketch.add(self._window, columns)
+                count = self.sketch.estimate(self._window, columns)
+                self._candidates[tag] = count
+                heapq.heappush(self._heap, (count, tag))
+                # Heap entries of a tag with an older count are stale
+                while len(self._candidates) > self.capacity:
+                    count, tag = heapq.heappop(self._heap)
+                    if self._candidates.get(tag) == count:
+                        del self._candidates[tag]
+            if len(self._heap) > 4 * self.capacity:
+                self._rebuild(self._candidates)
+
+    def top(self, limit: Optional[int] = None, now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """
+        Up to ``limit`` (at most k) tags with their estimated counts, most used first.
+        """
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            return heapq.nlargest(
+                min(limit or self.k, self.k), self._candidates.items(), key=lambda item: (item[1], item[0])
+            )
+
+    def state(self) -> Dict[str, Any]:
+        """Checkpoint of the counters and candidates; the non-zero counters only."""
+        with self._lock:
+            flat = self._buckets.ravel()
+            nonzero = np.flatnonzero(flat)
+            return {
+                "current": self._current,
+                "shape": list(self._buckets.shape),
+                "indices": nonzero.astype(np.uint32).tobytes(),
+                "counts": flat[nonzero].astype(np.int32).tobytes(),
+                "tags": list(self._candidates),
+            }
+
+    def restore(self, state: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Resume from a checkpoint of ``state``; returns False if it does not fit."""
+        if list(state["shape"]) != list(self._buckets.shape):
+            return False
+        with self._lock:
+            self._buckets[:] = 0
+            flat = self._buckets.reshape(-1)
+            flat[np.frombuffer(state["indices"], dtype=np.uint32)] = np.frombuffer(state["counts"], dtype=np.int32)
+            self._window = self._buckets.sum(axis=0, dtype=np.int64)
+            self._current = state["current"]
+            self._rebuild({tag: 0 for tag in state["tags"]})
+            self._advance(time.time() if now is None else now)
+            self._reestimate()
+        return True
+
+    def checkpoint(self) -> None:
+        trending_checkpoints.save(self.name, self.state())
+
+    def resume(self) -> None:
+        """Resume from the checkpoint in Tarantool, if there is one that fits."""
+        state = trending_checkpoints.load(self.name)
+        if state is not None and self.restore(state):
+            logger.info(f"Trending counter {self.name} resumed with {len(self._candidates)} tags")
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Hub handler of ``hashtags.used`` events."""
+        tags = (event.get("data") or {}).get("tags")
+        if tags:
+            self.add(tags)
+
+
+trending_tags = TrendingTags(
+    "hashtags",
+    settings.TRENDING_TOP_K,
+    settings.TRENDING_SKETCH_WIDTH,
+    settings.TRENDING_SKETCH_DEPTH,
+    settings.TRENDING_BUCKET_SECONDS,
+    settings.TRENDING_WINDOW_SECONDS // settings.TRENDING_BUCKET_SECONDS,
+)
+hub.add_handler(HASHTAGS_USED, trending_tags.apply_event)
@@ -0,0 +1,273 @@
+import bisect
+import logging
+import threading
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.hub import hub
+from app.db.postgresql.session import SessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Event published by the user endpoints after a profile changes
+USER_CHANGED = "user.changed"
+
+LOAD_BATCH_SIZE = 10000
+
+# Entries per chunk of the sorted key list; an update moves at most
+# twice as many entries instead of shifting the whole list
+KEY_CHUNK_SIZE = 1024
+
+
+class IndexedUser(NamedTuple):
+    username: str
+    full_name: Optional[str]
+    avatar_url: Optional[str]
+    # Keys of the user in the index (see name_keys)
+    keys: Tuple[str, ...] = ()
+
+
+def normalize(value: str) -> str:
+    """
+    Case- and accent-insensitive form of a name ("Ёлка" and "елка" match).
+    """
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+
+def name_keys(username: str, full_name: Optional[str]) -> Tuple[str, ...]:
+    """
+    Keys a user is found by: the username, the full name and every later
+    word of the full name, so that "pet" finds "Ivan Petrov".
+    """
+    keys = [normalize(username)]
+    if full_name:
+        words = normalize(full_name).split()
+        if words:
+            keys.append(" ".join(words))
+            keys.extend(words[1:])
+    return tuple(dict.fromkeys(key for key in keys if key))
+
+
+def indexed_user(username: str, full_name: Optional[str], avatar_url: Optional[str]) -> IndexedUser:
+    return IndexedUser(username, full_name, avatar_url, name_keys(username, full_name))
+
+
+class SortedKeys:
+    """
+    Sorted (key, user id) entries kept in chunks.
+
+    Every chunk is a list of keys with the user ids in a parallel array,
+    as compact as one flat list, and ``_maxes`` holds the last key of each
+    chunk. Finding an entry is a binary search over the chunks and then
+    within one; inserting or removing one shifts a single chunk of at most
+    ``2 * chunk_size`` entries, so updates stay cheap with millions of keys.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int]] = (), chunk_size: int = KEY_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._keys: List[List[str]] = []
+        self._ids: List[array] = []
+        self._maxes: List[str] = []
+        self._len = 0
+        chunk: List[Tuple[str, int]] = []
+        for entry in entries:
+            chunk.append(entry)
+            if len(chunk) == chunk_size:
+                self._append_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._append_chunk(chunk)
+
+    def _append_chunk(self, chunk: List[Tuple[str, int]]) -> None:
+        self._keys.append([key for key, _ in chunk])
+        self._ids.append(array("q", (user_id for _, user_id in chunk)))
+        self._maxes.append(chunk[-1][0])
+        self._len += len(chunk)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: str, user_id: int) -> None:
+        if not self._keys:
+            self._append_chunk([(key, user_id)])
+            return
+        index = min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys, ids = self._keys[index], self._ids[index]
+        position = bisect.bisect_left(keys, key)
+        keys.insert(position, key)
+        ids.insert(position, user_id)
+        self._maxes[index] = keys[-1]
+        self._len += 1
+        if len(keys) > 2 * self.chunk_size:
+            half = len(keys) // 2
+            self._keys[index:index + 1] = [keys[:half], keys[half:]]
+            self._ids[index:index + 1] = [ids[:half], ids[half:]]
+            self._maxes[index:index + 1] = [keys[half - 1], keys[-1]]
+
+    def remove(self, key: str, user_id: int) -> bool:
+        index = bisect.bisect_left(self._maxes, key)
+        # Equal keys are few, but they can continue in the next chunk
+        while index < len(self._keys):
+            keys, ids = self._keys[index], self._ids[index]
+            position = bisect.bisect_left(keys, key)
+            while position < len(keys) and keys[position] == key:
+                if ids[position] == user_id:
+                    del keys[position]
+                    del ids[position]
+                    self._len -= 1
+                    if keys:
+                        self._maxes[index] = keys[-1]
+                    else:
+                        del self._keys[index], self._ids[index], self._maxes[index]
+                    return True
+                position += 1
+            if position < len(keys):
+                return False
+            index += 1
+        return False
+
+    def iter_from(self, prefix: str) -> Iterator[Tuple[str, int]]:
+        """Entries from the first key not less than ``prefix`` on, in order."""
+        index = bisect.bisect_left(self._maxes, prefix)
+        if index == len(self._keys):
+            return
+        position = bisect.bisect_left(self._keys[index], prefix)
+        for keys, ids in zip(self._keys[index:], self._ids[index:]):
+            for offset in range(position, len(keys)):
+                yield keys[offset], ids[offset]
+            position = 0
+
+
+class UserPrefixIndex:
+    """
+    In-memory prefix index of usernames and full names for autocomplete.
+
+    Keys are kept sorted with their user ids in ``SortedKeys``, so a
+    lookup is a binary search followed by a short scan and needs no
+    database or network round trip, and a profile change only shifts one
+    small chunk. The index is loaded from
+    PostgreSQL on startup and then kept up to date by ``user.changed``
+    events, which reach every worker through the event bus.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._entries = SortedKeys()
+        self._users: Dict[int, IndexedUser] = {}
+        self._lock = threading.Lock()
+        self._loading = False
+        self._changed_while_loading: List[Dict[str, Any]] = []
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def load(self) -> None:
+        """
+        Build the index from all active users.
+
+        Changes arriving while the users are read are applied on top of
+        the result, so none is lost to the snapshot.
+        """
+        with self._lock:
+            self._loading = True
+            self._changed_while_loading = []
+        db = self._session_factory()
+        try:
+            users: Dict[int, IndexedUser] = {}
+            rows = db.query(User.id, User.username, User.full_name, User.avatar_url).filter(
+                User.is_active == True
+            ).execution_options(yield_per=LOAD_BATCH_SIZE)
+            for user_id, username, full_name, avatar_url in rows:
+                users[user_id] = indexed_user(username, full_name, avatar_url)
+        except Exception:
+            with self._lock:
+                self._loading = False
+            raise
+        finally:
+            db.close()
+        self.replace(users)
+        logger.info(f"User prefix index loaded: {len(users)} users, {len(self._entries)} keys")
+
+    def replace(self, users: Dict[int, IndexedUser]) -> None:
+        """Replace the whole index with the given users."""
+        entries = sorted(
+            (key, user_id)
+            for user_id, user in users.items()
+            for key in user.keys
+        )
+        with self._lock:
+            self._entries = SortedKeys(entries)
+            self._users = users
+            for data in self._changed_while_loading:
+                self._apply(data)
+            self._changed_while_loading = []
+            self._loading = False
+            self.loaded = True
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Hub handler of ``user.changed`` events."""
+        data = event.get("data") or {}
+        if "id" not in data:
+            return
+        with self._lock:
+            if self._loading:
+                self._changed_while_loading.append(data)
+            self._apply(data)
+
+    def _apply(self, data: Dict[str, Any]) -> None:
+        user_id = data["id"]
+        old = self._users.pop(user_id, None)
+        if old is not None:
+            for key in old.keys:
+                self._entries.remove(key, user_id)
+        if not data.get("is_active", True) or not data.get("username"):
+            return
+        user = indexed_user(data["username"], data.get("full_name"), data.get("avatar_url"))
+        self._users[user_id] = user
+        for key in user.keys:
+            self._entries.add(key, user_id)
+
+    def search(
+        self, query: str, limit: int, friend_ids: Iterable[int] = (), exclude_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Ids of users with a name starting with ``query``: friends first,
+        then everybody else in name order.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        result: List[int] = []
+        seen: Set[int] = {exclude_id} if exclude_id is not None else set()
+        with self._lock:
+            # Friends are few, check their own keys instead of scanning
+            friends = []
+            for friend_id in friend_ids:
+                user = self._users.get(friend_id)
+                if user is None or friend_id in seen:
+                    continue
+                matching = [key for key in user.keys if key.startswith(prefix)]
+                if matching:
+                    friends.append((min(matching), friend_id))
+            for _, friend_id in sorted(friends)[:limit]:
+                result.append(friend_id)
+                seen.add(friend_id)
+
+            for key, user_id in self._entries.iter_from(prefix):
+                if len(result) >= limit or not key.startswith(prefix):
+                    break
+                if user_id not in seen:
+                    result.append(user_id)
+                    seen.add(user_id)
+        return result
+
+    def get(self, user_id: int) -> Optional[IndexedUser]:
+        return self._users.get(user_id)
+
+
+user_index = UserPrefixIndex()
+hub.add_handler(USER_CHANGED, user_index.apply_event)
@@ -0,0 +1,113 @@
+from bisect import bisect_left
+from typing import AbstractSet, FrozenSet, Iterable, List, Sequence
+
+from sqlalchemy import and_, or_, select, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+from app.core.graph import social_graph
+from app.core.mutual_friends import load_friend_ids
+from app.db.tarantool import block_lists
+from app.db.tarantool.news_feed import FeedEntry
+from app.models.block import Block
+from app.models.friendship import friend_edges
+from app.models.post import Post, PostVisibility
+
+
+def hidden_user_ids(db: Session, user_id: int) -> FrozenSet[int]:
+    """
+    Users hidden from a user: blocked by them or blocking them.
+
+    Blocking hides both users from each other, so the set is symmetric.
+    Read from the Tarantool cache; a miss is loaded with one query and
+    written back unless the list was invalidated meanwhile.
+    """
+    hidden, generation = block_lists.get(user_id)
+    if hidden is None:
+        hidden = sorted(set(db.execute(union_all(
+            select(Block.blocked_id).where(Block.blocker_id == user_id),
+            select(Block.blocker_id).where(Block.blocked_id == user_id),
+        )).scalars()))
+        # Not written back if a block changed since the generation was read
+        block_lists.store(user_id, hidden, generation)
+    return frozenset(hidden)
+
+
+def is_blocked(db: Session, user_id: int, other_id: int) -> bool:
+    """Whether either of two users blocked the other."""
+    return other_id in hidden_user_ids(db, user_id)
+
+
+def visible_posts(db: Session, viewer_id: int) -> ColumnElement:
+    """
+    Condition selecting the posts a user can see, for post list queries.
+
+    Posts of hidden users are excluded by id. Friends-only posts need the
+    author to be a friend, which is one semi-join on the friendships of
+    the viewer; PostgreSQL evaluates it once per query as a hashed subplan.
+    """
+    edges = friend_edges()
+    friends = select(edges.c.friend_id).where(edges.c.user_id == viewer_id)
+    condition = or_(
+        Post.visibility == PostVisibility.PUBLIC,
+        Post.user_id == viewer_id,
+        Post.user_id.in_(friends),
+    )
+    hidden = hidden_user_ids(db, viewer_id)
+    if hidden:
+        condition = and_(condition, Post.user_id.not_in(hidden))
+    return condition
+
+
+def contains(sorted_ids: Sequence[int], user_id: int) -> bool:
+    position = bisect_left(sorted_ids, user_id)
+    return position < len(sorted_ids) and sorted_ids[position] == user_id
+
+
+def can_view_post(db: Session, viewer_id: int, author_id: int, visibility: PostVisibility) -> bool:
+    """
+    Whether a user can see a single post.
+    """
+    if author_id == viewer_id:
+        return True
+    if is_blocked(db, viewer_id, author_id):
+        return False
+    if visibility != PostVisibility.FRIENDS:
+        return True
+    return contains(load_friend_ids(db, [viewer_id])[viewer_id], author_id)
+
+
+def visible_feed_entries(
+    entries: Iterable[FeedEntry], viewer_id: int, hidden: AbstractSet[int], friend_ids: Sequence[int]
+) -> List[FeedEntry]:
+    """
+    Feed entries the viewer can still see.
+
+    Entries were filtered when the post was fanned out, but the author may
+    have been blocked or unfriended since.
+    """
+    friends_only = PostVisibility.FRIENDS.value
+    return [
+        entry for entry in entries
+        if entry.author_id == viewer_id or (
+            entry.author_id not in hidden
+            and (entry.visibility != friends_only or contains(friend_ids, entry.author_id))
+        )
+    ]
+
+
+def feed_audience(db: Session, author_id: int) -> List[int]:
+    """
+    Users whose feeds receive a new post: the author and their friends,
+    except users hidden from the author.
+
+    Friends are read from the shared graph snapshot when it is loaded.
+    """
+    friends = social_graph.friend_ids(author_id)
+    if friends is None:
+        edges = friend_edges()
+        friends = db.execute(select(edges.c.friend_id).where(edges.c.user_id == author_id)).scalars().all()
+    else:
+        friends = friends.tolist()
+    hidden = hidden_user_ids(db, author_id)
+    return [author_id] + [friend_id for friend_id in friends if friend_id not in hidden]
@@ -8,7 +8,7 @@ from app.core.config import settings
 from app.models import User
 
 # Import all models to ensure they are registered with Base.metadata
-from app.models import User, Post, Friendship, Comment, Like, Message
+from app.models import User, Post, Friendship, Comment, Like, Message, Conversation, Notification, Block, PostHashtag, Mention
 
 logger = logging.getLogger(__name__)
 
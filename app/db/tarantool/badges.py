@@ -0,0 +1,174 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.postgresql.session import SessionLocal
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+from app.models.conversation import Conversation
+from app.models.friendship import Friendship, FriendshipStatus
+
+logger = logging.getLogger(__name__)
+
+UNREAD_MESSAGES = "unread_messages"
+PENDING_FRIEND_REQUESTS = "pending_friend_requests"
+UNREAD_MENTIONS = "unread_mentions"
+
+# Counters that can be recomputed from Postgres
+RECONCILED_COUNTERS = (UNREAD_MESSAGES, PENDING_FRIEND_REQUESTS)
+
+RECONCILE_CHUNK_SIZE = 1000
+
+# Counters are kept in a map per user, so new badges need no schema change.
+# Lua runs without yielding between get and replace, which makes every
+# call atomic.
+INCREMENT_LUA = """
+    for _, change in ipairs(...) do
+        local user_id, name, delta = change[1], change[2], change[3]
+        local t = box.space.badge_counters:get(user_id)
+        local counters = t ~= nil and t[2] or {}
+        counters[name] = math.max((counters[name] or 0) + delta, 0)
+        box.space.badge_counters:replace({user_id, counters})
+    end
+"""
+
+SET_LUA = """
+    for _, item in ipairs(...) do
+        local user_id, values = item[1], item[2]
+        local t = box.space.badge_counters:get(user_id)
+        local counters = t ~= nil and t[2] or {}
+        for name, value in pairs(values) do
+            counters[name] = value
+        end
+        box.space.badge_counters:replace({user_id, counters})
+    end
+"""
+
+NONZERO_USERS_LUA = """
+    local names = ...
+    local users = {}
+    for _, t in box.space.badge_counters:pairs() do
+        for _, name in ipairs(names) do
+            if (t[2][name] or 0) ~= 0 then
+                table.insert(users, t[1])
+                break
+            end
+        end
+    end
+    return users
+"""
+
+
+def increment(changes: Iterable[Tuple[int, str, int]]) -> None:
+    """
+    Apply (user_id, counter, delta) changes in one call. Errors are logged;
+    the reconciliation pass repairs missed updates.
+    """
+    changes = [list(change) for change in changes if change[2]]
+    if not changes:
+        return
+    try:
+        get_shared_tarantool_connection().eval(INCREMENT_LUA, [changes])
+    except Exception as e:
+        logger.warning(f"Error updating badge counters in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def reset(user_id: int, names: Iterable[str]) -> None:
+    """
+    Set counters of a user to zero. Errors are logged.
+    """
+    try:
+        get_shared_tarantool_connection().eval(SET_LUA, [[[user_id, {name: 0 for name in names}]]])
+    except Exception as e:
+        logger.warning(f"Error resetting badge counters in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def get_badges(user_id: int) -> Optional[Dict[str, int]]:
+    """
+    All counters of a user with a single key lookup, None if Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().call("box.space.badge_counters:get", [user_id])
+    except Exception as e:
+        logger.warning(f"Error reading badge counters from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return None
+    if not result or result[0] is None:
+        return {}
+    return dict(result[0][1])
+
+
+def count_badges(db: Session, user_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+    """
+    Compute the reconciled counters from Postgres, only non-zero users are returned.
+    """
+    unread_low = db.query(Conversation.user_low_id, func.sum(Conversation.unread_low)).group_by(Conversation.user_low_id)
+    unread_high = db.query(Conversation.user_high_id, func.sum(Conversation.unread_high)).group_by(Conversation.user_high_id)
+    # Requests are pending for the user of the pair who did not send them
+    pending_low = db.query(Friendship.user_low_id, func.count(Friendship.id)).filter(
+        Friendship.status == FriendshipStatus.PENDING,
+        Friendship.requester_id == Friendship.user_high_id
+    ).group_by(Friendship.user_low_id)
+    pending_high = db.query(Friendship.user_high_id, func.count(Friendship.id)).filter(
+        Friendship.status == FriendshipStatus.PENDING,
+        Friendship.requester_id == Friendship.user_low_id
+    ).group_by(Friendship.user_high_id)
+    if user_ids is not None:
+        unread_low = unread_low.filter(Conversation.user_low_id.in_(user_ids))
+        unread_high = unread_high.filter(Conversation.user_high_id.in_(user_ids))
+        pending_low = pending_low.filter(Friendship.user_low_id.in_(user_ids))
+        pending_high = pending_high.filter(Friendship.user_high_id.in_(user_ids))
+
+    badges: Dict[int, Dict[str, int]] = {}
+    for user_id, count in list(unread_low) + list(unread_high):
+        if count:
+            counters = badges.setdefault(user_id, {})
+            counters[UNREAD_MESSAGES] = counters.get(UNREAD_MESSAGES, 0) + int(count)
+    for user_id, count in list(pending_low) + list(pending_high):
+        if count:
+            counters = badges.setdefault(user_id, {})
+            counters[PENDING_FRIEND_REQUESTS] = counters.get(PENDING_FRIEND_REQUESTS, 0) + int(count)
+    return badges
+
+
+def reconcile(db: Session) -> int:
+    """
+    Overwrite the reconciled counters in Tarantool with the values from Postgres.
+
+    Returns the number of users whose counters were written.
+    """
+    conn = get_shared_tarantool_connection()
+    expected = count_badges(db)
+    try:
+        result = conn.eval(NONZERO_USERS_LUA, [list(RECONCILED_COUNTERS)])
+        stored_users = result[0] if result else []
+
+        user_ids = sorted(set(expected) | set(stored_users))
+        for start in range(0, len(user_ids), RECONCILE_CHUNK_SIZE):
+            chunk = user_ids[start:start + RECONCILE_CHUNK_SIZE]
+            conn.eval(SET_LUA, [[
+                [user_id, {name: expected.get(user_id, {}).get(name, 0) for name in RECONCILED_COUNTERS}]
+                for user_id in chunk
+            ]])
+    except Exception:
+        reset_shared_tarantool_connection()
+        raise
+    return len(user_ids)
+
+
+def reconcile_badges() -> None:
+    """
+    Periodic reconciliation pass with its own database session.
+    """
+    db = SessionLocal()
+    try:
+        count = reconcile(db)
+        logger.info(f"Badge counters reconciled for {count} users")
+    finally:
+        db.close()
@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.tarantool.cache_generations import GENERATION_LUA
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+GET_LUA = GENERATION_LUA + """
+    local user_id, now = ...
+    local t = box.space.block_lists:get(user_id)
+    if t ~= nil and t[2] > now then
+        return true, t[3]
+    end
+    return false, generation('block_lists:' .. user_id)
+"""
+
+STORE_LUA = GENERATION_LUA + """
+    local user_id, hidden_ids, expires_at, loaded_generation = ...
+    if generation('block_lists:' .. user_id) ~= loaded_generation then
+        return false
+    end
+    box.space.block_lists:replace({user_id, expires_at, hidden_ids})
+    return true
+"""
+
+DELETE_LUA = GENERATION_LUA + """
+    local user_ids, expires_at = ...
+    box.begin()
+    for _, user_id in ipairs(user_ids) do
+        box.space.block_lists:delete(user_id)
+        bump_generation('block_lists:' .. user_id, expires_at)
+    end
+    box.commit()
+"""
+
+
+def get(user_id: int) -> Tuple[Optional[List[int]], Optional[int]]:
+    """
+    Cached ascending ids of the users hidden from a user, or None if not
+    cached or Tarantool is unavailable.
+
+    On a miss the generation to pass to ``store`` is returned too; it is
+    None if Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().eval(GET_LUA, [user_id, int(time.time())])
+    except Exception as e:
+        logger.warning(f"Error reading block list from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return None, None
+    found, value = result[0], result[1]
+    if found:
+        return list(value), None
+    return None, value
+
+
+def store(user_id: int, hidden_ids: List[int], generation: Optional[int]) -> None:
+    """
+    Cache the users hidden from a user for BLOCK_LISTS_CACHE_TTL_SECONDS,
+    unless the list was invalidated since ``generation`` was read.
+    """
+    if generation is None:
+        return
+    try:
+        get_shared_tarantool_connection().eval(STORE_LUA, [
+            user_id, hidden_ids, int(time.time()) + settings.BLOCK_LISTS_CACHE_TTL_SECONDS, generation
+        ])
+    except Exception as e:
+        logger.warning(f"Error caching block list in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def invalidate(user_ids: Iterable[int]) -> None:
+    """
+    Drop the cached block lists of users who blocked or unblocked each other.
+    """
+    try:
+        get_shared_tarantool_connection().eval(DELETE_LUA, [
+            list(user_ids), int(time.time()) + settings.CACHE_GENERATION_TTL_SECONDS
+        ])
+    except Exception as e:
+        logger.warning(f"Error invalidating block lists in Tarantool: {e}")
+        reset_shared_tarantool_connection()
@@ -0,0 +1,29 @@
+"""
+Generations of cached keys, for caches loaded from PostgreSQL.
+
+A loader reads the generation of a key before its query and stores the
+result only if the generation is unchanged; invalidation bumps it. So a
+load that raced an invalidation cannot write back the rows it read before
+the change. Generations live in the ``cache_generations`` space for
+CACHE_GENERATION_TTL_SECONDS after the last invalidation; a load running
+longer than that is not protected.
+
+The Lua helpers are prepended to the scripts of the caches that use them,
+so the check and the write run in one call without yielding.
+"""
+
+GENERATION_LUA = """
+    local function generation(key)
+        local t = box.space.cache_generations:get(key)
+        if t == nil then
+            return 0
+        end
+        return t[2]
+    end
+
+    local function bump_generation(key, expires_at)
+        box.space.cache_generations:upsert(
+            {key, 1, expires_at}, {{'+', 2, 1}, {'=', 3, expires_at}}
+        )
+    end
+"""
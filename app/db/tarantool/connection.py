@@ -1,7 +1,17 @@
+import threading
+import time
+
 import tarantool
 
 from app.core.config import settings
 
+# After a failed connect, hot paths skip Tarantool for a while instead of
+# waiting for the connector's reconnect attempts on every request
+SHARED_CONNECTION_RETRY_SECONDS = 5
+
+_local = threading.local()
+_unavailable_until = 0.0
+
 # Create a connection pool to Tarantool
 def get_tarantool_connection():
     return tarantool.connect(
@@ -11,6 +21,34 @@ def get_tarantool_connection():
         password=settings.TARANTOOL_PASSWORD
     )
 
+
+# Long-lived connection for hot paths. The connector is not thread-safe,
+# so every worker thread keeps its own connection instead of sharing one.
+def get_shared_tarantool_connection():
+    global _unavailable_until
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        if time.monotonic() < _unavailable_until:
+            raise tarantool.error.NetworkError("Tarantool is unavailable")
+        try:
+            conn = get_tarantool_connection()
+        except Exception:
+            _unavailable_until = time.monotonic() + SHARED_CONNECTION_RETRY_SECONDS
+            raise
+        _local.conn = conn
+    return conn
+
+
+def reset_shared_tarantool_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 # Initialize Tarantool spaces and indexes
 def init_tarantool():
     conn = get_tarantool_connection()
@@ -90,4 +128,240 @@ def init_tarantool():
         end
     """)
     
+    # Rendered response cache space
+    conn.eval("""
+        if not box.space.response_cache then
+            box.schema.space.create('response_cache')
+            box.space.response_cache:format({
+                {name = 'key', type = 'string'},
+                {name = 'etag', type = 'string'},
+                {name = 'body', type = 'varbinary'},
+                {name = 'meta', type = 'map'},
+                {name = 'expires_at', type = 'unsigned'}
+            })
+            box.space.response_cache:create_index('primary', {
+                parts = {'key'},
+                type = 'HASH',
+                unique = true
+            })
+            box.space.response_cache:create_index('expires_at', {
+                parts = {'expires_at'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
+    # Badge counters space
+    conn.eval("""
+        if not box.space.badge_counters then
+            box.schema.space.create('badge_counters')
+            box.space.badge_counters:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'counters', type = 'map'}
+            })
+            box.space.badge_counters:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+        end
+    """)
+    
+    # Recent messages of each conversation
+    conn.eval("""
+        if not box.space.recent_messages then
+            box.schema.space.create('recent_messages')
+            box.space.recent_messages:format({
+                {name = 'pair_key', type = 'string'},
+                {name = 'message_id', type = 'unsigned'},
+                {name = 'message', type = 'map'}
+            })
+            box.space.recent_messages:create_index('primary', {
+                parts = {'pair_key', 'message_id'},
+                type = 'TREE',
+                unique = true
+            })
+        end
+    """)
+    
+    # User presence space
+    conn.eval("""
+        if not box.space.presence then
+            box.schema.space.create('presence')
+            box.space.presence:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'last_seen', type = 'unsigned'},
+                {name = 'expires_at', type = 'unsigned'}
+            })
+            box.space.presence:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+            box.space.presence:create_index('expires_at', {
+                parts = {'expires_at'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
+    # Friend suggestions space
+    conn.eval("""
+        if not box.space.friend_suggestions then
+            box.schema.space.create('friend_suggestions')
+            box.space.friend_suggestions:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'computed_at', type = 'unsigned'},
+                {name = 'suggestions', type = 'array'}
+            })
+            box.space.friend_suggestions:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+        end
+    """)
+    
+    # Friend ids space
+    conn.eval("""
+        if not box.space.friend_ids then
+            box.schema.space.create('friend_ids')
+            box.space.friend_ids:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'expires_at', type = 'unsigned'},
+                {name = 'friend_ids', type = 'array'}
+            })
+            box.space.friend_ids:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+            box.space.friend_ids:create_index('expires_at', {
+                parts = {'expires_at'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
+    # Feed entries of a post, for updating and deleting it in every feed
+    conn.eval("""
+        if box.space.news_feed_cache.index.post == nil then
+            box.space.news_feed_cache:create_index('post', {
+                parts = {'post_id'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
+    # Block lists space
+    conn.eval("""
+        if not box.space.block_lists then
+            box.schema.space.create('block_lists')
+            box.space.block_lists:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'expires_at', type = 'unsigned'},
+                {name = 'hidden_ids', type = 'array'}
+            })
+            box.space.block_lists:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+        end
+    """)
+    
+    # Seen posts filters space
+    conn.eval("""
+        if not box.space.seen_posts then
+            box.schema.space.create('seen_posts')
+            box.space.seen_posts:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'rotated_at', type = 'unsigned'},
+                {name = 'expires_at', type = 'unsigned'},
+                {name = 'current', type = 'array'},
+                {name = 'previous', type = 'array'}
+            })
+            box.space.seen_posts:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+            box.space.seen_posts:create_index('expires_at', {
+                parts = {'expires_at'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
+    # Feed affinity space
+    conn.eval("""
+        if not box.space.feed_affinity then
+            box.schema.space.create('feed_affinity')
+            box.space.feed_affinity:format({
+                {name = 'user_id', type = 'unsigned'},
+                {name = 'expires_at', type = 'unsigned'},
+                {name = 'author_ids', type = 'array'},
+                {name = 'affinity', type = 'array'}
+            })
+            box.space.feed_affinity:create_index('primary', {
+                parts = {'user_id'},
+                type = 'HASH',
+                unique = true
+            })
+            box.space.feed_affinity:create_index('expires_at', {
+                parts = {'expires_at'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
+    # Trending counters checkpoint space
+    conn.eval("""
+        if not box.space.trending then
+            box.schema.space.create('trending')
+            box.space.trending:format({
+                {name = 'name', type = 'string'},
+                {name = 'saved_at', type = 'unsigned'},
+                {name = 'current', type = 'unsigned'},
+                {name = 'shape', type = 'array'},
+                {name = 'indices', type = 'varbinary'},
+                {name = 'counts', type = 'varbinary'},
+                {name = 'tags', type = 'array'}
+            })
+            box.space.trending:create_index('primary', {
+                parts = {'name'},
+                type = 'HASH',
+                unique = true
+            })
+        end
+    """)
+    
+    # Generations of cached keys, bumped on invalidation
+    conn.eval("""
+        if not box.space.cache_generations then
+            box.schema.space.create('cache_generations')
+            box.space.cache_generations:format({
+                {name = 'key', type = 'string'},
+                {name = 'generation', type = 'unsigned'},
+                {name = 'expires_at', type = 'unsigned'}
+            })
+            box.space.cache_generations:create_index('primary', {
+                parts = {'key'},
+                type = 'HASH',
+                unique = true
+            })
+            box.space.cache_generations:create_index('expires_at', {
+                parts = {'expires_at'},
+                type = 'TREE',
+                unique = false
+            })
+        end
+    """)
+    
     conn.close()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import logging
+import time
+from typing import List, Sequence, Tuple
+
+from app.core.config import settings
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+STORE_LUA = """
+    local rows, expires_at = ...
+    box.begin()
+    for _, row in ipairs(rows) do
+        box.space.feed_affinity:replace({row[1], expires_at, row[2], row[3]})
+    end
+    box.commit()
+"""
+
+
+def store(rows: Sequence[Tuple[int, List[int], List[float]]]) -> None:
+    """
+    Replace the (user id, ascending author ids, affinities) of several
+    users for FEED_AFFINITY_TTL_SECONDS; errors are raised.
+    """
+    if rows:
+        get_shared_tarantool_connection().eval(STORE_LUA, [
+            [list(row) for row in rows],
+            int(time.time()) + settings.FEED_AFFINITY_TTL_SECONDS,
+        ])
+
+
+def get(user_id: int) -> Tuple[List[int], List[float]]:
+    """
+    Ascending author ids and affinities of a user; empty if none are stored
+    or Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().call("box.space.feed_affinity:get", [user_id])
+    except Exception as e:
+        logger.warning(f"Error reading feed affinity from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return [], []
+    if not result or result[0] is None or result[0][1] <= time.time():
+        return [], []
+    return list(result[0][2]), list(result[0][3])
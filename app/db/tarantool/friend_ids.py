@@ -0,0 +1,107 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.core.config import settings
+from app.db.tarantool.cache_generations import GENERATION_LUA
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+GET_MANY_LUA = GENERATION_LUA + """
+    local user_ids, now = ...
+    local found = {}
+    local generations = {}
+    for _, user_id in ipairs(user_ids) do
+        local t = box.space.friend_ids:get(user_id)
+        if t ~= nil and t[2] > now then
+            table.insert(found, {t[1], t[3]})
+        else
+            table.insert(generations, {user_id, generation('friend_ids:' .. user_id)})
+        end
+    end
+    return found, generations
+"""
+
+# Rows invalidated since their generation was read are skipped
+STORE_LUA = GENERATION_LUA + """
+    local rows, expires_at = ...
+    box.begin()
+    for _, row in ipairs(rows) do
+        if generation('friend_ids:' .. row[1]) == row[3] then
+            box.space.friend_ids:replace({row[1], expires_at, row[2]})
+        end
+    end
+    box.commit()
+"""
+
+DELETE_LUA = GENERATION_LUA + """
+    local user_ids, expires_at = ...
+    box.begin()
+    for _, user_id in ipairs(user_ids) do
+        box.space.friend_ids:delete(user_id)
+        bump_generation('friend_ids:' .. user_id, expires_at)
+    end
+    box.commit()
+"""
+
+
+def get_many(user_ids: Iterable[int]) -> Tuple[Dict[int, List[int]], Dict[int, int]]:
+    """
+    Cached sorted friend ids of several users with one call; users not
+    cached (or all of them, if Tarantool is unavailable) are left out.
+
+    Also returns the generations of the users not cached, to pass to
+    ``store``; they are empty if Tarantool is unavailable.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}, {}
+    try:
+        result = get_shared_tarantool_connection().eval(GET_MANY_LUA, [user_ids, int(time.time())])
+    except Exception as e:
+        logger.warning(f"Error reading friend ids from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return {}, {}
+    found = {user_id: list(friend_ids) for user_id, friend_ids in result[0]}
+    return found, dict(result[1])
+
+
+def store(rows: Sequence[Tuple[int, List[int]]], generations: Dict[int, int]) -> None:
+    """
+    Cache the sorted friend ids of several users for FRIEND_IDS_CACHE_TTL_SECONDS.
+
+    Users without a generation, or invalidated since it was read, are skipped.
+    """
+    rows = [
+        [user_id, friend_ids, generations[user_id]]
+        for user_id, friend_ids in rows if user_id in generations
+    ]
+    if not rows:
+        return
+    try:
+        get_shared_tarantool_connection().eval(STORE_LUA, [
+            rows, int(time.time()) + settings.FRIEND_IDS_CACHE_TTL_SECONDS,
+        ])
+    except Exception as e:
+        logger.warning(f"Error caching friend ids in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def invalidate(user_ids: Iterable[int]) -> None:
+    """
+    Drop the cached friend ids of users whose friendships changed.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    try:
+        get_shared_tarantool_connection().eval(DELETE_LUA, [
+            user_ids, int(time.time()) + settings.CACHE_GENERATION_TTL_SECONDS
+        ])
+    except Exception as e:
+        logger.warning(f"Error invalidating friend ids in Tarantool: {e}")
+        reset_shared_tarantool_connection()
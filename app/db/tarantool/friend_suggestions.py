@@ -0,0 +1,93 @@
+import logging
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+# (candidate user id, number of mutual friends)
+Suggestion = Tuple[int, int]
+
+STORE_LUA = """
+    local rows, computed_at = ...
+    box.begin()
+    for _, row in ipairs(rows) do
+        box.space.friend_suggestions:replace({row[1], computed_at, row[2]})
+    end
+    box.commit()
+"""
+
+# Changes of mutual friend counts between full recomputations. A candidate
+# missing from a full list may have any count up to the smallest one
+# listed, so new candidates are only added while the list is not full.
+ADJUST_LUA = """
+    local changes, size, now = ...
+    box.begin()
+    for _, change in ipairs(changes) do
+        local user_id, candidate_id, delta = change[1], change[2], change[3]
+        local t = box.space.friend_suggestions:get(user_id)
+        local suggestions = t ~= nil and t[3] or {}
+        local found = false
+        for i, suggestion in ipairs(suggestions) do
+            if suggestion[1] == candidate_id then
+                suggestion[2] = suggestion[2] + delta
+                if suggestion[2] <= 0 then
+                    table.remove(suggestions, i)
+                end
+                found = true
+                break
+            end
+        end
+        if not found and delta > 0 and #suggestions < size then
+            table.insert(suggestions, {candidate_id, delta})
+        end
+        table.sort(suggestions, function(a, b)
+            return a[2] > b[2] or (a[2] == b[2] and a[1] < b[1])
+        end)
+        box.space.friend_suggestions:replace({user_id, t ~= nil and t[2] or now, suggestions})
+    end
+    box.commit()
+"""
+
+
+def store(rows: Sequence[Tuple[int, List[Suggestion]]]) -> None:
+    """
+    Replace the suggestions of several users; errors are raised.
+    """
+    if rows:
+        get_shared_tarantool_connection().eval(STORE_LUA, [
+            [[user_id, [list(suggestion) for suggestion in suggestions]] for user_id, suggestions in rows],
+            int(time.time()),
+        ])
+
+
+def get(user_id: int) -> Optional[List[Suggestion]]:
+    """
+    Stored suggestions of a user, best first, or None if there are none
+    or Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().call("box.space.friend_suggestions:get", [user_id])
+    except Exception as e:
+        logger.warning(f"Error reading friend suggestions from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return None
+    if not result or result[0] is None:
+        return None
+    return [(candidate_id, mutual) for candidate_id, mutual in result[0][2]]
+
+
+def adjust(changes: Iterable[Tuple[int, int, int]]) -> None:
+    """
+    Apply (user id, candidate id, mutual friend count delta) changes; errors are raised.
+    """
+    changes = [list(change) for change in changes]
+    if changes:
+        get_shared_tarantool_connection().eval(
+            ADJUST_LUA, [changes, settings.FRIEND_SUGGESTIONS_SIZE, int(time.time())]
+        )
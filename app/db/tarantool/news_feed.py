@@ -0,0 +1,121 @@
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+FAN_OUT_LUA = """
+    local user_ids, post_id, created_at, data = ...
+    box.begin()
+    for _, user_id in ipairs(user_ids) do
+        box.space.news_feed_cache:replace({user_id, post_id, created_at, data})
+    end
+    box.commit()
+"""
+
+# Feeds are keyed by (user_id, created_at); ties are ordered by post_id
+PAGE_LUA = """
+    local user_id, before_ts, before_id, limit = ...
+    local key = {user_id}
+    if before_ts > 0 then
+        key = {user_id, before_ts}
+    end
+    local entries = {}
+    for _, t in box.space.news_feed_cache.index.user_feed:pairs(key, {iterator = 'LE'}) do
+        if t[1] ~= user_id or #entries >= limit then
+            break
+        end
+        if before_ts == 0 or t[3] < before_ts or t[2] < before_id then
+            table.insert(entries, {t[2], t[3], t[4].user_id, t[4].visibility})
+        end
+    end
+    return entries
+"""
+
+UPDATE_LUA = """
+    local post_id, data = ...
+    local keys = {}
+    for _, t in box.space.news_feed_cache.index.post:pairs({post_id}) do
+        table.insert(keys, {t[1], t[2]})
+    end
+    box.begin()
+    for _, key in ipairs(keys) do
+        box.space.news_feed_cache:update(key, {{'=', 4, data}})
+    end
+    box.commit()
+"""
+
+DELETE_LUA = """
+    local post_id = ...
+    local keys = {}
+    for _, t in box.space.news_feed_cache.index.post:pairs({post_id}) do
+        table.insert(keys, {t[1], t[2]})
+    end
+    box.begin()
+    for _, key in ipairs(keys) do
+        box.space.news_feed_cache:delete(key)
+    end
+    box.commit()
+"""
+
+
+class FeedEntry(NamedTuple):
+    post_id: int
+    created_at: int
+    author_id: int
+    visibility: str
+
+
+def fan_out(user_ids: Sequence[int], post_id: int, created_at: int, data: Dict[str, Any]) -> None:
+    """
+    Add a post to the feeds of several users, FEED_FAN_OUT_BATCH_SIZE per call.
+    """
+    try:
+        connection = get_shared_tarantool_connection()
+        for start in range(0, len(user_ids), settings.FEED_FAN_OUT_BATCH_SIZE):
+            batch = list(user_ids[start:start + settings.FEED_FAN_OUT_BATCH_SIZE])
+            connection.eval(FAN_OUT_LUA, [batch, post_id, created_at, data])
+    except Exception as e:
+        logger.warning(f"Error adding post to news feeds in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def get_page(user_id: int, before_ts: int, before_id: int, limit: int) -> Optional[List[FeedEntry]]:
+    """
+    Feed entries of a user, newest first, after the (created_at, post_id)
+    of the previous page (0, 0 for the first); None if Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().eval(PAGE_LUA, [user_id, before_ts, before_id, limit])
+    except Exception as e:
+        logger.warning(f"Error reading news feed from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return None
+    return [FeedEntry(*entry) for entry in (result[0] if result else [])]
+
+
+def update_post(post_id: int, data: Dict[str, Any]) -> None:
+    """
+    Replace the data of a post in every feed it was added to.
+    """
+    try:
+        get_shared_tarantool_connection().eval(UPDATE_LUA, [post_id, data])
+    except Exception as e:
+        logger.warning(f"Error updating post in news feeds in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def delete_post(post_id: int) -> None:
+    """
+    Remove a post from every feed it was added to.
+    """
+    try:
+        get_shared_tarantool_connection().eval(DELETE_LUA, [post_id])
+    except Exception as e:
+        logger.warning(f"Error deleting post from news feeds in Tarantool: {e}")
+        reset_shared_tarantool_connection()
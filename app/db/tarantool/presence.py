@@ -0,0 +1,66 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple
+
+from app.core.config import settings
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+# A user is online until expires_at; the tuple is kept afterwards for
+# "last seen" and purged by a fiber in tarantool_config/init.lua
+GET_MANY_LUA = """
+    local user_ids, now = ...
+    local found = {}
+    for _, user_id in ipairs(user_ids) do
+        local t = box.space.presence:get(user_id)
+        if t ~= nil then
+            table.insert(found, {t[1], t[2], t[3] > now})
+        end
+    end
+    return found
+"""
+
+
+class UserPresence(NamedTuple):
+    online: bool
+    last_seen: datetime
+
+
+def touch(user_id: int) -> None:
+    """
+    Mark a user as online for PRESENCE_TTL_SECONDS.
+    """
+    now = int(time.time())
+    try:
+        get_shared_tarantool_connection().call(
+            "box.space.presence:replace", [[user_id, now, now + settings.PRESENCE_TTL_SECONDS]]
+        )
+    except Exception as e:
+        logger.warning(f"Error updating presence in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def get_presence(user_ids: Iterable[int]) -> Dict[int, UserPresence]:
+    """
+    Presence of several users with one call; users never seen are left out.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    try:
+        result = get_shared_tarantool_connection().eval(
+            GET_MANY_LUA, [user_ids, int(time.time())]
+        )
+    except Exception as e:
+        logger.warning(f"Error reading presence from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return {}
+    return {
+        user_id: UserPresence(online, datetime.utcfromtimestamp(last_seen))
+        for user_id, last_seen, online in (result[0] if result else [])
+    }
@@ -0,0 +1,219 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+from app.models.conversation import Conversation
+from app.models.message import Message
+
+logger = logging.getLogger(__name__)
+
+# Session.info key of the cache updates waiting for the commit
+PENDING_UPDATES_KEY = "recent_messages_updates"
+
+# The tuple with message_id 0 of a conversation holds its cached version.
+# A conversation is only served from the cache while this version matches
+# Conversation.version in Postgres, so a missed update costs a reload, never
+# a stale page.
+GET_LUA = """
+    local pair_key, limit = ...
+    local space = box.space.recent_messages
+    local header = space:get({pair_key, 0})
+    if header == nil then
+        return nil
+    end
+    local messages = {}
+    for _, t in space:pairs({pair_key}, {iterator = 'REQ'}) do
+        if t[2] == 0 or #messages >= limit then
+            break
+        end
+        table.insert(messages, t[3])
+    end
+    return {header[3], messages}
+"""
+
+FILL_LUA = """
+    local pair_key, header, messages = ...
+    local space = box.space.recent_messages
+    box.begin()
+    local ids = {}
+    for _, t in space:pairs({pair_key}) do
+        table.insert(ids, t[2])
+    end
+    for _, id in ipairs(ids) do
+        space:delete({pair_key, id})
+    end
+    for _, message in ipairs(messages) do
+        space:replace({pair_key, message.id, message})
+    end
+    space:replace({pair_key, 0, header})
+    box.commit()
+"""
+
+# Updates carry the conversation version they produce and are applied
+# only on top of the version before them; otherwise the cached
+# conversation is dropped and reloaded by the next read.
+APPLY_LUA = """
+    local pair_key, updates, size = ...
+    local space = box.space.recent_messages
+    box.begin()
+    local header = space:get({pair_key, 0})
+    if header == nil then
+        box.commit()
+        return
+    end
+    local version, complete = header[3].version, header[3].complete
+    for _, update in ipairs(updates) do
+        local update_version, op, arg = update[1], update[2], update[3]
+        if update_version ~= version + 1 then
+            space:delete({pair_key, 0})
+            box.commit()
+            return
+        end
+        version = update_version
+        if op == 'append' then
+            space:replace({pair_key, arg.id, arg})
+        elseif op == 'delete' then
+            space:delete({pair_key, arg.id})
+        elseif op == 'read' then
+            local unread = {}
+            for _, t in space:pairs({pair_key, 1}, {iterator = 'GE'}) do
+                if t[1] ~= pair_key or t[2] > arg.up_to_id then
+                    break
+                end
+                if t[3].recipient_id == arg.reader_id and not t[3].is_read then
+                    table.insert(unread, t[3])
+                end
+            end
+            for _, message in ipairs(unread) do
+                message.is_read = true
+                message.read_at = arg.read_at
+                space:replace({pair_key, message.id, message})
+            end
+        elseif op == 'unread' then
+            local read = {}
+            for _, t in space:pairs({pair_key, arg.from_id}, {iterator = 'GE'}) do
+                if t[1] ~= pair_key then
+                    break
+                end
+                if t[3].recipient_id == arg.reader_id and t[3].is_read then
+                    table.insert(read, t[3])
+                end
+            end
+            for _, message in ipairs(read) do
+                message.is_read = false
+                message.read_at = box.NULL
+                space:replace({pair_key, message.id, message})
+            end
+        end
+    end
+
+    -- Keep only the latest messages
+    local ids = {}
+    for _, t in space:pairs({pair_key, 1}, {iterator = 'GE'}) do
+        if t[1] ~= pair_key then
+            break
+        end
+        table.insert(ids, t[2])
+    end
+    for i = 1, #ids - size do
+        space:delete({pair_key, ids[i]})
+        complete = false
+    end
+    space:replace({pair_key, 0, {version = version, complete = complete}})
+    box.commit()
+"""
+
+
+def pair_key(user_a: int, user_b: int) -> str:
+    low, high = Conversation.pair(user_a, user_b)
+    return f"{low}:{high}"
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    return {
+        "id": message.id,
+        "sender_id": message.sender_id,
+        "recipient_id": message.recipient_id,
+        "text": message.text,
+        "is_read": bool(message.is_read),
+        "created_at": message.created_at.isoformat(),
+        "read_at": message.read_at.isoformat() if message.read_at else None,
+    }
+
+
+def get_recent(key: str, version: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Latest ``limit`` messages of a conversation, newest first, or None if
+    the cache cannot answer for this conversation version.
+    """
+    try:
+        result = get_shared_tarantool_connection().eval(GET_LUA, [key, limit])
+    except Exception as e:
+        logger.warning(f"Error reading recent messages from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return None
+    if not result or result[0] is None:
+        return None
+    header, messages = result[0]
+    if header.get("version") != version:
+        return None
+    if len(messages) < limit and not header.get("complete"):
+        # Messages were deleted or trimmed, the page has to come from Postgres
+        return None
+    return messages
+
+
+def fill(key: str, version: int, messages: List[Message], complete: bool) -> None:
+    """
+    Replace the cached messages of a conversation with the latest ones from Postgres.
+
+    ``complete`` tells whether they are all messages of the conversation.
+    """
+    try:
+        get_shared_tarantool_connection().eval(FILL_LUA, [
+            key,
+            {"version": version, "complete": complete},
+            [message_to_dict(message) for message in messages[:settings.RECENT_MESSAGES_SIZE]],
+        ])
+    except Exception as e:
+        logger.warning(f"Error filling recent messages in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def queue_update(db: Session, conversation: Conversation, op: str, arg: Dict[str, Any]) -> None:
+    """
+    Bump the conversation version and apply the change to the cache after commit.
+    """
+    conversation.version = (conversation.version or 0) + 1
+    key = pair_key(conversation.user_low_id, conversation.user_high_id)
+    updates = db.info.setdefault(PENDING_UPDATES_KEY, {})
+    updates.setdefault(key, []).append([conversation.version, op, arg])
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_updates(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop(PENDING_UPDATES_KEY, None)
+    if not pending:
+        return
+    try:
+        conn = get_shared_tarantool_connection()
+        for key, updates in pending.items():
+            conn.eval(APPLY_LUA, [key, updates, settings.RECENT_MESSAGES_SIZE])
+    except Exception as e:
+        logger.warning(f"Error updating recent messages in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_updates(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(PENDING_UPDATES_KEY, None)
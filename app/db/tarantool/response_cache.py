@@ -0,0 +1,331 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.db.tarantool.cache_generations import GENERATION_LUA
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+# How long to stop talking to Tarantool after a failed call
+L2_RETRY_AFTER_SECONDS = 5
+
+GET_MANY_LUA = GENERATION_LUA + """
+    local keys, now = ...
+    local found = {}
+    local generations = {}
+    for _, key in ipairs(keys) do
+        local t = box.space.response_cache:get(key)
+        if t ~= nil and t[5] > now then
+            table.insert(found, {t[1], t[2], t[3], t[4]})
+        else
+            table.insert(generations, {key, generation(key)})
+        end
+    end
+    return found, generations
+"""
+
+# Rows are {key, etag, body, meta, generation}; rows whose key was
+# invalidated since the generation was read are skipped
+SET_MANY_LUA = GENERATION_LUA + """
+    local rows, expires_at = ...
+    local stored = {}
+    for _, row in ipairs(rows) do
+        if generation(row[1]) == row[5] then
+            box.space.response_cache:replace({row[1], row[2], row[3], row[4], expires_at})
+            table.insert(stored, row[1])
+        end
+    end
+    return stored
+"""
+
+INVALIDATE_LUA = GENERATION_LUA + """
+    local keys, expires_at = ...
+    for _, key in ipairs(keys) do
+        box.space.response_cache:delete(key)
+        bump_generation(key, expires_at)
+    end
+"""
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    meta: Dict[str, Any]
+
+
+# Cache keys
+def post_key(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def post_comments_key(post_id: int, limit: int) -> str:
+    return f"post_comments:{post_id}:{limit}"
+
+
+def post_comments_keys(post_id: int) -> List[str]:
+    """All cached first pages of comments for a post."""
+    return [
+        post_comments_key(post_id, limit)
+        for limit in settings.RESPONSE_CACHE_COMMENT_PAGE_SIZES
+    ]
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def comment_key(comment_id: int) -> str:
+    return f"comment:{comment_id}"
+
+
+def make_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache of rendered JSON response bodies.
+
+    Entries live in the Tarantool ``response_cache`` space (shared by all
+    workers) and in a small in-process LRU in front of it. Writers
+    invalidate both levels; the L1 of other workers only lags behind by
+    RESPONSE_CACHE_L1_TTL_SECONDS. Metrics are per worker process.
+
+    A miss returns the generation of the key (see cache_generations), and
+    the body rendered after it is stored only if the key was not
+    invalidated since. Without a generation, because Tarantool was
+    unavailable, bodies are kept in the L1 only.
+    """
+
+    def __init__(
+        self,
+        ttl: int,
+        l1_ttl: float,
+        l1_max_entries: int,
+        connection_factory=get_shared_tarantool_connection,
+        enabled: bool = True,
+        generation_ttl: int = 600,
+    ):
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl
+        self.l1_ttl = l1_ttl
+        self.l1_max_entries = l1_max_entries
+        self.enabled = enabled
+        self._connection_factory = connection_factory
+        self._l1: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._l2_disabled_until = 0.0
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.invalidations = 0
+
+    # L1
+
+    def _l1_get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._l1.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry
+
+    def _l1_set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._l1[key] = (time.monotonic() + self.l1_ttl, entry)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    # L2
+
+    def _l2(self):
+        if time.monotonic() < self._l2_disabled_until:
+            return None
+        try:
+            return self._connection_factory()
+        except Exception as e:
+            self._l2_failed(e)
+            return None
+
+    def _l2_failed(self, error: Exception) -> None:
+        logger.warning(f"Response cache: Tarantool unavailable: {error}")
+        self._l2_disabled_until = time.monotonic() + L2_RETRY_AFTER_SECONDS
+        reset_shared_tarantool_connection()
+
+    def _l2_get_many(self, keys: List[str]) -> Tuple[Dict[str, CachedResponse], Dict[str, int]]:
+        conn = self._l2()
+        if conn is None or not keys:
+            return {}, {}
+        try:
+            result = conn.eval(GET_MANY_LUA, [keys, int(time.time())])
+        except Exception as e:
+            self._l2_failed(e)
+            return {}, {}
+        found = {}
+        for key, etag, body, meta in result[0]:
+            found[key] = CachedResponse(body, etag, meta or {})
+        return found, dict(result[1])
+
+    def _store(self, entries: Dict[str, CachedResponse], generations: Dict[str, int]) -> None:
+        """
+        Store entries with a generation in Tarantool if their key is still
+        at it, and in the L1 if so. Entries without one go to the L1 only,
+        as do all of them while Tarantool is unavailable: the L1 lags
+        behind an invalidation by at most its TTL.
+        """
+        rows = [
+            [key, entry.etag, entry.body, entry.meta, generations[key]]
+            for key, entry in entries.items() if key in generations
+        ]
+        stored = [key for key in entries if key not in generations]
+        conn = self._l2() if rows else None
+        if conn is None:
+            stored = list(entries)
+        else:
+            try:
+                result = conn.eval(SET_MANY_LUA, [rows, int(time.time()) + self.ttl])
+                stored.extend(result[0])
+            except Exception as e:
+                self._l2_failed(e)
+                stored = list(entries)
+        for key in stored:
+            self._l1_set(key, entries[key])
+
+    # Public API
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CachedResponse]:
+        return self.lookup(keys)[0]
+
+    def get_with_generation(self, key: str) -> Tuple[Optional[CachedResponse], Optional[int]]:
+        """Look up a key; on a miss also return the generation to pass to ``set``."""
+        found, generations = self.lookup([key])
+        return found.get(key), generations.get(key)
+
+    def lookup(self, keys: Iterable[str]) -> Tuple[Dict[str, CachedResponse], Dict[str, int]]:
+        """
+        Look up several keys, going to Tarantool once for all L1 misses.
+
+        Returns the entries found and the generations of the keys missing
+        from Tarantool, to pass to ``set_many`` with the loaded bodies.
+        """
+        if not self.enabled:
+            return {}, {}
+        found: Dict[str, CachedResponse] = {}
+        missing: List[str] = []
+        for key in keys:
+            entry = self._l1_get(key)
+            if entry is None:
+                missing.append(key)
+            else:
+                found[key] = entry
+                self.l1_hits += 1
+                self.bytes_saved += len(entry.body)
+
+        from_l2, generations = self._l2_get_many(missing)
+        for key, entry in from_l2.items():
+            self._l1_set(key, entry)
+            found[key] = entry
+            self.l2_hits += 1
+            self.bytes_saved += len(entry.body)
+        self.misses += len(missing) - len(from_l2)
+        return found, generations
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        meta: Optional[Dict[str, Any]] = None,
+        generation: Optional[int] = None,
+    ) -> CachedResponse:
+        """
+        Store a rendered body and return it together with its ETag.
+
+        ``generation`` is the one returned by the lookup that missed.
+        """
+        generations = {key: generation} if generation is not None else {}
+        return self.set_many({key: body}, {key: meta or {}}, generations)[key]
+
+    def set_many(
+        self,
+        bodies: Dict[str, bytes],
+        meta: Optional[Dict[str, Dict[str, Any]]] = None,
+        generations: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, CachedResponse]:
+        """
+        Store several rendered bodies with a single Tarantool call. Bodies
+        of keys invalidated since ``generations`` were read are not stored.
+        """
+        meta = meta or {}
+        entries = {
+            key: CachedResponse(body, make_etag(body), meta.get(key) or {})
+            for key, body in bodies.items()
+        }
+        if not self.enabled or not entries:
+            return entries
+        self._store(entries, generations or {})
+        return entries
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop entries from both cache levels."""
+        if not self.enabled or not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._l1.pop(key, None)
+        self.invalidations += len(keys)
+        conn = self._l2()
+        if conn is None:
+            return
+        try:
+            conn.eval(INVALIDATE_LUA, [list(keys), int(time.time()) + self.generation_ttl])
+        except Exception as e:
+            self._l2_failed(e)
+
+    def invalidate_post(self, post_id: int) -> None:
+        """Drop a post and the cached first pages of its comments."""
+        self.invalidate(post_key(post_id), *post_comments_keys(post_id))
+
+    def clear_l1(self) -> None:
+        with self._lock:
+            self._l1.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.l1_hits + self.l2_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "invalidations": self.invalidations,
+            "l1_entries": len(self._l1),
+        }
+
+
+response_cache = ResponseCache(
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    l1_ttl=settings.RESPONSE_CACHE_L1_TTL_SECONDS,
+    l1_max_entries=settings.RESPONSE_CACHE_L1_MAX_ENTRIES,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+    generation_ttl=settings.CACHE_GENERATION_TTL_SECONDS,
+)
@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Iterable, List, Sequence
+
+from app.core.bloom import bloom_parameters, contains, word_masks
+from app.core.config import settings
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+PARAMETERS = bloom_parameters(settings.FEED_SEEN_CAPACITY, settings.FEED_SEEN_FALSE_POSITIVE_RATE)
+
+# A filter is (user_id, rotated_at, expires_at, current words, previous words).
+# Posts are added to the current generation; once it is FEED_SEEN_ROTATION_SECONDS
+# old it becomes the previous one, so a post is remembered for one to two periods.
+ADD_LUA = """
+    local user_id, now, rotation, words, masks = ...
+    local space = box.space.seen_posts
+    box.begin()
+    local t = space:get(user_id)
+    if t == nil or #t[4] ~= words or now >= t[2] + rotation then
+        local empty = {}
+        for i = 1, words do
+            empty[i] = 0
+        end
+        local previous = empty
+        if t ~= nil and #t[4] == words and now < t[2] + 2 * rotation then
+            previous = t[4]
+        end
+        space:replace({user_id, now, now + 2 * rotation, empty, previous})
+    end
+    local ops = {}
+    for _, mask in ipairs(masks) do
+        table.insert(ops, {'|', '[4][' .. mask[1] .. ']', mask[2]})
+    end
+    space:update(user_id, ops)
+    box.commit()
+"""
+
+
+def add(user_id: int, post_ids: Iterable[int]) -> None:
+    """
+    Record posts as seen by a user with one call.
+    """
+    masks = word_masks(post_ids, PARAMETERS)
+    if not masks:
+        return
+    try:
+        get_shared_tarantool_connection().eval(ADD_LUA, [
+            user_id, int(time.time()), settings.FEED_SEEN_ROTATION_SECONDS, PARAMETERS.words,
+            [[index + 1, mask] for index, mask in masks.items()],
+        ])
+    except Exception as e:
+        logger.warning(f"Error recording seen posts in Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def get(user_id: int) -> List[Sequence[int]]:
+    """
+    Live generations of the seen posts filter of a user; empty if the user
+    has none or Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().call("box.space.seen_posts:get", [user_id])
+    except Exception as e:
+        logger.warning(f"Error reading seen posts from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return []
+    if not result or result[0] is None:
+        return []
+    _, rotated_at, _, current, previous = result[0]
+    age = time.time() - rotated_at
+    if age < settings.FEED_SEEN_ROTATION_SECONDS:
+        return [current, previous]
+    if age < 2 * settings.FEED_SEEN_ROTATION_SECONDS:
+        return [current]
+    return []
+
+
+def is_seen(filters: List[Sequence[int]], post_id: int) -> bool:
+    """
+    Whether a post may have been seen, given the filters returned by ``get``.
+    """
+    return any(contains(words, post_id, PARAMETERS) for words in filters)
@@ -0,0 +1,41 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.db.tarantool.connection import (
+    get_shared_tarantool_connection,
+    reset_shared_tarantool_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("current", "shape", "indices", "counts", "tags")
+
+
+def save(name: str, state: Dict[str, Any]) -> None:
+    """
+    Replace the checkpoint of a trending counter.
+    """
+    try:
+        get_shared_tarantool_connection().call("box.space.trending:replace", [
+            [name, int(time.time())] + [state[field] for field in FIELDS]
+        ])
+    except Exception as e:
+        logger.warning(f"Error saving trending checkpoint to Tarantool: {e}")
+        reset_shared_tarantool_connection()
+
+
+def load(name: str) -> Optional[Dict[str, Any]]:
+    """
+    Checkpoint of a trending counter, or None if there is none or
+    Tarantool is unavailable.
+    """
+    try:
+        result = get_shared_tarantool_connection().call("box.space.trending:get", [name])
+    except Exception as e:
+        logger.warning(f"Error loading trending checkpoint from Tarantool: {e}")
+        reset_shared_tarantool_connection()
+        return None
+    if not result or result[0] is None:
+        return None
+    return dict(zip(FIELDS, result[0][2:]))
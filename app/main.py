@@ -1,19 +1,56 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.core.events import start_event_listener, stop_event_listener
+from app.core.graph import social_graph
+from app.core.notifications import notification_buffer
+from app.core.suggestions import suggestion_updater
+from app.core.tasks import start_background_task, start_periodic_task, stop_periodic_tasks
+from app.core.trending import trending_tags
+from app.core.user_index import user_index
 from app.db.init_db import init_db
+from app.db.tarantool.badges import reconcile_badges
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    start_event_listener(asyncio.get_running_loop())
+    start_periodic_task(
+        "reconcile_badges", settings.BADGE_RECONCILE_INTERVAL_SECONDS, reconcile_badges
+    )
+    start_periodic_task(
+        "flush_notifications", settings.NOTIFICATION_FLUSH_INTERVAL_SECONDS, notification_buffer.flush
+    )
+    start_periodic_task(
+        "update_friend_suggestions",
+        settings.FRIEND_SUGGESTIONS_UPDATE_INTERVAL_SECONDS,
+        suggestion_updater.flush,
+    )
+    social_graph.reload()
+    start_periodic_task(
+        "reload_social_graph", settings.GRAPH_RELOAD_INTERVAL_SECONDS, social_graph.reload
+    )
+    start_background_task("resume_trending_tags", trending_tags.resume)
+    start_periodic_task(
+        "checkpoint_trending_tags", settings.TRENDING_CHECKPOINT_INTERVAL_SECONDS, trending_tags.checkpoint
+    )
+    # User suggestions are served from PostgreSQL until the index is loaded
+    start_background_task("load_user_index", user_index.load)
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    await stop_periodic_tasks()
+    await run_in_threadpool(notification_buffer.flush)
+    await run_in_threadpool(suggestion_updater.flush)
+    await run_in_threadpool(trending_tags.checkpoint)
+    stop_event_listener()
 
 
 app = FastAPI(
@@ -1,9 +1,14 @@
 from app.models.user import User
-from app.models.post import Post
+from app.models.post import Post, PostVisibility
 from app.models.friendship import Friendship, FriendshipStatus
 from app.models.comment import Comment
 from app.models.like import Like
 from app.models.message import Message
+from app.models.conversation import Conversation
+from app.models.notification import Notification, NotificationActor, NotificationKind
+from app.models.block import Block
+from app.models.hashtag import PostHashtag
+from app.models.mention import Mention
 
 # For type checking
 from app.db.postgresql.base_class import Base
\ No newline at end of file
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.postgresql.base_class import Base
+
+
+class Block(Base):
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # blocker_id does not see blocked_id and the other way round;
+    # lookups by blocker_id use the unique constraint
+    blocker_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    blocked_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
+    
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    blocked: Mapped["User"] = relationship("User", foreign_keys=[blocked_id])
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('blocker_id', 'blocked_id', name='unique_block_pair'),
+        CheckConstraint('blocker_id <> blocked_id', name='check_block_not_self'),
+    )
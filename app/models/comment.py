@@ -1,17 +1,56 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.postgresql.base_class import Base
 
+# Replies deeper than this are rejected
+MAX_COMMENT_DEPTH = 20
+
+# Every id in a path is zero-padded to this width, so paths sort in thread order
+PATH_SEGMENT_WIDTH = 10
+
+# Sorts after any digit: the paths of a subtree lie in [path, path + PATH_END)
+PATH_END = "~"
+
+
+def comment_path(parent_path: Optional[str], comment_id: int) -> str:
+    """
+    Materialised path of a comment: the padded ids of its ancestors and its own.
+    """
+    return (parent_path or "") + str(comment_id).zfill(PATH_SEGMENT_WIDTH)
+
+
+def path_ids(path: str) -> List[int]:
+    """
+    Ids of a path, from the top-level comment down to the comment itself.
+    """
+    return [
+        int(path[start:start + PATH_SEGMENT_WIDTH])
+        for start in range(0, len(path), PATH_SEGMENT_WIDTH)
+    ]
+
 
 class Comment(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
     post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), index=True)
     
+    # Thread: the comment replied to, None for top-level comments. Replies of
+    # a comment are deleted with it by the database
+    parent_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("comment.id", ondelete="CASCADE"), index=True, nullable=True
+    )
+    # Ordered bytewise, also in PostgreSQL, for the subtree range queries
+    path: Mapped[str] = mapped_column(
+        String().with_variant(String(collation="C"), "postgresql"), nullable=False, default=""
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Replies at any depth below the comment, for collapsed threads
+    reply_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
     # Content
     content: Mapped[str] = mapped_column(Text, nullable=False)
     
@@ -27,4 +66,12 @@ class Comment(Base):
         primaryjoin="and_(Comment.id == Like.comment_id, Like.post_id == None)",
         back_populates="comment", 
         cascade="all, delete-orphan"
-    )
\ No newline at end of file
+    )
+    # Lets the unit of work delete replies before their parent when a post
+    # is deleted with its comments
+    parent: Mapped[Optional["Comment"]] = relationship("Comment", remote_side=[id])
+    
+    # A thread or subtree of a post is one range scan of this index
+    __table_args__ = (
+        Index('ix_comment_post_path', 'post_id', 'path'),
+    )
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.postgresql.base_class import Base
+
+
+class Conversation(Base):
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # Participants, always stored so that user_low_id < user_high_id
+    user_low_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    user_high_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    
+    # Latest message of the conversation
+    last_message_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("message.id", ondelete="SET NULL"), nullable=True
+    )
+    last_activity: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    # Unread messages for each participant
+    unread_low: Mapped[int] = mapped_column(Integer, default=0)
+    unread_high: Mapped[int] = mapped_column(Integer, default=0)
+    
+    # Read watermarks: id of the latest message each participant has read
+    last_read_low: Mapped[int] = mapped_column(Integer, default=0)
+    last_read_high: Mapped[int] = mapped_column(Integer, default=0)
+    
+    # Incremented by every change to the messages of the conversation,
+    # validates the recent messages cached in Tarantool
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    
+    # Relationships
+    last_message: Mapped[Optional["Message"]] = relationship("Message", foreign_keys=[last_message_id])
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('user_low_id', 'user_high_id', name='unique_conversation_pair'),
+        # Inbox of a user ordered by activity, for either side of the pair
+        Index('ix_conversation_low_activity', 'user_low_id', 'last_activity'),
+        Index('ix_conversation_high_activity', 'user_high_id', 'last_activity'),
+    )
+    
+    @staticmethod
+    def pair(user_a: int, user_b: int) -> Tuple[int, int]:
+        return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+    
+    def unread_for(self, user_id: int) -> int:
+        return self.unread_low if user_id == self.user_low_id else self.unread_high
+    
+    def add_unread(self, user_id: int, delta: int) -> None:
+        if user_id == self.user_low_id:
+            self.unread_low = max((self.unread_low or 0) + delta, 0)
+        else:
+            self.unread_high = max((self.unread_high or 0) + delta, 0)
+    
+    def set_unread(self, user_id: int, count: int) -> None:
+        if user_id == self.user_low_id:
+            self.unread_low = count
+        else:
+            self.unread_high = count
+    
+    def last_read_for(self, user_id: int) -> int:
+        last_read = self.last_read_low if user_id == self.user_low_id else self.last_read_high
+        return last_read or 0
+    
+    def set_last_read(self, user_id: int, message_id: int) -> None:
+        if user_id == self.user_low_id:
+            self.last_read_low = message_id
+        else:
+            self.last_read_high = message_id
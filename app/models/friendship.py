@@ -1,9 +1,10 @@
 from datetime import datetime
 from enum import Enum as PyEnum
-from typing import Optional
+from typing import Optional, Tuple
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import CheckConstraint, DateTime, Enum, ForeignKey, UniqueConstraint, select, union_all
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import Subquery
 
 from app.db.postgresql.base_class import Base
 
@@ -16,8 +17,12 @@ class FriendshipStatus(str, PyEnum):
 
 class Friendship(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
-    friend_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
+    # One row per pair of users, always stored so that user_low_id < user_high_id;
+    # lookups by user_low_id use the unique constraint
+    user_low_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    user_high_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
+    # The user who sent the request, one of the pair
+    requester_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
     
     # Status
     status: Mapped[FriendshipStatus] = mapped_column(
@@ -30,5 +35,44 @@ class Friendship(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    user: Mapped["User"] = relationship("User", foreign_keys=[user_id], back_populates="sent_friend_requests")
-    friend: Mapped["User"] = relationship("User", foreign_keys=[friend_id], back_populates="received_friend_requests")
\ No newline at end of file
+    user_low: Mapped["User"] = relationship("User", foreign_keys=[user_low_id], back_populates="friendships_low")
+    user_high: Mapped["User"] = relationship("User", foreign_keys=[user_high_id], back_populates="friendships_high")
+    requester: Mapped["User"] = relationship("User", foreign_keys=[requester_id])
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('user_low_id', 'user_high_id', name='unique_friendship_pair'),
+        CheckConstraint('user_low_id < user_high_id', name='check_friendship_pair_order'),
+        CheckConstraint(
+            'requester_id = user_low_id OR requester_id = user_high_id',
+            name='check_friendship_requester'
+        ),
+    )
+    
+    @staticmethod
+    def pair(user_a: int, user_b: int) -> Tuple[int, int]:
+        return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+    
+    @property
+    def recipient_id(self) -> int:
+        return self.other_id(self.requester_id)
+    
+    def other_id(self, user_id: int) -> int:
+        return self.user_high_id if user_id == self.user_low_id else self.user_low_id
+    
+    def other(self, user_id: int) -> Optional["User"]:
+        return self.user_high if user_id == self.user_low_id else self.user_low
+
+
+def friend_edges(name: str = "friend_edges") -> Subquery:
+    """
+    Accepted friendships in both directions, as (user_id, friend_id) rows.
+
+    Each branch of the UNION ALL filters by its own side of the pair, so a
+    condition on ``user_id`` is pushed down to the index of that column.
+    """
+    accepted = Friendship.status == FriendshipStatus.ACCEPTED
+    return union_all(
+        select(Friendship.user_low_id.label("user_id"), Friendship.user_high_id.label("friend_id")).where(accepted),
+        select(Friendship.user_high_id.label("user_id"), Friendship.user_low_id.label("friend_id")).where(accepted),
+    ).subquery(name)
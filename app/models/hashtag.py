@@ -0,0 +1,54 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.postgresql.base_class import Base
+
+HASHTAG_MAX_LENGTH = 100
+# Tags beyond this many in one post are ignored
+MAX_HASHTAGS_PER_POST = 30
+
+# "#" not preceded by a word character, so "a#b" and "##" are not tags
+HASHTAG_PATTERN = re.compile(r"(?<![\w#])#(\w+)")
+
+
+def normalize_hashtag(tag: str) -> Optional[str]:
+    """
+    Lowercase tag without the leading "#", or None if it is not a valid tag.
+    """
+    tag = tag.lstrip("#").lower()
+    if not tag or len(tag) > HASHTAG_MAX_LENGTH or not re.fullmatch(r"\w+", tag):
+        return None
+    return tag
+
+
+def extract_hashtags(content: Optional[str]) -> List[str]:
+    """
+    Distinct normalised hashtags of a text, in order of appearance.
+    """
+    tags = []
+    for match in HASHTAG_PATTERN.finditer(content or ""):
+        tag = normalize_hashtag(match.group(1))
+        if tag and tag not in tags:
+            tags.append(tag)
+            if len(tags) == MAX_HASHTAGS_PER_POST:
+                break
+    return tags
+
+
+class PostHashtag(Base):
+    __tablename__ = "post_hashtag"
+    
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), index=True)
+    tag: Mapped[str] = mapped_column(String(HASHTAG_MAX_LENGTH))
+    
+    # Relationships
+    post: Mapped["Post"] = relationship("Post", back_populates="hashtags")
+    
+    # Constraints; the unique index also serves tag lookups in post id order
+    __table_args__ = (
+        UniqueConstraint('tag', 'post_id', name='unique_post_hashtag'),
+    )
@@ -0,0 +1,54 @@
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.postgresql.base_class import Base
+
+# Mentions beyond this many in one post or comment are ignored
+MAX_MENTIONS_PER_CONTENT = 20
+
+# "@" not preceded by a word character, so e-mail addresses are not mentions
+MENTION_PATTERN = re.compile(r"(?<![\w@])@(\w+)")
+
+
+def extract_mentions(content: Optional[str]) -> List[str]:
+    """
+    Distinct usernames mentioned in a text, in order of appearance.
+    """
+    usernames = []
+    for match in MENTION_PATTERN.finditer(content or ""):
+        # Usernames are alphanumeric
+        username = match.group(1)
+        if username.isalnum() and username not in usernames:
+            usernames.append(username)
+            if len(usernames) == MAX_MENTIONS_PER_CONTENT:
+                break
+    return usernames
+
+
+class Mention(Base):
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    mentioned_user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    author_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    
+    # The post mentioning the user, or the post of the comment mentioning them
+    post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), index=True)
+    comment_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("comment.id", ondelete="CASCADE"), index=True, nullable=True
+    )
+    
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    author: Mapped["User"] = relationship("User", foreign_keys=[author_id])
+    post: Mapped["Post"] = relationship("Post")
+    comment: Mapped[Optional["Comment"]] = relationship("Comment")
+    
+    # Mention inbox of a user, newest first, with keyset pagination
+    __table_args__ = (
+        Index('ix_mention_user_created', 'mentioned_user_id', 'created_at', 'id'),
+    )
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text, Boolean
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, Text, Boolean, event, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.postgresql.base_class import Base
@@ -24,4 +25,37 @@ class Message(Base):
     
     # Relationships
     sender: Mapped["User"] = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
-    recipient: Mapped["User"] = relationship("User", foreign_keys=[recipient_id], back_populates="received_messages")
\ No newline at end of file
+    recipient: Mapped["User"] = relationship("User", foreign_keys=[recipient_id], back_populates="received_messages")
+    
+    # Indexes
+    __table_args__ = (
+        # Messages of one direction of a conversation, in id order
+        Index('ix_message_pair', 'sender_id', 'recipient_id', 'id'),
+    )
+
+
+# Full-text search of a user's messages, words are not stemmed
+MESSAGE_SEARCH_CONFIG = "simple"
+
+# PostgreSQL only, created together with the table or by
+# app/scripts/add_message_search.py. btree_gin lets one GIN index hold both
+# the user id and the words, so a search reads only the caller's entries
+# instead of every message containing the words.
+ADD_MESSAGE_SEARCH_VECTOR_SQL = f"""
+    ALTER TABLE message ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('{MESSAGE_SEARCH_CONFIG}', text)) STORED
+"""
+CREATE_MESSAGE_SEARCH_INDEXES_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    "CREATE INDEX IF NOT EXISTS ix_message_sender_search ON message USING gin (sender_id, search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_message_recipient_search ON message USING gin (recipient_id, search_vector)",
+]
+
+for statement in [ADD_MESSAGE_SEARCH_VECTOR_SQL, *CREATE_MESSAGE_SEARCH_INDEXES_SQL]:
+    event.listen(
+        Message.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+message_search_vector = literal_column("message.search_vector", TSVECTOR)
@@ -0,0 +1,63 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import List
+
+from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Index, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.postgresql.base_class import Base
+
+
+class NotificationKind(str, PyEnum):
+    POST_LIKE = "post_like"
+    COMMENT_LIKE = "comment_like"
+    POST_COMMENT = "post_comment"
+    FRIEND_REQUEST = "friend_request"
+    FRIEND_ACCEPT = "friend_accept"
+
+
+class Notification(Base):
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    recipient_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+
+    # What happened and to which object (post, comment or friendship id)
+    kind: Mapped[NotificationKind] = mapped_column(Enum(NotificationKind))
+    target_id: Mapped[int] = mapped_column(Integer)
+
+    # Events of the same kind on the same target are coalesced per window
+    window_start: Mapped[datetime] = mapped_column(DateTime)
+    # Distinct actors, one NotificationActor row each
+    actor_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Most recent actors first
+    sample_actor_ids: Mapped[List[int]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), default=list
+    )
+
+    # Timestamps of the first and the latest coalesced event
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    recipient: Mapped["User"] = relationship("User")
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint(
+            'recipient_id', 'kind', 'target_id', 'window_start',
+            name='unique_notification_window'
+        ),
+        # Keyset pagination of a user's notifications, latest activity first
+        Index('ix_notification_recipient_updated', 'recipient_id', 'updated_at', 'id'),
+    )
+
+
+class NotificationActor(Base):
+    __tablename__ = "notification_actor"
+
+    # Every distinct actor of a notification, so that repeated events of
+    # one actor (like, unlike, like) are counted once
+    notification_id: Mapped[int] = mapped_column(
+        ForeignKey("notification.id", ondelete="CASCADE"), primary_key=True
+    )
+    actor_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
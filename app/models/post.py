@@ -1,12 +1,19 @@
 from datetime import datetime
+from enum import Enum as PyEnum
 from typing import List, Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, Column, DateTime, Enum, ForeignKey, Integer, String, Text, event, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.postgresql.base_class import Base
 
 
+class PostVisibility(str, PyEnum):
+    PUBLIC = "public"
+    FRIENDS = "friends"
+
+
 class Post(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
@@ -15,6 +22,13 @@ class Post(Base):
     content: Mapped[Optional[str]] = mapped_column(Text)
     image_url: Mapped[Optional[str]] = mapped_column(String(255))
     
+    # Who can see the post besides the author
+    visibility: Mapped[PostVisibility] = mapped_column(
+        Enum(PostVisibility),
+        default=PostVisibility.PUBLIC,
+        server_default=PostVisibility.PUBLIC.name
+    )
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -27,4 +41,31 @@ class Post(Base):
         primaryjoin="and_(Post.id == Like.post_id, Like.comment_id == None)",
         back_populates="post", 
         cascade="all, delete-orphan"
-    )
\ No newline at end of file
+    )
+    hashtags: Mapped[List["PostHashtag"]] = relationship(
+        "PostHashtag", back_populates="post", cascade="all, delete-orphan"
+    )
+
+
+# Full-text search. Posts are written in several languages, so the text is
+# split into words without stemming.
+POST_SEARCH_CONFIG = "simple"
+
+# The generated column and its GIN index exist only in PostgreSQL; they are
+# created together with the table, or by app/scripts/add_post_search.py
+ADD_POST_SEARCH_VECTOR_SQL = f"""
+    ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('{POST_SEARCH_CONFIG}', coalesce(content, ''))) STORED
+"""
+CREATE_POST_SEARCH_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS ix_post_search_vector ON post USING gin (search_vector)
+"""
+
+for statement in (ADD_POST_SEARCH_VECTOR_SQL, CREATE_POST_SEARCH_INDEX_SQL):
+    event.listen(
+        Post.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+post_search_vector = literal_column("post.search_vector", TSVECTOR)
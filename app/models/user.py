@@ -31,17 +31,17 @@ class User(Base):
     comments: Mapped[List["Comment"]] = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
     likes: Mapped[List["Like"]] = relationship("Like", back_populates="user", cascade="all, delete-orphan")
     
-    # Friendship relationships
-    sent_friend_requests: Mapped[List["Friendship"]] = relationship(
+    # Friendship relationships, one row per pair of users
+    friendships_low: Mapped[List["Friendship"]] = relationship(
         "Friendship", 
-        foreign_keys="[Friendship.user_id]", 
-        back_populates="user",
+        foreign_keys="[Friendship.user_low_id]", 
+        back_populates="user_low",
         cascade="all, delete-orphan"
     )
-    received_friend_requests: Mapped[List["Friendship"]] = relationship(
+    friendships_high: Mapped[List["Friendship"]] = relationship(
         "Friendship", 
-        foreign_keys="[Friendship.friend_id]", 
-        back_populates="friend",
+        foreign_keys="[Friendship.user_high_id]", 
+        back_populates="user_high",
         cascade="all, delete-orphan"
     )
     
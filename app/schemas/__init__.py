@@ -1,7 +1,14 @@
-from app.schemas.user import User, UserCreate, UserUpdate, UserInDB, UserBasic
-from app.schemas.post import Post, PostCreate, PostUpdate, PostInDB, PostBasic
+from app.schemas.user import User, UserCreate, UserUpdate, UserInDB, UserBasic, UserSuggestion
+from app.schemas.post import Post, PostCreate, PostUpdate, PostInDB, PostBasic, PostSearchPage, PostTagPage, FeedPage, FeedSeen
 from app.schemas.comment import Comment, CommentCreate, CommentUpdate, CommentInDB
 from app.schemas.like import Like, LikeCreate, LikeInDB
-from app.schemas.friendship import Friendship, FriendshipCreate, FriendshipUpdate, FriendshipInDB, FriendRequest
-from app.schemas.message import Message, MessageCreate, MessageUpdate, MessageInDB, MessagePreview
-from app.schemas.token import Token, TokenPayload
\ No newline at end of file
+from app.schemas.friendship import Friendship, FriendshipCreate, FriendshipUpdate, FriendshipInDB, FriendRequest, FriendSuggestion, MutualFriendCount, MutualFriends
+from app.schemas.message import Message, MessageCreate, MessageUpdate, MessageInDB, MessagePreview, MessageSearchPage, MessageSearchResult
+from app.schemas.token import Token, TokenPayload
+from app.schemas.batch import BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem
+from app.schemas.badge import Badges
+from app.schemas.notification import Notification, NotificationPage
+from app.schemas.presence import Presence, UserPresence
+from app.schemas.block import Block, BlockCreate
+from app.schemas.hashtag import TrendingTag
+from app.schemas.mention import Mention, MentionPage
\ No newline at end of file
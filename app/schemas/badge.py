@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+# Counters shown as badges in the client
+class Badges(BaseModel):
+    unread_messages: int = 0
+    pending_friend_requests: int = 0
+    unread_mentions: int = 0
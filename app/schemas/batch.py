@@ -0,0 +1,28 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+# A single API call inside a batch
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    # Path relative to the API prefix, may include a query string
+    path: str = Field(..., pattern=r"^/")
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem] = Field(..., min_length=1)
+
+
+# Result of a single API call inside a batch
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
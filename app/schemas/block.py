@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.user import UserBasic
+
+
+# Properties to receive via API on creation
+class BlockCreate(BaseModel):
+    user_id: int
+
+
+# Properties to return to client
+class Block(BaseModel):
+    id: int
+    blocked_id: int
+    created_at: datetime
+    blocked: UserBasic
+    
+    class Config:
+        from_attributes = True
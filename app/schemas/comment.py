@@ -14,6 +14,8 @@ class CommentBase(BaseModel):
 # Properties to receive via API on creation
 class CommentCreate(CommentBase):
     post_id: int
+    # The comment replied to, None for a top-level comment
+    parent_id: Optional[int] = None
 
 
 # Properties to receive via API on update
@@ -26,6 +28,10 @@ class CommentInDBBase(CommentBase):
     id: int
     user_id: int
     post_id: int
+    parent_id: Optional[int] = None
+    depth: int = 0
+    # Replies at any depth, for collapsed threads
+    reply_count: int = 0
     created_at: datetime
     updated_at: datetime
     
@@ -37,6 +43,8 @@ class CommentInDBBase(CommentBase):
 class Comment(CommentInDBBase):
     user: UserBasic
     like_count: Optional[int] = 0
+    # Whether the current user liked the comment, None when not computed
+    liked_by_me: Optional[bool] = None
 
 
 # Properties stored in DB
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -52,4 +52,20 @@ class FriendRequest(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# "People you may know" entry
+class FriendSuggestion(UserBasic):
+    mutual_friends: int
+
+
+# Number of mutual friends with another user
+class MutualFriendCount(BaseModel):
+    user_id: int
+    mutual_friends: int
+
+
+# Mutual friends with another user
+class MutualFriends(MutualFriendCount):
+    friends: List[UserBasic]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+# Hashtag with its estimated number of uses in the trending window
+class TrendingTag(BaseModel):
+    tag: str
+    count: int
@@ -9,14 +9,12 @@ class LikeBase(BaseModel):
     post_id: Optional[int] = None
     comment_id: Optional[int] = None
     
-    @validator('post_id', 'comment_id')
-    def validate_target(cls, v, values, **kwargs):
-        field = kwargs['field']
-        if field.name == 'post_id' and v is not None and values.get('comment_id') is not None:
+    @validator('comment_id', always=True)
+    def validate_target(cls, v, values):
+        # post_id is validated first, so both targets are known here
+        if v is not None and values.get('post_id') is not None:
             raise ValueError('Cannot like both a post and a comment')
-        if field.name == 'comment_id' and v is not None and values.get('post_id') is not None:
-            raise ValueError('Cannot like both a post and a comment')
-        if field.name == 'comment_id' and v is None and values.get('post_id') is None:
+        if v is None and values.get('post_id') is None:
             raise ValueError('Must like either a post or a comment')
         return v
 
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.user import UserBasic
+
+
+# Mention of the current user in a post or, with comment_id, in a comment
+class Mention(BaseModel):
+    id: int
+    post_id: int
+    comment_id: Optional[int] = None
+    author: UserBasic
+    content: str
+    created_at: datetime
+
+
+# Page of mentions, pass next_cursor as cursor to get the next one
+class MentionPage(BaseModel):
+    items: List[Mention]
+    next_cursor: Optional[str] = None
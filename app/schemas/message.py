@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -40,6 +40,17 @@ class Message(MessageInDBBase):
     recipient: UserBasic
 
 
+# Search result with the matching part of the text, matches wrapped in <b>
+class MessageSearchResult(Message):
+    snippet: str
+
+
+# Page of search results, pass next_cursor as cursor to get the next one
+class MessageSearchPage(BaseModel):
+    items: List[MessageSearchResult]
+    next_cursor: Optional[str] = None
+
+
 # Properties stored in DB
 class MessageInDB(MessageInDBBase):
     pass
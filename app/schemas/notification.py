@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.models.notification import NotificationKind
+from app.schemas.user import UserBasic
+
+
+# Coalesced notification with a sample of the latest actors
+class Notification(BaseModel):
+    id: int
+    kind: NotificationKind
+    target_id: int
+    actor_count: int
+    actors: List[UserBasic] = []
+    created_at: datetime
+    updated_at: datetime
+
+
+# Page of notifications, pass next_cursor as cursor to get the next one
+class NotificationPage(BaseModel):
+    items: List[Notification]
+    next_cursor: Optional[str] = None
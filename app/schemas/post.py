@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field, validator
 
+from app.models.post import PostVisibility
 from app.schemas.user import UserBasic
 
 
@@ -10,6 +11,7 @@ from app.schemas.user import UserBasic
 class PostBase(BaseModel):
     content: Optional[str] = None
     image_url: Optional[str] = None
+    visibility: PostVisibility = PostVisibility.PUBLIC
 
 
 # Properties to receive via API on creation
@@ -48,6 +50,31 @@ class Post(PostInDBBase):
     user: UserBasic
     like_count: Optional[int] = 0
     comment_count: Optional[int] = 0
+    # Whether the current user liked the post, None when not computed
+    liked_by_me: Optional[bool] = None
+
+
+# Page of search results, pass next_cursor as cursor to get the next one
+class PostSearchPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[str] = None
+
+
+# Page of posts with a hashtag, pass next_cursor as cursor to get the next one
+class PostTagPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[str] = None
+
+
+# Page of the news feed, pass next_cursor as cursor to get the next one
+class FeedPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[str] = None
+
+
+# Posts the user has scrolled past in the feed
+class FeedSeen(BaseModel):
+    post_ids: List[int]
 
 
 # Properties stored in DB
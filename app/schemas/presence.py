@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.schemas.user import UserBasic
+
+
+# Online status of a user; last_seen is None for users never seen online
+class Presence(BaseModel):
+    user_id: int
+    online: bool = False
+    last_seen: Optional[datetime] = None
+
+
+# Friend with online status for GET /friendships/friends?with_presence=1
+class UserPresence(UserBasic):
+    online: bool = False
+    last_seen: Optional[datetime] = None
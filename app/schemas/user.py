@@ -62,4 +62,9 @@ class UserBasic(BaseModel):
     avatar_url: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# Autocomplete entry of GET /users/suggest
+class UserSuggestion(UserBasic):
+    is_friend: bool = False
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Скрипт для перевода комментариев на ветки ответов.
+
+Добавляет в таблицу comment колонки parent_id, path, depth и reply_count
+и индекс (post_id, path). Существующие комментарии становятся комментариями
+верхнего уровня: их путь - id, дополненный нулями. Затем reply_count
+пересчитывается по путям, так что повторный запуск исправляет счётчики,
+разошедшиеся с данными.
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from app.db.postgresql.session import engine
+from app.models.comment import PATH_END, PATH_SEGMENT_WIDTH
+
+MIGRATE_SQL = [
+    """
+    ALTER TABLE comment
+        ADD COLUMN IF NOT EXISTS parent_id integer REFERENCES comment (id) ON DELETE CASCADE,
+        ADD COLUMN IF NOT EXISTS path varchar COLLATE "C",
+        ADD COLUMN IF NOT EXISTS depth integer NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS reply_count integer NOT NULL DEFAULT 0
+    """,
+    f"UPDATE comment SET path = lpad(id::text, {PATH_SEGMENT_WIDTH}, '0') WHERE path IS NULL",
+    "ALTER TABLE comment ALTER COLUMN path SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_comment_parent_id ON comment (parent_id)",
+    "CREATE INDEX IF NOT EXISTS ix_comment_post_path ON comment (post_id, path)",
+]
+
+# Ответы любой глубины - диапазон путей [path, path || PATH_END) того же поста
+RECOUNT_SQL = f"""
+    UPDATE comment c SET reply_count = counted.replies
+    FROM (
+        SELECT parent.id, count(reply.id) AS replies
+        FROM comment parent
+        LEFT JOIN comment reply ON reply.post_id = parent.post_id
+            AND reply.path > parent.path AND reply.path < parent.path || '{PATH_END}'
+        GROUP BY parent.id
+    ) counted
+    WHERE c.id = counted.id AND c.reply_count <> counted.replies
+"""
+
+
+def add_comment_threads():
+    """Добавляет колонки веток и пересчитывает reply_count"""
+    try:
+        with engine.begin() as connection:
+            for statement in MIGRATE_SQL:
+                connection.execute(text(statement))
+            print("Колонки parent_id, path, depth и reply_count добавлены")
+            fixed = connection.execute(text(RECOUNT_SQL)).rowcount
+        print(f"✅ Ветки комментариев готовы, исправлено счётчиков ответов: {fixed}")
+    except Exception as e:
+        print(f"Ошибка при переводе комментариев на ветки: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    add_comment_threads()
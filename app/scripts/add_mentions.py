@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Скрипт для создания таблицы mention.
+
+Упоминания записываются только для новых постов и комментариев,
+существующие тексты не разбираются. Повторный запуск ничего не меняет.
+"""
+
+import os
+import sys
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.postgresql.base_class import Base
+from app.db.postgresql.session import engine
+from app.models.mention import Mention
+
+
+def add_mentions():
+    """Создаёт таблицу mention"""
+    try:
+        Base.metadata.create_all(bind=engine, tables=[Mention.__table__])
+        print("✅ Таблица mention создана")
+    except Exception as e:
+        print(f"Ошибка при создании таблицы mention: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    add_mentions()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Скрипт для добавления поиска по сообщениям в существующую таблицу message.
+
+Добавляет генерируемую колонку search_vector (таблица переписывается
+целиком, на это время она заблокирована), расширение btree_gin и
+GIN-индексы по (sender_id, search_vector) и (recipient_id, search_vector)
+без блокировки записи. Повторный запуск ничего не меняет.
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from app.db.postgresql.session import engine
+from app.models.message import ADD_MESSAGE_SEARCH_VECTOR_SQL, CREATE_MESSAGE_SEARCH_INDEXES_SQL
+
+
+def add_message_search():
+    """Добавляет колонку search_vector и GIN-индексы"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(ADD_MESSAGE_SEARCH_VECTOR_SQL))
+        print("Колонка search_vector добавлена")
+        
+        # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for statement in CREATE_MESSAGE_SEARCH_INDEXES_SQL:
+                connection.execute(text(statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY")))
+                print(f"Выполнено: {statement}")
+    except Exception as e:
+        print(f"Ошибка при добавлении поиска по сообщениям: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    add_message_search()
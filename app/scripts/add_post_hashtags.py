@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Скрипт для индексации хештегов существующих постов.
+
+Создаёт таблицу post_hashtag и заполняет её хештегами всех постов,
+читая посты пачками по id. Повторный запуск ничего не меняет.
+Популярные хештеги считаются только по новым постам.
+"""
+
+import argparse
+import os
+import sys
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.postgresql.base_class import Base
+from app.db.postgresql.session import SessionLocal, engine
+from app.models.hashtag import PostHashtag, extract_hashtags
+from app.models.post import Post
+
+
+def add_post_hashtags(batch_size):
+    """Создаёт таблицу post_hashtag и индексирует хештеги постов"""
+    try:
+        Base.metadata.create_all(bind=engine, tables=[PostHashtag.__table__])
+        print("Таблица post_hashtag создана")
+        
+        db = SessionLocal()
+        try:
+            last_id = 0
+            posts = tags = 0
+            while True:
+                rows = (
+                    db.query(Post.id, Post.content)
+                    .filter(Post.id > last_id)
+                    .order_by(Post.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+                values = [
+                    {"post_id": post_id, "tag": tag}
+                    for post_id, content in rows
+                    for tag in extract_hashtags(content)
+                ]
+                if values:
+                    db.execute(insert(PostHashtag).values(values).on_conflict_do_nothing())
+                db.commit()
+                last_id = rows[-1].id
+                posts += len(rows)
+                tags += len(values)
+                print(f"  обработано постов: {posts}, хештегов: {tags}")
+        finally:
+            db.close()
+        print(f"✅ Хештеги проиндексированы: {tags} в {posts} постах")
+    except Exception as e:
+        print(f"Ошибка при индексации хештегов: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Индексация хештегов существующих постов")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    add_post_hashtags(args.batch_size)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Скрипт для добавления полнотекстового поиска в существующую таблицу post.
+
+Добавляет генерируемую колонку search_vector (таблица переписывается
+целиком, на это время она заблокирована) и строит GIN-индекс без
+блокировки записи. Повторный запуск ничего не меняет.
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from app.db.postgresql.session import engine
+from app.models.post import ADD_POST_SEARCH_VECTOR_SQL, CREATE_POST_SEARCH_INDEX_SQL
+
+
+def add_post_search():
+    """Добавляет колонку search_vector и GIN-индекс"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(ADD_POST_SEARCH_VECTOR_SQL))
+        print("Колонка search_vector добавлена")
+        
+        # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(
+                CREATE_POST_SEARCH_INDEX_SQL.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY")
+            ))
+        print("Индекс ix_post_search_vector создан")
+    except Exception as e:
+        print(f"Ошибка при добавлении поиска: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    add_post_search()
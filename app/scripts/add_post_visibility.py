@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Скрипт для добавления видимости постов и блокировок в существующую базу.
+
+Добавляет в таблицу post колонку visibility (все существующие посты
+остаются публичными; колонка с постоянным значением по умолчанию
+добавляется без перезаписи таблицы) и создаёт таблицу block.
+Повторный запуск ничего не меняет.
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from app.db.postgresql.base_class import Base
+from app.db.postgresql.session import engine
+from app.models.block import Block
+
+CREATE_VISIBILITY_TYPE_SQL = """
+    DO $$ BEGIN
+        CREATE TYPE postvisibility AS ENUM ('PUBLIC', 'FRIENDS');
+    EXCEPTION
+        WHEN duplicate_object THEN NULL;
+    END $$
+"""
+
+ADD_VISIBILITY_SQL = """
+    ALTER TABLE post ADD COLUMN IF NOT EXISTS visibility postvisibility NOT NULL DEFAULT 'PUBLIC'
+"""
+
+
+def add_post_visibility():
+    """Добавляет колонку visibility и таблицу block"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(CREATE_VISIBILITY_TYPE_SQL))
+            connection.execute(text(ADD_VISIBILITY_SQL))
+            Base.metadata.create_all(bind=connection, tables=[Block.__table__])
+        print("✅ Колонка post.visibility и таблица block добавлены")
+    except Exception as e:
+        print(f"Ошибка при добавлении видимости постов: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    add_post_visibility()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Скрипт для заполнения таблицы conversation по существующим сообщениям.
+
+Запускается один раз после появления таблицы; повторный запуск
+пересчитывает все диалоги заново.
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from app.db.postgresql.base_class import Base
+from app.db.postgresql.session import SessionLocal, engine
+from app.models import Conversation
+
+# Колонки, добавленные после появления таблицы
+MIGRATE_SQL = """
+    ALTER TABLE conversation ADD COLUMN IF NOT EXISTS last_read_low integer NOT NULL DEFAULT 0;
+    ALTER TABLE conversation ADD COLUMN IF NOT EXISTS last_read_high integer NOT NULL DEFAULT 0;
+    ALTER TABLE conversation ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 0;
+"""
+
+BACKFILL_SQL = """
+    INSERT INTO conversation (
+        user_low_id, user_high_id, last_message_id, last_activity, unread_low, unread_high,
+        last_read_low, last_read_high
+    )
+    SELECT
+        least(sender_id, recipient_id) AS user_low_id,
+        greatest(sender_id, recipient_id) AS user_high_id,
+        max(id),
+        max(created_at),
+        count(*) FILTER (WHERE NOT is_read AND recipient_id < sender_id),
+        count(*) FILTER (WHERE NOT is_read AND recipient_id > sender_id),
+        coalesce(max(id) FILTER (WHERE is_read AND recipient_id < sender_id), 0),
+        coalesce(max(id) FILTER (WHERE is_read AND recipient_id > sender_id), 0)
+    FROM message
+    GROUP BY 1, 2
+    ON CONFLICT (user_low_id, user_high_id) DO UPDATE SET
+        last_message_id = excluded.last_message_id,
+        last_activity = excluded.last_activity,
+        unread_low = excluded.unread_low,
+        unread_high = excluded.unread_high,
+        last_read_low = excluded.last_read_low,
+        last_read_high = excluded.last_read_high,
+        version = conversation.version + 1
+"""
+
+
+def backfill_conversations():
+    """Заполняет таблицу conversation"""
+    Base.metadata.create_all(bind=engine, tables=[Conversation.__table__])
+    db = SessionLocal()
+    
+    try:
+        db.execute(text(MIGRATE_SQL))
+        result = db.execute(text(BACKFILL_SQL))
+        db.commit()
+        print(f"Обновлено диалогов: {result.rowcount}")
+    except Exception as e:
+        print(f"Ошибка при заполнении диалогов: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_conversations()
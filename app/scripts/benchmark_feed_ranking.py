@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк ранжирования ленты.
+
+Замеряет score_candidates и сортировку для --candidates синтетических
+записей ленты от --authors авторов при --affinity авторах с известной
+близостью, как в GET /feed/?ranked=true (без чтения из Tarantool и
+PostgreSQL).
+
+Пример:
+    python app/scripts/benchmark_feed_ranking.py --candidates 1000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from app.core.ranking import rank, score_candidates
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк ранжирования ленты")
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--authors", type=int, default=300)
+    parser.add_argument("--affinity", type=int, default=200, help="авторов с известной близостью")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    authors = rng.choice(10**6, args.authors, replace=False)
+    candidates = {
+        "author_ids": rng.choice(authors, args.candidates),
+        "ages": rng.uniform(0, 3 * 86400, args.candidates),
+        "likes": rng.poisson(5, args.candidates).astype(np.float64),
+        "comments": rng.poisson(1, args.candidates).astype(np.float64),
+        "seen": rng.random(args.candidates) < 0.1,
+        "affinity_author_ids": np.sort(rng.choice(authors, min(args.affinity, args.authors), replace=False)),
+    }
+    candidates["affinity"] = rng.exponential(1, len(candidates["affinity_author_ids"]))
+
+    print("🚀 Бенчмарк ранжирования ленты")
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        rank(score_candidates(**candidates))
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f"{args.candidates} кандидатов: p50={statistics.median(timings):.3f} мс "
+        f"p99={percentile(timings, 99):.3f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
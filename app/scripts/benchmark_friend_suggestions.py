@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк расчёта рекомендаций друзей на синтетическом графе.
+
+Строит случайный граф (по умолчанию 1 млн пользователей и 50 млн дружб,
+нужно ~2 ГБ памяти), затем считает рекомендации для --sample-batches
+пачек пользователей и оценивает время полного расчёта. С --skew часть
+пользователей получает намного больше друзей, как в реальных сетях.
+
+Пример:
+    python app/scripts/benchmark_friend_suggestions.py --users 1000000 --edges 50000000 --sample-batches 20
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.suggestions import build_adjacency, top_suggestions
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_graph(users, edges, skew, seed):
+    """Случайные дружбы; при skew > 1 пользователи с малыми id популярнее"""
+    rng = np.random.default_rng(seed)
+    sources = (rng.random(edges, dtype=np.float32) ** skew * users).astype(np.int32)
+    targets = rng.integers(0, users, edges, dtype=np.int32)
+    keep = sources != targets
+    return build_adjacency(sources[keep], targets[keep], users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк рекомендаций друзей")
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--edges", type=int, default=50000000, help="число дружб (пар)")
+    parser.add_argument("--skew", type=float, default=1.0, help="неравномерность степеней, 1 - равномерно")
+    parser.add_argument("--size", type=int, default=settings.FRIEND_SUGGESTIONS_SIZE)
+    parser.add_argument("--batch-size", type=int, default=settings.FRIEND_SUGGESTIONS_BATCH_SIZE)
+    parser.add_argument("--sample-batches", type=int, default=20, help="0 - посчитать всех")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("🚀 Бенчмарк рекомендаций друзей")
+    started = time.perf_counter()
+    adjacency = synthetic_graph(args.users, args.edges, args.skew, args.seed)
+    degrees = np.diff(adjacency.indptr)
+    print(
+        f"Граф: {args.users} пользователей, {adjacency.nnz // 2} дружб, "
+        f"степень: средняя {degrees.mean():.1f}, p99 {np.percentile(degrees, 99):.0f}, "
+        f"макс {degrees.max()}; построен за {time.perf_counter() - started:.1f} с"
+    )
+    print(f"Матрица: {(adjacency.data.nbytes + adjacency.indices.nbytes + adjacency.indptr.nbytes) / 2**20:.0f} МБ")
+
+    user_ids = np.flatnonzero(degrees).astype(np.int32)
+    batches = range(0, len(user_ids), args.batch_size)
+    if args.sample_batches:
+        rng = np.random.default_rng(args.seed)
+        batches = sorted(rng.choice(list(batches), min(args.sample_batches, len(batches)), replace=False))
+
+    timings = []
+    computed = 0
+    for start in batches:
+        batch_started = time.perf_counter()
+        rows = list(top_suggestions(adjacency, user_ids[start:start + args.batch_size], args.size))
+        timings.append(time.perf_counter() - batch_started)
+        computed += len(rows)
+
+    per_user_ms = sum(timings) / computed * 1000
+    print(
+        f"Пачка из {args.batch_size}: среднее {np.mean(timings):.2f} с, макс {max(timings):.2f} с; "
+        f"{per_user_ms:.2f} мс на пользователя"
+    )
+    print(f"Оценка полного расчёта в один поток: {per_user_ms * len(user_ids) / 1000 / 60:.1f} мин")
+    print(f"Пиковый RSS: {peak_rss_mb():.0f} МБ")
+
+
+if __name__ == "__main__":
+    main()
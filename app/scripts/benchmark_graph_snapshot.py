@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк снимка графа дружб, общего для всех воркеров.
+
+Записывает снимок синтетического графа (или берёт готовый с --existing)
+и запускает --workers процессов, которые открывают его и читают списки
+друзей случайных пользователей, а затем весь граф целиком. Для каждого
+процесса выводятся время открытия, задержка чтения, RSS и PSS (RSS,
+поделённый между процессами, которые используют те же страницы).
+С --copy каждый процесс загружает массивы в свою память, как без mmap.
+
+Пример:
+    python app/scripts/benchmark_graph_snapshot.py --users 1000000 --edges 50000000 --workers 4
+    python app/scripts/benchmark_graph_snapshot.py --users 1000000 --edges 50000000 --workers 4 --copy
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+
+def memory_mb():
+    """RSS и PSS текущего процесса в МБ (Linux)"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return values.get("Rss", 0), values.get("Pss", 0)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def worker(directory, copy, lookups, seed, barrier, results):
+    from app.core.graph import CURRENT_LINK, GraphSnapshot, SocialGraph, open_snapshot
+
+    started = time.perf_counter()
+    graph = SocialGraph(directory)
+    if copy:
+        snapshot = open_snapshot(os.path.realpath(os.path.join(directory, CURRENT_LINK)))
+        graph._snapshot = GraphSnapshot(
+            snapshot.path, snapshot.created_at, np.array(snapshot.offsets), np.array(snapshot.neighbors)
+        )
+    else:
+        graph.reload()
+    opened_ms = (time.perf_counter() - started) * 1000
+    users = len(graph._snapshot.offsets) - 1
+
+    rng = np.random.default_rng(seed)
+    timings = []
+    for user_id in rng.integers(0, users, lookups).tolist():
+        started = time.perf_counter()
+        graph.friend_ids(user_id)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Весь граф в памяти, как после долгой работы воркера
+    int(graph._snapshot.offsets.sum()) + int(graph._snapshot.neighbors.sum())
+    # Замер, пока все процессы держат снимок открытым
+    barrier.wait()
+    rss, pss = memory_mb()
+    barrier.wait()
+    results.put((os.getpid(), opened_ms, percentile(timings, 50), percentile(timings, 99), rss, pss))
+
+
+def write_synthetic(directory, users, edges, seed):
+    from app.core.graph import write_snapshot
+    from app.core.suggestions import build_adjacency
+
+    rng = np.random.default_rng(seed)
+    sources = rng.integers(0, users, edges, dtype=np.int32)
+    targets = rng.integers(0, users, edges, dtype=np.int32)
+    keep = sources != targets
+    adjacency = build_adjacency(sources[keep], targets[keep], users)
+    return write_snapshot(directory, adjacency, time.time())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк снимка графа дружб")
+    parser.add_argument("--dir", help="каталог снимков (по умолчанию временный)")
+    parser.add_argument("--existing", action="store_true", help="использовать готовый снимок из --dir")
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--edges", type=int, default=50000000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=100000, help="чтений на процесс")
+    parser.add_argument("--copy", action="store_true", help="загружать массивы в память каждого процесса")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("🚀 Бенчмарк снимка графа дружб")
+    directory = args.dir or tempfile.mkdtemp(prefix="graph-")
+    if not args.existing:
+        started = time.perf_counter()
+        path = write_synthetic(directory, args.users, args.edges, args.seed)
+        size_mb = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2**20
+        print(f"Снимок {path}: {size_mb:.0f} МБ, записан за {time.perf_counter() - started:.1f} с")
+
+    # Новые процессы, а не fork, чтобы не делить память родителя
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(directory, args.copy, args.lookups, args.seed + i, barrier, results))
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(f"Режим: {'копия в каждом процессе' if args.copy else 'mmap'}")
+    for pid, opened_ms, p50, p99, rss, pss in sorted(rows):
+        print(
+            f"  pid {pid}: открытие {opened_ms:.1f} мс, чтение p50={p50:.3f} мс p99={p99:.3f} мс, "
+            f"RSS {rss:.0f} МБ, PSS {pss:.0f} МБ"
+        )
+    print(f"Сумма PSS всех процессов: {sum(row[5] for row in rows):.0f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк полнотекстового поиска постов.
+
+Наполняет таблицу post синтетическими постами (слова из словаря с
+неравномерным распределением частот) ступенями до заданного размера и
+на каждой ступени замеряет задержку первой и следующей страницы
+поиска тем же запросом, что и GET /posts/search. Для сравнения можно
+замерить ILIKE по Post.content (--ilike).
+
+Пример:
+    python app/scripts/benchmark_post_search.py --steps 10000,100000,1000000 --cleanup
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import REAL, cast, text, tuple_
+
+from app.api.endpoints.posts import search_criteria
+from app.core.security import get_password_hash
+from app.db.postgresql.session import SessionLocal
+from app.models.post import Post
+from app.models.user import User
+
+USERNAME = "searchbench"
+VOCABULARY_SIZE = 20000
+WORDS_PER_POST = 25
+PAGE_SIZE = 20
+
+# Слово с номером n встречается тем чаще, чем меньше n
+INSERT_SQL = text(f"""
+    INSERT INTO post (user_id, content, created_at, updated_at)
+    SELECT :user_id, words.content, now(), now()
+    FROM generate_series(1, :count) AS g
+    CROSS JOIN LATERAL (
+        SELECT string_agg('w' || floor(power(random(), 3) * {VOCABULARY_SIZE})::int, ' ') AS content
+        FROM generate_series(1, {WORDS_PER_POST})
+        WHERE g > 0
+    ) AS words
+""")
+
+# Редкие, средние и частые слова, фраза и запрос из двух слов
+QUERIES = ["w19000", "w15000", "w5000", "w800", "w10", "\"w3 w4\"", "w100 w200"]
+
+
+def get_or_create_user(db):
+    """Возвращает автора синтетических постов"""
+    user = db.query(User).filter(User.username == USERNAME).first()
+    if not user:
+        user = User(
+            username=USERNAME,
+            email=f"{USERNAME}@example.com",
+            password_hash=get_password_hash("password"),
+            full_name=USERNAME,
+            is_active=True
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def search_page(db, q, cursor=None):
+    """Одна страница поиска, как в GET /posts/search"""
+    match, rank = search_criteria(db, q)
+    query = db.query(Post.id, rank.label("rank")).filter(match)
+    if cursor:
+        query = query.filter(tuple_(rank, Post.id) < tuple_(cast(cursor[0], REAL), cursor[1]))
+    return query.order_by(rank.desc(), Post.id.desc()).limit(PAGE_SIZE + 1).all()
+
+
+def ilike_page(db, q):
+    """Одна страница наивного поиска по подстроке"""
+    return (
+        db.query(Post.id)
+        .filter(Post.content.ilike(f"%{q.strip(chr(34))}%"))
+        .order_by(Post.id.desc())
+        .limit(PAGE_SIZE + 1)
+        .all()
+    )
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run(args):
+    db = SessionLocal()
+    try:
+        user = get_or_create_user(db)
+        total = db.query(Post).filter(Post.user_id == user.id).count()
+        for step in sorted(int(size) for size in args.steps.split(",")):
+            while total < step:
+                count = min(args.batch_size, step - total)
+                db.execute(INSERT_SQL, {"user_id": user.id, "count": count})
+                db.commit()
+                total += count
+                print(f"  вставлено {total}/{step}")
+            db.execute(text("ANALYZE post"))
+            db.commit()
+
+            print(f"\n📊 Постов: {total}")
+            for q in QUERIES:
+                first = search_page(db, q)
+                timings = measure(lambda: search_page(db, q), args.repeat)
+                line = (
+                    f"  {q:<12} найдено на странице: {len(first):>2}  "
+                    f"первая: p50={statistics.median(timings):.1f} p95={percentile(timings, 95):.1f} мс"
+                )
+                if len(first) > PAGE_SIZE:
+                    last = first[PAGE_SIZE - 1]
+                    timings = measure(lambda: search_page(db, q, (last.rank, last.id)), args.repeat)
+                    line += f"  следующая: p50={statistics.median(timings):.1f} мс"
+                if args.ilike:
+                    timings = measure(lambda: ilike_page(db, q), max(1, args.repeat // 5))
+                    line += f"  ILIKE: p50={statistics.median(timings):.1f} мс"
+                print(line)
+
+        if args.cleanup:
+            deleted = db.query(Post).filter(Post.user_id == user.id).delete(synchronize_session=False)
+            db.commit()
+            print(f"\n🧹 Удалено синтетических постов: {deleted}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк полнотекстового поиска постов")
+    parser.add_argument("--steps", default="10000,100000,1000000", help="размеры корпуса через запятую")
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50, help="повторов каждого запроса")
+    parser.add_argument("--ilike", action="store_true", help="замерить также ILIKE")
+    parser.add_argument("--cleanup", action="store_true", help="удалить синтетические посты в конце")
+    args = parser.parse_args()
+
+    print("🚀 Бенчмарк поиска постов")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк автодополнения пользователей (GET /users/suggest).
+
+Режим --synthetic N строит префиксный индекс из N синтетических
+пользователей прямо в процессе и замеряет время поиска, объём индекса
+и время построения. Без него скрипт нагружает работающий сервер
+параллельными запросами с префиксами из 1-3 букв и показывает
+p50/p95/p99 задержки и пропускную способность.
+
+Примеры:
+    python app/scripts/benchmark_user_suggest.py --synthetic 1000000
+    python app/scripts/benchmark_user_suggest.py --concurrency 50 --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.core.user_index import UserPrefixIndex, indexed_user
+from app.db.postgresql.session import SessionLocal
+from app.models.user import User
+
+FIRST_NAMES = ["Иван", "Мария", "Алексей", "Анна", "Дмитрий", "Елена", "John", "Emma", "Liam", "Olivia"]
+LAST_NAMES = ["Петров", "Иванова", "Смирнов", "Кузнецова", "Smith", "Johnson", "Brown", "Garcia"]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def random_prefix():
+    return "".join(random.choice(string.ascii_lowercase) for _ in range(random.randint(1, 3)))
+
+
+def synthetic_users(count):
+    for user_id in range(1, count + 1):
+        username = "".join(random.choice(string.ascii_lowercase) for _ in range(random.randint(5, 12)))
+        full_name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}{user_id % 997}"
+        yield user_id, indexed_user(username, full_name, None)
+
+
+def run_synthetic(args):
+    print(f"Строим индекс из {args.synthetic} пользователей...")
+    tracemalloc.start()
+    users = dict(synthetic_users(args.synthetic))
+    before = tracemalloc.get_traced_memory()[0]
+    index = UserPrefixIndex()
+    started = time.perf_counter()
+    index.replace(users)
+    built = time.perf_counter() - started
+    size_mb = (tracemalloc.get_traced_memory()[0] - before) / 1024 / 1024
+    tracemalloc.stop()
+    print(f"✅ Построен за {built:.1f} с, ключей: {len(index._entries)}, ~{size_mb:.0f} МБ без учёта профилей")
+
+    friend_ids = random.sample(range(1, args.synthetic + 1), min(args.friends, args.synthetic))
+    timings = []
+    for _ in range(args.requests):
+        prefix = random_prefix()
+        started = time.perf_counter()
+        index.search(prefix, args.limit, friend_ids)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f"Поиск ({args.friends} друзей), мс: p50={percentile(timings, 50):.3f} "
+        f"p95={percentile(timings, 95):.3f} p99={percentile(timings, 99):.3f} max={max(timings):.3f}"
+    )
+
+    timings = []
+    for user_id in random.sample(range(1, args.synthetic + 1), min(1000, args.synthetic)):
+        event = {"data": {"id": user_id, "username": f"renamed{user_id}", "full_name": "New Name"}}
+        started = time.perf_counter()
+        index.apply_event(event)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"Обновление пользователя, мс: p50={percentile(timings, 50):.3f} p99={percentile(timings, 99):.3f}")
+
+
+async def run_http(args):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == "suggestbench").first()
+        if not user:
+            user = User(
+                username="suggestbench",
+                email="suggestbench@example.com",
+                password_hash=get_password_hash("password"),
+                full_name="suggestbench",
+                is_active=True
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+    finally:
+        db.close()
+    headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+    timings = []
+    errors = 0
+    remaining = args.requests
+
+    async def worker(client):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(
+                f"{settings.API_V1_STR}/users/suggest",
+                params={"q": random_prefix(), "limit": args.limit},
+                headers=headers
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+
+    print(f"Запросов: {len(timings)}, ошибок: {errors}, {len(timings) / elapsed:.0f} запросов/с")
+    print(
+        f"Задержка, мс: p50={percentile(timings, 50):.1f} p95={percentile(timings, 95):.1f} "
+        f"p99={percentile(timings, 99):.1f} max={max(timings):.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк автодополнения пользователей")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--synthetic", type=int, help="замерить индекс в процессе на N пользователях")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--friends", type=int, default=200, help="число друзей (--synthetic)")
+    args = parser.parse_args()
+
+    print("🚀 Бенчмарк автодополнения пользователей")
+    if args.synthetic:
+        run_synthetic(args)
+    else:
+        asyncio.run(run_http(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк фильтрации по видимости постов и блокировкам.
+
+Замеряет фильтрацию страницы ленты (--page записей) в процессе, как в
+GET /feed/, при --friends друзьях и --hidden скрытых пользователях.
+С --user-id дополнительно сравнивает задержку страницы GET /posts/ в
+PostgreSQL с фильтром visible_posts и без него для этого пользователя.
+
+Пример:
+    python app/scripts/benchmark_visibility.py --friends 5000 --hidden 1000
+    python app/scripts/benchmark_visibility.py --user-id 1
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.visibility import visible_feed_entries, visible_posts
+from app.db.tarantool.news_feed import FeedEntry
+from app.models.post import Post, PostVisibility
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def benchmark_feed_filter(args):
+    """Фильтрация синтетической страницы ленты"""
+    rng = random.Random(args.seed)
+    users = range(2, args.users)
+    friend_ids = sorted(rng.sample(users, args.friends))
+    hidden = frozenset(rng.sample(users, args.hidden))
+    authors = friend_ids + rng.sample(users, args.friends)
+    entries = [
+        FeedEntry(
+            post_id=i,
+            created_at=10**9 - i,
+            author_id=rng.choice(authors),
+            visibility=rng.choice(list(PostVisibility)).value,
+        )
+        for i in range(args.page)
+    ]
+    visible = visible_feed_entries(entries, 1, hidden, friend_ids)
+    timings = measure(lambda: visible_feed_entries(entries, 1, hidden, friend_ids), args.repeat)
+    print(
+        f"Страница ленты из {args.page} записей, видно {len(visible)}: "
+        f"p50={statistics.median(timings) * 1000:.1f} мкс p99={percentile(timings, 99) * 1000:.1f} мкс"
+    )
+
+
+def benchmark_sql(args):
+    """Страница GET /posts/ с фильтром видимости и без него"""
+    from app.db.postgresql.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        def page(filtered):
+            query = db.query(Post.id)
+            if filtered:
+                query = query.filter(visible_posts(db, args.user_id))
+            return query.order_by(Post.created_at.desc()).limit(args.page).all()
+
+        for filtered in (False, True):
+            page(filtered)
+            timings = measure(lambda: page(filtered), args.repeat // 100 or 1)
+            print(
+                f"GET /posts/ {'с фильтром' if filtered else 'без фильтра'}: "
+                f"p50={statistics.median(timings):.2f} мс p95={percentile(timings, 95):.2f} мс"
+            )
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк фильтрации по видимости")
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--friends", type=int, default=500)
+    parser.add_argument("--hidden", type=int, default=50)
+    parser.add_argument("--page", type=int, default=100, help="записей на странице")
+    parser.add_argument("--repeat", type=int, default=10000)
+    parser.add_argument("--user-id", type=int, help="замерить также запрос к PostgreSQL от имени пользователя")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("🚀 Бенчмарк фильтрации по видимости")
+    benchmark_feed_filter(args)
+    if args.user_id:
+        benchmark_sql(args)
+
+
+if __name__ == "__main__":
+    main()
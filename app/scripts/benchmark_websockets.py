@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест WebSocket-доставки сообщений.
+
+Открывает заданное число соединений /api/v1/ws от имени одного получателя,
+держит их открытыми и отправляет сообщения через REST API. Показывает,
+сколько простаивающих соединений удержал воркер, его потребление памяти
+(если передан --pid) и задержку доставки от POST до получения кадра.
+
+Пример (один воркер):
+    uvicorn app.main:app --workers 1 &
+    python app/scripts/benchmark_websockets.py --connections 5000 --messages 50 --pid <PID воркера>
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+import websockets
+
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.db.postgresql.session import SessionLocal
+from app.models.user import User
+
+TEXT_PREFIX = "loadtest:"
+
+
+def get_or_create_user(db, username):
+    """Возвращает пользователя для теста, создавая его при необходимости"""
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            password_hash=get_password_hash("password"),
+            full_name=username,
+            is_active=True
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+
+def read_rss_mb(pid):
+    """Резидентная память процесса в мегабайтах (Linux)"""
+    if not pid:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def reader(ws, latencies, closed):
+    """Читает кадры соединения и записывает задержку доставки"""
+    try:
+        async for frame in ws:
+            received_at = time.time()
+            event = json.loads(frame)
+            text = (event.get("data") or {}).get("text", "")
+            if event.get("type") == "message.created" and text.startswith(TEXT_PREFIX):
+                latencies.append(received_at - float(text[len(TEXT_PREFIX):]))
+    except websockets.ConnectionClosed:
+        pass
+    closed.append(ws)
+
+
+async def open_connections(url, count, batch_size, latencies, closed):
+    """Открывает соединения пачками, возвращает открытые и число ошибок"""
+    connections = []
+    readers = []
+    failures = 0
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        results = await asyncio.gather(
+            *[websockets.connect(url, ping_interval=None, open_timeout=30) for _ in range(size)],
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                failures += 1
+            else:
+                connections.append(result)
+                readers.append(asyncio.create_task(reader(result, latencies, closed)))
+        print(f"  открыто {len(connections)}/{count}, ошибок: {failures}")
+    return connections, readers, failures
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run(args):
+    db = SessionLocal()
+    try:
+        sender = get_or_create_user(db, "loadtest_sender")
+        recipient = get_or_create_user(db, "loadtest_recipient")
+    finally:
+        db.close()
+    sender_token = create_access_token(sender.id)
+    recipient_token = create_access_token(recipient.id)
+
+    ws_url = args.base_url.replace("http", "ws", 1) + f"{settings.API_V1_STR}/ws?token={recipient_token}"
+    latencies = []
+    closed = []
+
+    rss_before = read_rss_mb(args.pid)
+    print(f"Открываем {args.connections} соединений...")
+    started = time.time()
+    connections, readers, failures = await open_connections(
+        ws_url, args.connections, args.batch_size, latencies, closed
+    )
+    print(f"✅ Открыто {len(connections)} соединений за {time.time() - started:.1f} с, ошибок: {failures}")
+
+    print(f"Простой {args.idle} с...")
+    await asyncio.sleep(args.idle)
+    rss_idle = read_rss_mb(args.pid)
+    print(f"Живых соединений после простоя: {len(connections) - len(closed)}")
+    if rss_before is not None and rss_idle is not None:
+        per_connection = (rss_idle - rss_before) * 1024 / max(len(connections), 1)
+        print(f"RSS воркера: {rss_before:.1f} МБ -> {rss_idle:.1f} МБ (~{per_connection:.1f} КБ на соединение)")
+
+    print(f"Отправляем {args.messages} сообщений...")
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        for _ in range(args.messages):
+            response = await client.post(
+                f"{settings.API_V1_STR}/messages/",
+                json={"recipient_id": recipient.id, "text": f"{TEXT_PREFIX}{time.time()}"},
+                headers={"Authorization": f"Bearer {sender_token}"}
+            )
+            response.raise_for_status()
+            await asyncio.sleep(args.interval)
+    await asyncio.sleep(2)
+
+    expected = args.messages * (len(connections) - len(closed))
+    print(f"Доставлено кадров: {len(latencies)} из {expected}")
+    if latencies:
+        print(
+            "Задержка доставки, мс: "
+            f"p50={percentile(latencies, 50) * 1000:.1f} "
+            f"p95={percentile(latencies, 95) * 1000:.1f} "
+            f"p99={percentile(latencies, 99) * 1000:.1f} "
+            f"max={max(latencies) * 1000:.1f} "
+            f"mean={statistics.mean(latencies) * 1000:.1f}"
+        )
+
+    for task in readers:
+        task.cancel()
+    await asyncio.gather(*[ws.close() for ws in connections], return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест WebSocket-доставки")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2, help="пауза между сообщениями, с")
+    parser.add_argument("--idle", type=float, default=10, help="время простоя соединений, с")
+    parser.add_argument("--pid", type=int, help="PID воркера uvicorn для замера памяти")
+    args = parser.parse_args()
+
+    print("🚀 Нагрузочный тест WebSocket")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
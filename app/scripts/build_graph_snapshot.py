@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Скрипт для построения снимка графа дружб.
+
+Загружает принятые дружбы из PostgreSQL и записывает их в виде массивов
+CSR (offsets.npy и neighbors.npy) в GRAPH_SNAPSHOT_DIR. Воркеры
+приложения отображают снимок в память через mmap и подхватывают новый
+в течение GRAPH_RELOAD_INTERVAL_SECONDS. Запускается по расписанию
+(например, раз в час); изменения между запусками воркеры получают
+через шину событий.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.config import settings
+from app.core.graph import write_snapshot
+from app.core.suggestions import load_adjacency
+from app.db.postgresql.session import SessionLocal
+
+
+def build_graph_snapshot(directory, keep):
+    """Строит и публикует новый снимок графа"""
+    # Изменения после этого момента воркеры держат в журнале поверх снимка
+    created_at = time.time()
+    db = SessionLocal()
+    try:
+        adjacency = load_adjacency(db)
+    finally:
+        db.close()
+    print(f"Загружен граф: {adjacency.shape[0]} пользователей, {adjacency.nnz // 2} дружб "
+          f"за {time.time() - created_at:.1f} с")
+    
+    path = write_snapshot(directory, adjacency, created_at, keep=keep)
+    size_mb = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2**20
+    print(f"✅ Снимок {path} ({size_mb:.0f} МБ) опубликован за {time.time() - created_at:.1f} с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Построение снимка графа дружб")
+    parser.add_argument("--dir", default=settings.GRAPH_SNAPSHOT_DIR)
+    parser.add_argument("--keep", type=int, default=2, help="сколько последних снимков хранить")
+    args = parser.parse_args()
+    
+    try:
+        build_graph_snapshot(args.dir, args.keep)
+    except Exception as e:
+        print(f"Ошибка при построении снимка: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Скрипт для пересчёта близости пользователей к авторам для ранжирования
+ленты.
+
+Считает сообщения между каждой парой пользователей и лайки каждого
+пользователя на постах и комментариях каждого автора за последние
+--days дней, складывает их в разреженную матрицу и записывает в
+Tarantool до --size авторов с наибольшим числом взаимодействий для
+каждого пользователя. Запускается по расписанию (например, раз в сутки);
+записи устаревают через FEED_AFFINITY_TTL_SECONDS.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.config import settings
+from app.core.ranking import affinity_rows, load_interactions
+from app.db.postgresql.session import SessionLocal
+from app.db.tarantool import feed_affinity
+
+STORE_BATCH_SIZE = 1000
+
+
+def compute_feed_affinity(days, size):
+    """Пересчитывает близость всех пользователей к авторам"""
+    started = time.time()
+    db = SessionLocal()
+    try:
+        interactions = load_interactions(db, datetime.utcnow() - timedelta(days=days))
+    finally:
+        db.close()
+    print(f"Загружено {interactions.nnz} пар пользователь-автор за {time.time() - started:.1f} с")
+    
+    batch = []
+    done = 0
+    for row in affinity_rows(interactions, size):
+        batch.append(row)
+        if len(batch) >= STORE_BATCH_SIZE:
+            feed_affinity.store(batch)
+            done += len(batch)
+            batch = []
+            print(f"  записано {done}")
+    feed_affinity.store(batch)
+    done += len(batch)
+    print(f"✅ Близость рассчитана для {done} пользователей за {time.time() - started:.1f} с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересчёт близости пользователей к авторам")
+    parser.add_argument("--days", type=int, default=settings.FEED_AFFINITY_DAYS)
+    parser.add_argument("--size", type=int, default=settings.FEED_AFFINITY_SIZE)
+    args = parser.parse_args()
+    
+    try:
+        compute_feed_affinity(args.days, args.size)
+    except Exception as e:
+        print(f"Ошибка при расчёте близости: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
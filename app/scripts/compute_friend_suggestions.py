@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Скрипт для полного пересчёта рекомендаций друзей ("люди, которых вы
+можете знать").
+
+Загружает принятые дружбы в разреженную матрицу смежности, считает число
+общих друзей произведением матриц пачками пользователей и записывает
+лучших кандидатов каждого пользователя в Tarantool. Запускается по
+расписанию (например, раз в сутки); между запусками рекомендации
+обновляются приложением при принятии и удалении дружбы. С --from-snapshot
+граф читается из снимка (app/scripts/build_graph_snapshot.py), а не из
+PostgreSQL.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.config import settings
+from app.core.graph import SocialGraph
+from app.core.suggestions import compute_all, load_adjacency
+from app.db.postgresql.session import SessionLocal
+from app.db.tarantool import friend_suggestions
+
+
+def compute_friend_suggestions(size, batch_size, from_snapshot):
+    """Пересчитывает рекомендации всех пользователей"""
+    started = time.time()
+    if from_snapshot:
+        graph = SocialGraph(settings.GRAPH_SNAPSHOT_DIR)
+        if not graph.reload():
+            raise RuntimeError(f"Снимок графа не найден в {settings.GRAPH_SNAPSHOT_DIR}")
+        adjacency = graph.adjacency()
+    else:
+        db = SessionLocal()
+        try:
+            adjacency = load_adjacency(db)
+        finally:
+            db.close()
+    print(f"Загружен граф: {adjacency.shape[0]} пользователей, {adjacency.nnz // 2} дружб "
+          f"за {time.time() - started:.1f} с")
+    
+    done = 0
+    
+    def store(rows):
+        nonlocal done
+        friend_suggestions.store(rows)
+        done += len(rows)
+        print(f"  рассчитано {done}")
+    
+    computed = compute_all(adjacency, size, batch_size, store)
+    print(f"✅ Рекомендации рассчитаны для {computed} пользователей за {time.time() - started:.1f} с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересчёт рекомендаций друзей")
+    parser.add_argument("--size", type=int, default=settings.FRIEND_SUGGESTIONS_SIZE)
+    parser.add_argument("--batch-size", type=int, default=settings.FRIEND_SUGGESTIONS_BATCH_SIZE)
+    parser.add_argument("--from-snapshot", action="store_true", help="читать граф из снимка")
+    args = parser.parse_args()
+    
+    try:
+        compute_friend_suggestions(args.size, args.batch_size, args.from_snapshot)
+    except Exception as e:
+        print(f"Ошибка при расчёте рекомендаций: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
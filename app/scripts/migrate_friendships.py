@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Скрипт для перевода таблицы friendship на одну строку на пару пользователей.
+
+Раньше принятая дружба хранилась двумя зеркальными строками
+(user_id, friend_id) и (friend_id, user_id). Скрипт оставляет для каждой
+пары одну строку (принятую, если есть, иначе самую раннюю), заполняет
+user_low_id, user_high_id и requester_id и удаляет старые колонки.
+Всё выполняется в одной транзакции, таблица на это время заблокирована.
+Повторный запуск ничего не меняет.
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from app.db.postgresql.session import engine
+
+HAS_OLD_COLUMNS_SQL = """
+    SELECT count(*) FROM information_schema.columns
+    WHERE table_name = 'friendship' AND column_name = 'friend_id'
+"""
+
+MIGRATE_SQL = [
+    """
+    ALTER TABLE friendship
+        ADD COLUMN IF NOT EXISTS user_low_id integer REFERENCES "user" (id) ON DELETE CASCADE,
+        ADD COLUMN IF NOT EXISTS user_high_id integer REFERENCES "user" (id) ON DELETE CASCADE,
+        ADD COLUMN IF NOT EXISTS requester_id integer REFERENCES "user" (id) ON DELETE CASCADE
+    """,
+    "DELETE FROM friendship WHERE user_id = friend_id",
+    # Одна строка на пару: принятая, затем ожидающая, затем самая ранняя.
+    # Самая ранняя строка принятой дружбы - исходная заявка, её user_id - отправитель
+    """
+    DELETE FROM friendship f USING (
+        SELECT id, row_number() OVER (
+            PARTITION BY least(user_id, friend_id), greatest(user_id, friend_id)
+            ORDER BY CASE status::text WHEN 'ACCEPTED' THEN 0 WHEN 'PENDING' THEN 1 ELSE 2 END, id
+        ) AS position
+        FROM friendship
+    ) ranked
+    WHERE f.id = ranked.id AND ranked.position > 1
+    """,
+    """
+    UPDATE friendship SET
+        user_low_id = least(user_id, friend_id),
+        user_high_id = greatest(user_id, friend_id),
+        requester_id = user_id
+    """,
+    """
+    ALTER TABLE friendship
+        ALTER COLUMN user_low_id SET NOT NULL,
+        ALTER COLUMN user_high_id SET NOT NULL,
+        ALTER COLUMN requester_id SET NOT NULL,
+        DROP COLUMN user_id,
+        DROP COLUMN friend_id,
+        ADD CONSTRAINT unique_friendship_pair UNIQUE (user_low_id, user_high_id),
+        ADD CONSTRAINT check_friendship_pair_order CHECK (user_low_id < user_high_id),
+        ADD CONSTRAINT check_friendship_requester
+            CHECK (requester_id = user_low_id OR requester_id = user_high_id)
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_friendship_user_high_id ON friendship (user_high_id)",
+]
+
+
+def migrate_friendships():
+    """Сворачивает зеркальные строки дружбы"""
+    try:
+        with engine.begin() as connection:
+            if not connection.execute(text(HAS_OLD_COLUMNS_SQL)).scalar():
+                print("Таблица friendship уже переведена")
+                return
+            before = connection.execute(text("SELECT count(*) FROM friendship")).scalar()
+            for statement in MIGRATE_SQL:
+                connection.execute(text(statement))
+            after = connection.execute(text("SELECT count(*) FROM friendship")).scalar()
+        print(f"✅ Строк в friendship: было {before}, стало {after}")
+
+        # Место удалённых строк в таблице и индексах можно снова использовать только после VACUUM
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM ANALYZE friendship"))
+        print("VACUUM ANALYZE friendship выполнен")
+    except Exception as e:
+        print(f"Ошибка при переводе таблицы friendship: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_friendships()
@@ -63,6 +63,12 @@ box.once("bootstrap", function()
         unique = false,
         if_not_exists = true
     })
+    news_feed_cache:create_index('post', {
+        parts = {'post_id'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
     
     -- Спейс для популярных постов
     local popular_posts = box.schema.space.create('popular_posts', {if_not_exists = true})
@@ -85,6 +91,204 @@ box.once("bootstrap", function()
         if_not_exists = true
     })
     
+    -- Спейс для кеша отрендеренных ответов API
+    local response_cache = box.schema.space.create('response_cache', {if_not_exists = true})
+    response_cache:format({
+        {name = 'key', type = 'string'},
+        {name = 'etag', type = 'string'},
+        {name = 'body', type = 'varbinary'},
+        {name = 'meta', type = 'map'},
+        {name = 'expires_at', type = 'unsigned'}
+    })
+    response_cache:create_index('primary', {
+        parts = {'key'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    response_cache:create_index('expires_at', {
+        parts = {'expires_at'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
+    
+    -- Спейс для счетчиков бейджей (непрочитанные сообщения, заявки в друзья)
+    local badge_counters = box.schema.space.create('badge_counters', {if_not_exists = true})
+    badge_counters:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'counters', type = 'map'}
+    })
+    badge_counters:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    
+    -- Спейс для последних сообщений каждого диалога
+    local recent_messages = box.schema.space.create('recent_messages', {if_not_exists = true})
+    recent_messages:format({
+        {name = 'pair_key', type = 'string'},
+        {name = 'message_id', type = 'unsigned'},
+        {name = 'message', type = 'map'}
+    })
+    recent_messages:create_index('primary', {
+        parts = {'pair_key', 'message_id'},
+        type = 'TREE',
+        unique = true,
+        if_not_exists = true
+    })
+    
+    -- Спейс для присутствия пользователей (онлайн и время последней активности)
+    local presence = box.schema.space.create('presence', {if_not_exists = true})
+    presence:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'last_seen', type = 'unsigned'},
+        {name = 'expires_at', type = 'unsigned'}
+    })
+    presence:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    presence:create_index('expires_at', {
+        parts = {'expires_at'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
+    
+    -- Спейс для рекомендаций друзей (кандидат и число общих друзей)
+    local friend_suggestions = box.schema.space.create('friend_suggestions', {if_not_exists = true})
+    friend_suggestions:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'computed_at', type = 'unsigned'},
+        {name = 'suggestions', type = 'array'}
+    })
+    friend_suggestions:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    
+    -- Спейс для отсортированных списков друзей (общие друзья)
+    local friend_ids = box.schema.space.create('friend_ids', {if_not_exists = true})
+    friend_ids:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'expires_at', type = 'unsigned'},
+        {name = 'friend_ids', type = 'array'}
+    })
+    friend_ids:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    friend_ids:create_index('expires_at', {
+        parts = {'expires_at'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
+    
+    -- Спейс для списков заблокированных пользователей (в обе стороны)
+    local block_lists = box.schema.space.create('block_lists', {if_not_exists = true})
+    block_lists:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'expires_at', type = 'unsigned'},
+        {name = 'hidden_ids', type = 'array'}
+    })
+    block_lists:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    
+    -- Спейс для фильтров Блума просмотренных постов (два поколения на пользователя)
+    local seen_posts = box.schema.space.create('seen_posts', {if_not_exists = true})
+    seen_posts:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'rotated_at', type = 'unsigned'},
+        {name = 'expires_at', type = 'unsigned'},
+        {name = 'current', type = 'array'},
+        {name = 'previous', type = 'array'}
+    })
+    seen_posts:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    seen_posts:create_index('expires_at', {
+        parts = {'expires_at'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
+    
+    -- Спейс для близости пользователей к авторам (ранжирование ленты)
+    local feed_affinity = box.schema.space.create('feed_affinity', {if_not_exists = true})
+    feed_affinity:format({
+        {name = 'user_id', type = 'unsigned'},
+        {name = 'expires_at', type = 'unsigned'},
+        {name = 'author_ids', type = 'array'},
+        {name = 'affinity', type = 'array'}
+    })
+    feed_affinity:create_index('primary', {
+        parts = {'user_id'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    feed_affinity:create_index('expires_at', {
+        parts = {'expires_at'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
+    
+    -- Спейс для контрольных точек счётчиков популярных хештегов
+    local trending = box.schema.space.create('trending', {if_not_exists = true})
+    trending:format({
+        {name = 'name', type = 'string'},
+        {name = 'saved_at', type = 'unsigned'},
+        {name = 'current', type = 'unsigned'},
+        {name = 'shape', type = 'array'},
+        {name = 'indices', type = 'varbinary'},
+        {name = 'counts', type = 'varbinary'},
+        {name = 'tags', type = 'array'}
+    })
+    trending:create_index('primary', {
+        parts = {'name'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    
+    -- Спейс поколений ключей кеша, увеличиваются при инвалидации
+    local cache_generations = box.schema.space.create('cache_generations', {if_not_exists = true})
+    cache_generations:format({
+        {name = 'key', type = 'string'},
+        {name = 'generation', type = 'unsigned'},
+        {name = 'expires_at', type = 'unsigned'}
+    })
+    cache_generations:create_index('primary', {
+        parts = {'key'},
+        type = 'HASH',
+        unique = true,
+        if_not_exists = true
+    })
+    cache_generations:create_index('expires_at', {
+        parts = {'expires_at'},
+        type = 'TREE',
+        unique = false,
+        if_not_exists = true
+    })
+    
     print("Tarantool spaces initialized successfully!")
 end)
 
@@ -127,4 +331,115 @@ function cleanup_expired_sessions()
     return #expired
 end
 
+function cleanup_expired_responses()
+    local current_time = os.time()
+    local expired = {}
+    for _, tuple in box.space.response_cache.index.expires_at:pairs({current_time}, {iterator = 'LT'}) do
+        table.insert(expired, tuple[1])
+    end
+    for _, key in ipairs(expired) do
+        box.space.response_cache:delete(key)
+    end
+    return #expired
+end
+
+-- Удаление записей о присутствии пользователей, не заходивших 30 дней
+function cleanup_expired_presence()
+    local threshold = os.time() - 30 * 24 * 60 * 60
+    local expired = {}
+    for _, tuple in box.space.presence.index.expires_at:pairs({threshold}, {iterator = 'LT'}) do
+        table.insert(expired, tuple[1])
+    end
+    for _, user_id in ipairs(expired) do
+        box.space.presence:delete(user_id)
+    end
+    return #expired
+end
+
+-- Удаление устаревших списков друзей
+function cleanup_expired_friend_ids()
+    local current_time = os.time()
+    local expired = {}
+    for _, tuple in box.space.friend_ids.index.expires_at:pairs({current_time}, {iterator = 'LT'}) do
+        table.insert(expired, tuple[1])
+    end
+    for _, user_id in ipairs(expired) do
+        box.space.friend_ids:delete(user_id)
+    end
+    return #expired
+end
+
+-- Удаление фильтров просмотренных постов, в которых не осталось живых поколений
+function cleanup_expired_seen_posts()
+    local current_time = os.time()
+    local expired = {}
+    for _, tuple in box.space.seen_posts.index.expires_at:pairs({current_time}, {iterator = 'LT'}) do
+        table.insert(expired, tuple[1])
+    end
+    for _, user_id in ipairs(expired) do
+        box.space.seen_posts:delete(user_id)
+    end
+    return #expired
+end
+
+-- Удаление устаревших значений близости к авторам
+function cleanup_expired_feed_affinity()
+    local current_time = os.time()
+    local expired = {}
+    for _, tuple in box.space.feed_affinity.index.expires_at:pairs({current_time}, {iterator = 'LT'}) do
+        table.insert(expired, tuple[1])
+    end
+    for _, user_id in ipairs(expired) do
+        box.space.feed_affinity:delete(user_id)
+    end
+    return #expired
+end
+
+-- Удаление поколений ключей, не инвалидировавшихся дольше их срока хранения
+function cleanup_expired_cache_generations()
+    local current_time = os.time()
+    local expired = {}
+    for _, tuple in box.space.cache_generations.index.expires_at:pairs({current_time}, {iterator = 'LT'}) do
+        table.insert(expired, tuple[1])
+    end
+    for _, key in ipairs(expired) do
+        box.space.cache_generations:delete(key)
+    end
+    return #expired
+end
+
+-- Фоновая очистка устаревших записей
+local fiber = require('fiber')
+fiber.create(function()
+    fiber.name('cache_cleanup')
+    while true do
+        fiber.sleep(60)
+        if box.space.response_cache then
+            pcall(cleanup_expired_responses)
+        end
+        if box.space.friend_ids then
+            pcall(cleanup_expired_friend_ids)
+        end
+        if box.space.cache_generations then
+            pcall(cleanup_expired_cache_generations)
+        end
+    end
+end)
+
+fiber.create(function()
+    fiber.name('presence_cleanup')
+    while true do
+        fiber.sleep(3600)
+        if box.space.presence then
+            pcall(cleanup_expired_presence)
+        end
+        if box.space.seen_posts then
+            pcall(cleanup_expired_seen_posts)
+        end
+        if box.space.feed_affinity then
+            pcall(cleanup_expired_feed_affinity)
+        end
+    end
+end)
+
 print("Tarantool configuration loaded successfully!")
@@ -15,6 +15,7 @@ from app.api.dependencies import get_db
 from app.core.config import settings
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.db.tarantool.response_cache import response_cache
 
 # Тестовая база данных
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -48,6 +49,13 @@ def db_session(db_engine):
     connection.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Идентификаторы повторяются между тестами, кеш ответов сбрасывается"""
+    yield
+    response_cache.clear_l1()
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Создает тестовый клиент FastAPI"""
@@ -122,4 +130,33 @@ def superuser_token_headers(client, test_superuser):
     tokens = response.json()
     access_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {access_token}"}
-    return headers
\ No newline at end of file
+    return headers
+
+
+@pytest.fixture
+def other_user(db_session):
+    """Создает второго пользователя"""
+    user = User(
+        username="otheruser",
+        email="other@example.com",
+        password_hash=get_password_hash("otherpassword"),
+        full_name="Other User",
+        is_active=True,
+        is_superuser=False
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def other_token_headers(client, other_user):
+    """Получает заголовки авторизации для второго пользователя"""
+    login_data = {
+        "username": other_user.username,
+        "password": "otherpassword"
+    }
+    response = client.post("/api/v1/login/access-token", data=login_data)
+    access_token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {access_token}"}
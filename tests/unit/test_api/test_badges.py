@@ -0,0 +1,58 @@
+import pytest
+
+from app.db.tarantool import badges
+from app.models.friendship import Friendship, FriendshipStatus
+
+
+class FakeBadgeSpace:
+    """Пространство badge_counters без кортежа пользователя"""
+
+    def call(self, function, args):
+        assert function == "box.space.badge_counters:get"
+        return [None]
+
+
+def unavailable_tarantool():
+    raise ConnectionError("Tarantool is down")
+
+
+@pytest.fixture
+def pending_request(db_session, test_user, other_user):
+    """Заявка в друзья от other_user к test_user"""
+    low, high = Friendship.pair(test_user.id, other_user.id)
+    friendship = Friendship(
+        user_low_id=low,
+        user_high_id=high,
+        requester_id=other_user.id,
+        status=FriendshipStatus.PENDING
+    )
+    db_session.add(friendship)
+    db_session.commit()
+    return friendship
+
+
+class TestBadgeEndpoints:
+    """Тесты для эндпоинта счетчиков"""
+
+    def test_user_without_counters(self, client, user_token_headers, monkeypatch):
+        """Тест пользователя, для которого еще ничего не посчитано"""
+        monkeypatch.setattr(badges, "get_shared_tarantool_connection", FakeBadgeSpace)
+
+        response = client.get("/api/v1/badges/", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "unread_messages": 0,
+            "pending_friend_requests": 0,
+            "unread_mentions": 0,
+        }
+
+    def test_postgres_fallback(self, client, user_token_headers, pending_request, monkeypatch):
+        """Тест подсчета в Postgres при недоступном Tarantool"""
+        monkeypatch.setattr(badges, "get_shared_tarantool_connection", unavailable_tarantool)
+
+        response = client.get("/api/v1/badges/", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert response.json()["pending_friend_requests"] == 1
+        assert response.json()["unread_messages"] == 0
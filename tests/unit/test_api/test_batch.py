@@ -0,0 +1,54 @@
+import pytest
+
+
+class TestBatchEndpoint:
+    """Тесты для пакетных запросов"""
+
+    def test_responses_in_request_order(self, client, user_token_headers, test_user, other_user):
+        """Тест порядка ответов и кодов отдельных запросов"""
+        batch = {"requests": [
+            {"id": "me", "path": "/users/me"},
+            {"id": "missing", "method": "POST", "path": "/messages/",
+             "body": {"recipient_id": other_user.id + 1000, "text": "Hi"}},
+            {"id": "send", "method": "POST", "path": "/messages/",
+             "body": {"recipient_id": other_user.id, "text": "Hi"}},
+            {"id": "history", "path": f"/messages/?user_id={other_user.id}"},
+        ]}
+
+        response = client.post("/api/v1/batch/", json=batch, headers=user_token_headers)
+
+        assert response.status_code == 200
+        items = response.json()["responses"]
+        assert [item["id"] for item in items] == ["me", "missing", "send", "history"]
+        assert [item["status"] for item in items] == [200, 404, 200, 200]
+        assert items[0]["body"]["id"] == test_user.id
+        assert items[1]["body"]["detail"] == "Recipient not found"
+        # Запись выполнена до следующего чтения
+        assert [message["id"] for message in items[3]["body"]] == [items[2]["body"]["id"]]
+
+    def test_sub_request_errors_do_not_fail_batch(self, client, user_token_headers):
+        """Тест ошибки валидации внутри пакета"""
+        batch = {"requests": [
+            {"id": "invalid", "method": "POST", "path": "/messages/", "body": {"text": "Hi"}},
+            {"id": "unknown", "path": "/unknown"},
+        ]}
+
+        response = client.post("/api/v1/batch/", json=batch, headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert [item["status"] for item in response.json()["responses"]] == [422, 404]
+
+    @pytest.mark.parametrize("path", ["/batch", "/batch/", "/events", "/events?token=x", "/ws"])
+    def test_rejected_paths(self, client, user_token_headers, path):
+        """Тест отклонения вложенных пакетов и потоковых эндпоинтов"""
+        batch = {"requests": [{"path": "/users/me"}, {"path": path}]}
+
+        response = client.post("/api/v1/batch/", json=batch, headers=user_token_headers)
+
+        assert response.status_code == 400
+
+    def test_unauthorized(self, client):
+        """Тест пакета без авторизации"""
+        response = client.post("/api/v1/batch/", json={"requests": [{"path": "/users/me"}]})
+
+        assert response.status_code == 401
@@ -0,0 +1,147 @@
+from app.db.tarantool.response_cache import post_comments_key, response_cache
+from app.models.comment import Comment
+from app.models.like import Like
+from tests.unit.test_api.test_posts import create_post
+
+
+def create_comment(client, headers, post_id, content, parent_id=None):
+    response = client.post(
+        "/api/v1/comments/",
+        json={"post_id": post_id, "content": content, "parent_id": parent_id},
+        headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestCommentMultiGet:
+    """Тесты для получения нескольких комментариев"""
+
+    def test_request_order(self, client, user_token_headers, other_token_headers):
+        """Тест порядка запроса и пропуска неизвестных id"""
+        post = create_post(client, user_token_headers, "Post")
+        first = create_comment(client, user_token_headers, post["id"], "First")
+        second = create_comment(client, other_token_headers, post["id"], "Second")
+
+        response = client.get(
+            "/api/v1/comments/",
+            params={"ids": [second["id"], 9999, first["id"]]},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        comments = response.json()
+        assert [comment["id"] for comment in comments] == [second["id"], first["id"]]
+        assert comments[0]["content"] == "Second"
+
+    def test_skips_comments_on_hidden_posts(self, client, user_token_headers, other_token_headers):
+        """Тест пропуска комментариев к постам, которые не видны"""
+        hidden_post = create_post(client, other_token_headers, "Friends only", "friends")
+        hidden = create_comment(client, other_token_headers, hidden_post["id"], "Hidden")
+        post = create_post(client, other_token_headers, "Public")
+        visible = create_comment(client, other_token_headers, post["id"], "Visible")
+
+        response = client.get(
+            "/api/v1/comments/",
+            params={"ids": [hidden["id"], visible["id"]]},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert [comment["id"] for comment in response.json()] == [visible["id"]]
+
+
+def like_comment(client, headers, comment_id):
+    response = client.post("/api/v1/likes/", json={"comment_id": comment_id}, headers=headers)
+    assert response.status_code == 200
+
+
+class TestCommentPageLikes:
+    """Тесты для отметок liked_by_me на кешированной странице комментариев"""
+
+    def test_flags_are_per_user(self, client, user_token_headers, other_token_headers):
+        """Тест отметок разных пользователей на одной записи кеша"""
+        post = create_post(client, user_token_headers, "Post")
+        first = create_comment(client, user_token_headers, post["id"], "First")
+        second = create_comment(client, user_token_headers, post["id"], "Second")
+        like_comment(client, user_token_headers, first["id"])
+        like_comment(client, other_token_headers, second["id"])
+        url = f"/api/v1/comments/post/{post['id']}?limit=20"
+
+        # Первый запрос заполняет кеш, второй читает ту же запись
+        mine = client.get(url, headers=user_token_headers)
+        cached_key = post_comments_key(post["id"], 20)
+        assert response_cache.get_many([cached_key])[cached_key] is not None
+        theirs = client.get(url, headers=other_token_headers)
+
+        assert mine.status_code == theirs.status_code == 200
+        assert {c["id"]: c["liked_by_me"] for c in mine.json()} == {first["id"]: True, second["id"]: False}
+        assert {c["id"]: c["liked_by_me"] for c in theirs.json()} == {first["id"]: False, second["id"]: True}
+        assert [c["like_count"] for c in theirs.json()] == [1, 1]
+        assert mine.headers["ETag"] != theirs.headers["ETag"]
+
+    def test_not_modified(self, client, user_token_headers, other_token_headers):
+        """Тест ETag с учетом отметок пользователя"""
+        post = create_post(client, user_token_headers, "Post")
+        comment = create_comment(client, user_token_headers, post["id"], "Comment")
+        url = f"/api/v1/comments/post/{post['id']}?limit=20"
+        etag = client.get(url, headers=user_token_headers).headers["ETag"]
+
+        cached = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+
+        # Лайк другого пользователя сбрасывает запись кеша и меняет страницу
+        like_comment(client, other_token_headers, comment["id"])
+        response = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()[0]["like_count"] == 1
+        assert response.json()[0]["liked_by_me"] is False
+
+
+class TestDeleteComment:
+    """Тесты для удаления комментария с ответами"""
+
+    def test_delete_subtree(self, client, user_token_headers, other_token_headers, db_session):
+        """Тест удаления ветки и пересчета ответов у предков"""
+        post = create_post(client, user_token_headers, "Post")
+        root = create_comment(client, user_token_headers, post["id"], "Root")
+        branch = create_comment(client, other_token_headers, post["id"], "Branch", root["id"])
+        reply = create_comment(client, user_token_headers, post["id"], "Reply", branch["id"])
+        create_comment(client, user_token_headers, post["id"], "Deep reply", reply["id"])
+        sibling = create_comment(client, user_token_headers, post["id"], "Sibling", root["id"])
+        like_comment(client, user_token_headers, reply["id"])
+        url = f"/api/v1/comments/post/{post['id']}"
+        assert client.get(url, headers=user_token_headers).json()[0]["reply_count"] == 4
+
+        response = client.delete(f"/api/v1/comments/{branch['id']}", headers=other_token_headers)
+
+        assert response.status_code == 200
+        assert response.json()["id"] == branch["id"]
+        comments = client.get(url, headers=user_token_headers).json()
+        assert [(comment["id"], comment["reply_count"]) for comment in comments] == [
+            (root["id"], 1), (sibling["id"], 0)
+        ]
+        assert db_session.query(Comment).count() == 2
+        assert db_session.query(Like).filter(Like.comment_id != None).count() == 0
+
+    def test_delete_top_level(self, client, user_token_headers, db_session):
+        """Тест удаления комментария верхнего уровня"""
+        post = create_post(client, user_token_headers, "Post")
+        root = create_comment(client, user_token_headers, post["id"], "Root")
+        create_comment(client, user_token_headers, post["id"], "Reply", root["id"])
+        other = create_comment(client, user_token_headers, post["id"], "Other")
+
+        response = client.delete(f"/api/v1/comments/{root['id']}", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert [comment.id for comment in db_session.query(Comment)] == [other["id"]]
+
+    def test_delete_by_other_user(self, client, user_token_headers, other_token_headers):
+        """Тест удаления чужого комментария"""
+        post = create_post(client, user_token_headers, "Post")
+        comment = create_comment(client, user_token_headers, post["id"], "Comment")
+
+        response = client.delete(f"/api/v1/comments/{comment['id']}", headers=other_token_headers)
+
+        assert response.status_code == 403
@@ -0,0 +1,294 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import app.scripts.migrate_friendships as migration
+from app.core.config import settings
+from app.models.friendship import Friendship, FriendshipStatus
+
+MIGRATION_SCHEMA = "friendship_migration_test"
+
+
+@pytest.fixture
+def friend_request(client, user_token_headers, other_user):
+    """Отправляет заявку в друзья от test_user к other_user"""
+    response = client.post(
+        "/api/v1/friendships/", json={"friend_id": other_user.id}, headers=user_token_headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestFriendshipEndpoints:
+    """Тесты для эндпоинтов дружбы"""
+
+    def test_send_request(self, client, friend_request, other_token_headers, test_user, other_user):
+        """Тест отправки заявки в друзья"""
+        assert friend_request["user_id"] == test_user.id
+        assert friend_request["friend_id"] == other_user.id
+        assert friend_request["status"] == "pending"
+
+        response = client.get("/api/v1/friendships/requests", headers=other_token_headers)
+
+        assert response.status_code == 200
+        requests = response.json()
+        assert [request["id"] for request in requests] == [friend_request["id"]]
+        assert requests[0]["user"]["id"] == test_user.id
+
+    def test_send_request_twice(self, client, friend_request, user_token_headers, other_user):
+        """Тест повторной заявки"""
+        response = client.post(
+            "/api/v1/friendships/", json={"friend_id": other_user.id}, headers=user_token_headers
+        )
+
+        assert response.status_code == 400
+        assert "already exists" in response.json()["detail"]
+
+    def test_accept_request(self, client, friend_request, user_token_headers, other_token_headers,
+                            test_user, other_user):
+        """Тест принятия заявки"""
+        response = client.put(
+            f"/api/v1/friendships/{friend_request['id']}",
+            json={"status": "accepted"},
+            headers=other_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "accepted"
+
+        # Дружба видна обоим пользователям, каждому со своей стороны
+        for headers, user, friend in (
+            (user_token_headers, test_user, other_user),
+            (other_token_headers, other_user, test_user),
+        ):
+            friendships = client.get("/api/v1/friendships/", headers=headers).json()
+            assert len(friendships) == 1
+            assert friendships[0]["user_id"] == user.id
+            assert friendships[0]["friend_id"] == friend.id
+            assert friendships[0]["status"] == "accepted"
+
+        assert client.get("/api/v1/friendships/requests", headers=other_token_headers).json() == []
+
+    def test_decline_request(self, client, friend_request, other_token_headers):
+        """Тест отклонения заявки"""
+        response = client.put(
+            f"/api/v1/friendships/{friend_request['id']}",
+            json={"status": "declined"},
+            headers=other_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "declined"
+        assert client.get("/api/v1/friendships/requests", headers=other_token_headers).json() == []
+        assert client.get("/api/v1/friendships/", headers=other_token_headers).json() == []
+
+    def test_update_by_requester(self, client, friend_request, user_token_headers):
+        """Тест принятия заявки ее отправителем"""
+        response = client.put(
+            f"/api/v1/friendships/{friend_request['id']}",
+            json={"status": "accepted"},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 403
+
+    def test_update_to_pending(self, client, friend_request, other_token_headers):
+        """Тест перевода заявки обратно в ожидание"""
+        response = client.put(
+            f"/api/v1/friendships/{friend_request['id']}",
+            json={"status": "pending"},
+            headers=other_token_headers
+        )
+
+        assert response.status_code == 400
+
+    def test_reverse_request_accepts_pending(self, client, friend_request, user_token_headers,
+                                             other_token_headers, db_session, test_user, other_user):
+        """Тест встречной заявки при ожидающей"""
+        response = client.post(
+            "/api/v1/friendships/", json={"friend_id": test_user.id}, headers=other_token_headers
+        )
+
+        assert response.status_code == 200
+        friendship = response.json()
+        assert friendship["id"] == friend_request["id"]
+        assert friendship["user_id"] == other_user.id
+        assert friendship["friend_id"] == test_user.id
+        assert friendship["status"] == "accepted"
+
+        # Встречная заявка не создает вторую строку
+        assert db_session.query(Friendship).count() == 1
+        assert client.get("/api/v1/friendships/requests", headers=other_token_headers).json() == []
+        friendships = client.get("/api/v1/friendships/", headers=user_token_headers).json()
+        assert [friendship["status"] for friendship in friendships] == ["accepted"]
+
+    @pytest.mark.parametrize("side", ["requester", "recipient"])
+    def test_delete_friendship(self, client, friend_request, user_token_headers, other_token_headers,
+                               db_session, side):
+        """Тест удаления дружбы любой из сторон"""
+        client.put(
+            f"/api/v1/friendships/{friend_request['id']}",
+            json={"status": "accepted"},
+            headers=other_token_headers
+        )
+        headers = user_token_headers if side == "requester" else other_token_headers
+
+        response = client.delete(f"/api/v1/friendships/{friend_request['id']}", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "accepted"
+        assert db_session.query(Friendship).count() == 0
+        assert client.get("/api/v1/friendships/", headers=user_token_headers).json() == []
+        assert client.get("/api/v1/friendships/", headers=other_token_headers).json() == []
+
+    def test_delete_request_by_recipient(self, client, friend_request, other_token_headers, db_session):
+        """Тест удаления заявки получателем"""
+        response = client.delete(f"/api/v1/friendships/{friend_request['id']}", headers=other_token_headers)
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "pending"
+        assert db_session.query(Friendship).count() == 0
+        assert client.get("/api/v1/friendships/requests", headers=other_token_headers).json() == []
+
+    def test_delete_by_other_user(self, client, friend_request, superuser_token_headers):
+        """Тест удаления чужой дружбы"""
+        response = client.delete(
+            f"/api/v1/friendships/{friend_request['id']}", headers=superuser_token_headers
+        )
+
+        assert response.status_code == 403
+
+
+def make_friends(db_session, user_id, friend_id):
+    low, high = Friendship.pair(user_id, friend_id)
+    db_session.add(Friendship(
+        user_low_id=low, user_high_id=high, requester_id=user_id, status=FriendshipStatus.ACCEPTED
+    ))
+    db_session.commit()
+
+
+@pytest.fixture
+def mutual_friend(db_session, test_user, other_user, test_superuser):
+    """test_superuser дружит и с test_user, и с other_user"""
+    make_friends(db_session, test_superuser.id, test_user.id)
+    make_friends(db_session, test_superuser.id, other_user.id)
+    return test_superuser
+
+
+class TestMutualFriends:
+    """Тесты для общих друзей"""
+
+    def test_mutual_friends(self, client, mutual_friend, user_token_headers, other_user):
+        """Тест списка и числа общих друзей"""
+        response = client.get(f"/api/v1/friendships/mutual/{other_user.id}", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert response.json()["mutual_friends"] == 1
+        assert [friend["id"] for friend in response.json()["friends"]] == [mutual_friend.id]
+
+        response = client.get(
+            "/api/v1/friendships/mutual",
+            params={"user_ids": [other_user.id, 9999, other_user.id]},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"user_id": other_user.id, "mutual_friends": 1},
+            {"user_id": 9999, "mutual_friends": 0},
+        ]
+
+    @pytest.mark.parametrize("blocker", ["viewer", "viewed"])
+    def test_blocked_users(self, client, mutual_friend, user_token_headers, other_token_headers,
+                           test_user, other_user, blocker):
+        """Тест блокировки в любую сторону"""
+        if blocker == "viewer":
+            response = client.post("/api/v1/blocks/", json={"user_id": other_user.id}, headers=user_token_headers)
+        else:
+            response = client.post("/api/v1/blocks/", json={"user_id": test_user.id}, headers=other_token_headers)
+        assert response.status_code == 200
+
+        response = client.get(f"/api/v1/friendships/mutual/{other_user.id}", headers=user_token_headers)
+        assert response.status_code == 404
+
+        response = client.get(
+            "/api/v1/friendships/mutual", params={"user_ids": [other_user.id]}, headers=user_token_headers
+        )
+        assert response.json() == [{"user_id": other_user.id, "mutual_friends": 0}]
+
+
+@pytest.fixture
+def legacy_engine():
+    """Отдельная схема PostgreSQL со старой таблицей friendship"""
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        connect_args={"options": f"-csearch_path={MIGRATION_SCHEMA}"}
+    )
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {MIGRATION_SCHEMA} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {MIGRATION_SCHEMA}"))
+            connection.execute(text('CREATE TABLE "user" (id integer PRIMARY KEY)'))
+            connection.execute(text("""
+                CREATE TABLE friendship (
+                    id integer PRIMARY KEY,
+                    user_id integer REFERENCES "user" (id),
+                    friend_id integer REFERENCES "user" (id),
+                    status varchar NOT NULL
+                )
+            """))
+    except OperationalError:
+        engine.dispose()
+        pytest.skip("PostgreSQL is not available")
+
+    yield engine
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA {MIGRATION_SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+class TestMigrateFriendships:
+    """Тесты для перевода таблицы friendship на одну строку на пару"""
+
+    def test_fold_mirrored_rows(self, legacy_engine, monkeypatch):
+        """Тест сворачивания зеркальных строк"""
+        monkeypatch.setattr(migration, "engine", legacy_engine)
+        with legacy_engine.begin() as connection:
+            connection.execute(text('INSERT INTO "user" (id) VALUES (1), (2), (3), (4)'))
+            connection.execute(text("""
+                INSERT INTO friendship (id, user_id, friend_id, status) VALUES
+                    (1, 2, 1, 'ACCEPTED'),
+                    (2, 1, 2, 'ACCEPTED'),
+                    (3, 3, 1, 'PENDING'),
+                    (4, 1, 4, 'DECLINED'),
+                    (5, 4, 1, 'PENDING'),
+                    (6, 3, 3, 'PENDING')
+            """))
+
+        migration.migrate_friendships()
+
+        with legacy_engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT id, user_low_id, user_high_id, requester_id, status FROM friendship ORDER BY id"
+            )).all()
+        # Принятая дружба остается ранней строкой, ожидающая заявка вытесняет отклоненную
+        assert [tuple(row) for row in rows] == [
+            (1, 1, 2, 2, "ACCEPTED"),
+            (3, 1, 3, 3, "PENDING"),
+            (5, 1, 4, 4, "PENDING"),
+        ]
+
+    def test_rerun_is_noop(self, legacy_engine, monkeypatch):
+        """Тест повторного запуска"""
+        monkeypatch.setattr(migration, "engine", legacy_engine)
+        with legacy_engine.begin() as connection:
+            connection.execute(text('INSERT INTO "user" (id) VALUES (1), (2)'))
+            connection.execute(text("INSERT INTO friendship (id, user_id, friend_id, status) VALUES (1, 1, 2, 'PENDING')"))
+
+        migration.migrate_friendships()
+        migration.migrate_friendships()
+
+        with legacy_engine.connect() as connection:
+            rows = connection.execute(text("SELECT id, requester_id FROM friendship")).all()
+        assert [tuple(row) for row in rows] == [(1, 1)]
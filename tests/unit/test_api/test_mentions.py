@@ -0,0 +1,90 @@
+import pytest
+
+from app.db.tarantool import badges
+from tests.unit.test_api.test_comments import create_comment
+from tests.unit.test_api.test_posts import create_post
+
+
+class BadgeCalls:
+    """Записывает изменения счетчиков вместо Tarantool"""
+
+    def __init__(self):
+        self.increments = []
+        self.resets = []
+
+    def increment(self, changes):
+        self.increments.extend(changes)
+
+    def reset(self, user_id, names):
+        self.resets.append((user_id, list(names)))
+
+
+@pytest.fixture
+def badge_calls(monkeypatch):
+    calls = BadgeCalls()
+    monkeypatch.setattr(badges, "increment", calls.increment)
+    monkeypatch.setattr(badges, "reset", calls.reset)
+    return calls
+
+
+def read_mentions(client, headers, **params):
+    response = client.get("/api/v1/mentions/", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestMentions:
+    """Тесты для упоминаний"""
+
+    def test_mention_in_post_and_comment(self, client, badge_calls, user_token_headers, other_token_headers,
+                                         other_user):
+        """Тест упоминаний в посте и комментарии, новые первыми"""
+        post = create_post(client, user_token_headers, "Hello @otheruser")
+        comment = create_comment(client, user_token_headers, post["id"], "Still there, @otheruser?")
+
+        items = read_mentions(client, other_token_headers)["items"]
+
+        assert [(item["post_id"], item["comment_id"]) for item in items] == [
+            (post["id"], comment["id"]), (post["id"], None)
+        ]
+        assert items[0]["content"] == "Still there, @otheruser?"
+        assert badge_calls.increments == [(other_user.id, badges.UNREAD_MENTIONS, 1)] * 2
+
+    def test_self_and_duplicate_mentions(self, client, badge_calls, user_token_headers, other_token_headers,
+                                         other_user):
+        """Тест: себя не упоминают, повторное имя дает одно упоминание"""
+        create_post(client, user_token_headers, "@testuser @otheruser and again @otheruser")
+
+        assert len(read_mentions(client, other_token_headers)["items"]) == 1
+        assert read_mentions(client, user_token_headers)["items"] == []
+        assert badge_calls.increments == [(other_user.id, badges.UNREAD_MENTIONS, 1)]
+
+    @pytest.mark.parametrize("blocker", ["author", "mentioned"])
+    def test_blocked_users(self, client, badge_calls, user_token_headers, other_token_headers,
+                           test_user, other_user, blocker):
+        """Тест блокировки в любую сторону"""
+        if blocker == "author":
+            response = client.post("/api/v1/blocks/", json={"user_id": other_user.id}, headers=user_token_headers)
+        else:
+            response = client.post("/api/v1/blocks/", json={"user_id": test_user.id}, headers=other_token_headers)
+        assert response.status_code == 200
+
+        create_post(client, user_token_headers, "Hello @otheruser")
+
+        assert read_mentions(client, other_token_headers)["items"] == []
+        assert badge_calls.increments == []
+
+    def test_first_page_resets_badge(self, client, badge_calls, user_token_headers, other_token_headers,
+                                     other_user):
+        """Тест сброса счетчика только при чтении первой страницы"""
+        for n in range(3):
+            create_post(client, user_token_headers, f"Post {n} for @otheruser")
+
+        first = read_mentions(client, other_token_headers, limit=2)
+        assert badge_calls.resets == [(other_user.id, [badges.UNREAD_MENTIONS])]
+
+        second = read_mentions(client, other_token_headers, limit=2, cursor=first["next_cursor"])
+        assert badge_calls.resets == [(other_user.id, [badges.UNREAD_MENTIONS])]
+        assert len(first["items"]) == 2
+        assert len(second["items"]) == 1
+        assert second["next_cursor"] is None
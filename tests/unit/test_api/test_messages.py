@@ -0,0 +1,355 @@
+import pytest
+
+from app.api.endpoints import messages as messages_endpoint
+from app.db.tarantool import recent_messages
+from app.models.conversation import Conversation
+from app.models.message import Message
+
+
+def send_message(client, headers, recipient_id, text):
+    response = client.post(
+        "/api/v1/messages/", json={"recipient_id": recipient_id, "text": text}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def unread_count(client, headers):
+    response = client.get("/api/v1/messages/unread", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestReadWatermark:
+    """Тесты для отметок о прочтении"""
+
+    def test_opening_conversation_reads_messages(self, client, user_token_headers, other_token_headers,
+                                                 test_user, other_user):
+        """Тест прочтения при открытии переписки"""
+        for text in ("One", "Two", "Three"):
+            send_message(client, other_token_headers, test_user.id, text)
+        assert unread_count(client, user_token_headers) == 3
+
+        response = client.get(f"/api/v1/messages/?user_id={other_user.id}", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert [message["is_read"] for message in response.json()] == [True, True, True]
+        assert unread_count(client, user_token_headers) == 0
+        # Отправитель свои сообщения не читает
+        assert unread_count(client, other_token_headers) == 0
+
+    def test_messages_after_watermark_are_unread(self, client, user_token_headers, other_token_headers,
+                                                 test_user, other_user):
+        """Тест непрочитанных сообщений после отметки"""
+        send_message(client, other_token_headers, test_user.id, "One")
+        client.get(f"/api/v1/messages/?user_id={other_user.id}", headers=user_token_headers)
+        send_message(client, other_token_headers, test_user.id, "Two")
+        send_message(client, user_token_headers, other_user.id, "Reply")
+
+        assert unread_count(client, user_token_headers) == 1
+        assert unread_count(client, other_token_headers) == 1
+
+    def test_update_moves_watermark(self, client, user_token_headers, other_token_headers,
+                                    db_session, test_user):
+        """Тест отметки сообщения прочитанным и непрочитанным"""
+        messages = [send_message(client, other_token_headers, test_user.id, text) for text in ("1", "2", "3")]
+
+        response = client.put(
+            f"/api/v1/messages/{messages[1]['id']}", json={"is_read": True}, headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["is_read"] is True
+        assert unread_count(client, user_token_headers) == 1
+        read = [message.is_read for message in db_session.query(Message).order_by(Message.id)]
+        assert read == [True, True, False]
+
+        response = client.put(
+            f"/api/v1/messages/{messages[0]['id']}", json={"is_read": False}, headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["is_read"] is False
+        assert unread_count(client, user_token_headers) == 3
+        db_session.expire_all()
+        read = [message.is_read for message in db_session.query(Message).order_by(Message.id)]
+        assert read == [False, False, False]
+
+    def test_update_already_read(self, client, user_token_headers, other_token_headers, test_user):
+        """Тест повторной отметки о прочтении"""
+        messages = [send_message(client, other_token_headers, test_user.id, text) for text in ("1", "2")]
+        client.put(f"/api/v1/messages/{messages[1]['id']}", json={"is_read": True}, headers=user_token_headers)
+
+        response = client.put(
+            f"/api/v1/messages/{messages[0]['id']}", json={"is_read": True}, headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert unread_count(client, user_token_headers) == 0
+
+    def test_update_by_sender(self, client, other_token_headers, test_user):
+        """Тест отметки о прочтении отправителем"""
+        message = send_message(client, other_token_headers, test_user.id, "Hi")
+
+        response = client.put(
+            f"/api/v1/messages/{message['id']}", json={"is_read": True}, headers=other_token_headers
+        )
+
+        assert response.status_code == 403
+
+
+class TestConversations:
+    """Тесты для списка переписок"""
+
+    def test_inbox_by_latest_activity(self, client, user_token_headers, other_token_headers,
+                                      superuser_token_headers, test_user, other_user, test_superuser):
+        """Тест последнего сообщения каждой переписки"""
+        send_message(client, other_token_headers, test_user.id, "From other")
+        send_message(client, superuser_token_headers, test_user.id, "From admin")
+        latest = send_message(client, user_token_headers, other_user.id, "Reply")
+
+        response = client.get("/api/v1/messages/conversations", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert [message["text"] for message in response.json()] == ["Reply", "From admin"]
+        assert response.json()[0]["id"] == latest["id"]
+
+    def test_concurrent_create(self, client, user_token_headers, other_token_headers,
+                               db_session, test_user, other_user, monkeypatch):
+        """Тест переписки, созданной параллельно другим участником"""
+        send_message(client, other_token_headers, test_user.id, "First")
+        lock_conversation = messages_endpoint.lock_conversation
+        calls = []
+
+        def lock_after_race(db, user_a, user_b):
+            # Первый поиск не видит строку, созданную другой транзакцией
+            calls.append((user_a, user_b))
+            return None if len(calls) == 1 else lock_conversation(db, user_a, user_b)
+
+        monkeypatch.setattr(messages_endpoint, "lock_conversation", lock_after_race)
+        second = send_message(client, user_token_headers, other_user.id, "Second")
+
+        assert len(calls) == 2
+        conversation = db_session.query(Conversation).one()
+        assert conversation.last_message_id == second["id"]
+        assert conversation.unread_for(other_user.id) == 1
+        assert conversation.unread_for(test_user.id) == 1
+
+    def test_delete_last_message(self, client, user_token_headers, other_token_headers, test_user, other_user):
+        """Тест удаления последнего сообщения переписки"""
+        first = send_message(client, other_token_headers, test_user.id, "First")
+        second = send_message(client, other_token_headers, test_user.id, "Second")
+
+        response = client.delete(f"/api/v1/messages/{second['id']}", headers=user_token_headers)
+
+        assert response.status_code == 200
+        inbox = client.get("/api/v1/messages/conversations", headers=user_token_headers).json()
+        assert [message["id"] for message in inbox] == [first["id"]]
+        assert unread_count(client, user_token_headers) == 1
+
+    def test_delete_only_message(self, client, user_token_headers, other_token_headers, db_session, test_user):
+        """Тест удаления единственного сообщения"""
+        message = send_message(client, other_token_headers, test_user.id, "Only")
+
+        response = client.delete(f"/api/v1/messages/{message['id']}", headers=other_token_headers)
+
+        assert response.status_code == 200
+        assert db_session.query(Conversation).count() == 0
+        assert client.get("/api/v1/messages/conversations", headers=user_token_headers).json() == []
+        assert unread_count(client, user_token_headers) == 0
+
+
+class FakeRecentMessages:
+    """Скрипты кеша последних сообщений, выполняемые в памяти"""
+
+    def __init__(self):
+        self.conversations = {}
+        self.gets = 0
+        self.fills = 0
+
+    def eval(self, script, args):
+        if script == recent_messages.GET_LUA:
+            key, limit = args
+            self.gets += 1
+            if key not in self.conversations:
+                return [None]
+            header, messages = self.conversations[key]
+            ordered = [messages[id_] for id_ in sorted(messages, reverse=True)][:limit]
+            return [[dict(header), ordered]]
+        if script == recent_messages.FILL_LUA:
+            key, header, messages = args
+            self.fills += 1
+            self.conversations[key] = (header, {message["id"]: message for message in messages})
+            return []
+        if script == recent_messages.APPLY_LUA:
+            key, updates, size = args
+            if key not in self.conversations:
+                return []
+            header, messages = self.conversations[key]
+            for version, op, arg in updates:
+                if version != header["version"] + 1:
+                    del self.conversations[key]
+                    return []
+                header["version"] = version
+                if op == "append":
+                    messages[arg["id"]] = arg
+                elif op == "delete":
+                    messages.pop(arg["id"], None)
+                elif op == "read":
+                    for message in messages.values():
+                        if message["recipient_id"] == arg["reader_id"] and message["id"] <= arg["up_to_id"]:
+                            message["is_read"] = True
+                elif op == "unread":
+                    for message in messages.values():
+                        if message["recipient_id"] == arg["reader_id"] and message["id"] >= arg["from_id"]:
+                            message["is_read"] = False
+            return []
+        raise AssertionError("unexpected script")
+
+
+@pytest.fixture
+def recent_cache(monkeypatch):
+    cache = FakeRecentMessages()
+    monkeypatch.setattr(recent_messages, "get_shared_tarantool_connection", lambda: cache)
+    return cache
+
+
+class TestRecentMessagesCache:
+    """Тесты для кеша последних сообщений переписки"""
+
+    def test_first_page_served_from_cache(self, client, user_token_headers, other_token_headers,
+                                          test_user, other_user, recent_cache):
+        """Тест заполнения кеша и чтения из него"""
+        send_message(client, other_token_headers, test_user.id, "One")
+        url = f"/api/v1/messages/?user_id={other_user.id}"
+
+        first = client.get(url, headers=user_token_headers).json()
+        send_message(client, other_token_headers, test_user.id, "Two")
+        second = client.get(url, headers=user_token_headers).json()
+
+        # Новое сообщение добавлено в кеш обновлением, без повторного заполнения
+        assert recent_cache.fills == 1
+        assert [message["text"] for message in first] == ["One"]
+        assert [message["text"] for message in second] == ["One", "Two"]
+        assert [message["is_read"] for message in second] == [True, True]
+
+    def test_stale_version_falls_back(self, client, user_token_headers, other_token_headers,
+                                      test_user, other_user, recent_cache):
+        """Тест чтения из Postgres при устаревшей версии кеша"""
+        send_message(client, other_token_headers, test_user.id, "One")
+        url = f"/api/v1/messages/?user_id={other_user.id}"
+        client.get(url, headers=user_token_headers)
+        key = recent_messages.pair_key(test_user.id, other_user.id)
+        header, messages = recent_cache.conversations[key]
+        # Обновление потеряно: в кеше старое содержимое с прежней версией
+        header["version"] -= 1
+        for message in messages.values():
+            message["text"] = "Stale"
+
+        response = client.get(url, headers=user_token_headers)
+
+        assert [message["text"] for message in response.json()] == ["One"]
+        assert recent_cache.fills == 2
+
+    def test_missed_update_drops_conversation(self, client, user_token_headers, other_token_headers,
+                                              test_user, other_user, recent_cache):
+        """Тест сброса кеша при пропущенном обновлении"""
+        send_message(client, other_token_headers, test_user.id, "One")
+        url = f"/api/v1/messages/?user_id={other_user.id}"
+        client.get(url, headers=user_token_headers)
+        key = recent_messages.pair_key(test_user.id, other_user.id)
+        recent_cache.conversations[key][0]["version"] += 1
+
+        send_message(client, other_token_headers, test_user.id, "Two")
+
+        assert key not in recent_cache.conversations
+        response = client.get(url, headers=user_token_headers)
+        assert [message["text"] for message in response.json()] == ["One", "Two"]
+
+    def test_deleted_message_removed_from_cache(self, client, user_token_headers, other_token_headers,
+                                                test_user, other_user, recent_cache):
+        """Тест удаления сообщения из кеша"""
+        send_message(client, other_token_headers, test_user.id, "One")
+        second = send_message(client, other_token_headers, test_user.id, "Two")
+        url = f"/api/v1/messages/?user_id={other_user.id}"
+        client.get(url, headers=user_token_headers)
+
+        client.delete(f"/api/v1/messages/{second['id']}", headers=user_token_headers)
+        response = client.get(url, headers=user_token_headers)
+
+        assert [message["text"] for message in response.json()] == ["One"]
+        assert recent_cache.fills == 1
+
+    def test_unavailable_cache(self, client, user_token_headers, other_token_headers,
+                               test_user, other_user, monkeypatch):
+        """Тест чтения из Postgres без Tarantool"""
+        def unavailable_tarantool():
+            raise ConnectionError("Tarantool is down")
+
+        monkeypatch.setattr(recent_messages, "get_shared_tarantool_connection", unavailable_tarantool)
+        send_message(client, other_token_headers, test_user.id, "One")
+
+        response = client.get(f"/api/v1/messages/?user_id={other_user.id}", headers=user_token_headers)
+
+        assert response.status_code == 200
+        assert [message["text"] for message in response.json()] == ["One"]
+
+
+def search_messages(client, headers, params):
+    """Проходит все страницы поиска сообщений по next_cursor"""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(
+            "/api/v1/messages/search", params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers
+        )
+        assert response.status_code == 200
+        pages.append([message["id"] for message in response.json()["items"]])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestMessageSearch:
+    """Тесты для поиска сообщений"""
+
+    def test_keyset_pages(self, client, user_token_headers, other_token_headers, test_user, other_user):
+        """Тест поиска по обеим сторонам переписки постранично"""
+        matching = [
+            send_message(client, other_token_headers, test_user.id, "Lunch today?")["id"],
+            send_message(client, user_token_headers, other_user.id, "Sure, lunch at noon")["id"],
+            send_message(client, other_token_headers, test_user.id, "Lunch place is full")["id"],
+        ]
+        send_message(client, other_token_headers, test_user.id, "Never mind")
+
+        pages = search_messages(client, user_token_headers, {"q": "lunch", "limit": 2})
+
+        assert pages == [matching[:0:-1], matching[:1]]
+
+    def test_conversation_filter(self, client, user_token_headers, other_token_headers, superuser_token_headers,
+                                 test_user, other_user, test_superuser):
+        """Тест поиска в переписке с одним пользователем"""
+        expected = send_message(client, other_token_headers, test_user.id, "Lunch?")["id"]
+        send_message(client, superuser_token_headers, test_user.id, "Lunch too?")
+        # Чужие переписки не попадают в поиск
+        send_message(client, other_token_headers, test_superuser.id, "Lunch without you")
+
+        pages = search_messages(client, user_token_headers, {"q": "lunch", "user_id": other_user.id})
+
+        assert pages == [[expected]]
+
+    def test_snippet_is_escaped(self, client, user_token_headers, other_token_headers, test_user):
+        """Тест экранирования текста в сниппете"""
+        send_message(client, other_token_headers, test_user.id, "<script>lunch</script>")
+
+        response = client.get("/api/v1/messages/search", params={"q": "lunch"}, headers=user_token_headers)
+
+        assert response.json()["items"][0]["snippet"] == "&lt;script&gt;lunch&lt;/script&gt;"
+
+    def test_invalid_cursor(self, client, user_token_headers):
+        """Тест некорректного курсора"""
+        response = client.get(
+            "/api/v1/messages/search", params={"q": "lunch", "cursor": "broken"}, headers=user_token_headers
+        )
+
+        assert response.status_code == 400
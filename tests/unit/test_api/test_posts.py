@@ -0,0 +1,152 @@
+import pytest
+
+from app.core.config import settings
+from app.db.tarantool.response_cache import post_key, response_cache
+
+
+def create_post(client, headers, content, visibility="public"):
+    response = client.post(
+        "/api/v1/posts/", json={"content": content, "visibility": visibility}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestPostMultiGet:
+    """Тесты для получения нескольких постов"""
+
+    def test_request_order(self, client, user_token_headers, other_token_headers):
+        """Тест порядка запроса и пропуска неизвестных id"""
+        first = create_post(client, user_token_headers, "First")
+        second = create_post(client, other_token_headers, "Second")
+
+        response = client.get(
+            "/api/v1/posts/",
+            params={"ids": [second["id"], 9999, first["id"], second["id"]]},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        posts = response.json()
+        assert [post["id"] for post in posts] == [second["id"], first["id"]]
+        assert posts[0]["content"] == "Second"
+
+    def test_cached_bodies(self, client, user_token_headers):
+        """Тест повторного запроса из кеша"""
+        post = create_post(client, user_token_headers, "Cached")
+        params = {"ids": [post["id"]]}
+
+        first = client.get("/api/v1/posts/", params=params, headers=user_token_headers)
+        second = client.get("/api/v1/posts/", params=params, headers=user_token_headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+
+    def test_cached_entries_serve_single_reads(self, client, user_token_headers, other_token_headers, other_user):
+        """Тест записи автора и видимости вместе с постом"""
+        post = create_post(client, other_token_headers, "Friends only", "friends")
+        client.get("/api/v1/posts/", params={"ids": [post["id"]]}, headers=other_token_headers)
+
+        entry = response_cache.get_many([post_key(post["id"])])[post_key(post["id"])]
+        assert entry.meta == {"user_id": other_user.id, "visibility": "friends"}
+        # Проверка доступа выполняется и для записи из мульти-запроса
+        assert client.get(f"/api/v1/posts/{post['id']}", headers=user_token_headers).status_code == 404
+        assert client.get(f"/api/v1/posts/{post['id']}", headers=other_token_headers).json() == post
+
+    def test_skips_hidden_posts(self, client, user_token_headers, other_token_headers,
+                                superuser_token_headers, test_user):
+        """Тест пропуска постов только для друзей и постов заблокировавших"""
+        friends_only = create_post(client, other_token_headers, "Friends only", "friends")
+        public = create_post(client, other_token_headers, "Public")
+        blocking = create_post(client, superuser_token_headers, "Blocking")
+        client.post("/api/v1/blocks/", json={"user_id": test_user.id}, headers=superuser_token_headers)
+
+        response = client.get(
+            "/api/v1/posts/",
+            params={"ids": [friends_only["id"], public["id"], blocking["id"]]},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert [post["id"] for post in response.json()] == [public["id"]]
+
+    def test_too_many_ids(self, client, user_token_headers):
+        """Тест ограничения числа id"""
+        response = client.get(
+            "/api/v1/posts/",
+            params={"ids": list(range(1, settings.MULTI_GET_MAX_IDS + 2))},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 400
+
+
+class TestBlockedAuthors:
+    """Тесты для постов пользователей, заблокированных в любую сторону"""
+
+    @pytest.mark.parametrize("blocker", ["viewer", "author"])
+    def test_posts_hidden(self, client, user_token_headers, other_token_headers, test_user, other_user, blocker):
+        """Тест чтения поста, списка постов автора и комментирования"""
+        post = create_post(client, other_token_headers, "Public")
+        if blocker == "viewer":
+            response = client.post("/api/v1/blocks/", json={"user_id": other_user.id}, headers=user_token_headers)
+        else:
+            response = client.post("/api/v1/blocks/", json={"user_id": test_user.id}, headers=other_token_headers)
+        assert response.status_code == 200
+
+        assert client.get(f"/api/v1/posts/{post['id']}", headers=user_token_headers).status_code == 404
+        assert client.get(f"/api/v1/posts/user/{other_user.id}", headers=user_token_headers).json() == []
+        response = client.post(
+            "/api/v1/comments/", json={"post_id": post["id"], "content": "Hi"}, headers=user_token_headers
+        )
+        assert response.status_code == 404
+        # Автор по-прежнему видит свой пост
+        assert client.get(f"/api/v1/posts/{post['id']}", headers=other_token_headers).status_code == 200
+
+
+def search_pages(client, headers, params):
+    """Проходит все страницы поиска по next_cursor"""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(
+            "/api/v1/posts/search", params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers
+        )
+        assert response.status_code == 200
+        pages.append([post["id"] for post in response.json()["items"]])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestPostSearch:
+    """Тесты для поиска постов"""
+
+    def test_keyset_pages(self, client, user_token_headers, other_token_headers):
+        """Тест продолжения поиска по курсору без пропусков и повторов"""
+        matching = [create_post(client, other_token_headers, f"Searchable post {n}")["id"] for n in range(5)]
+        create_post(client, other_token_headers, "Something else")
+        create_post(client, other_token_headers, "Searchable but friends only", "friends")
+
+        pages = search_pages(client, user_token_headers, {"q": "searchable post", "limit": 2})
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        # Без ранжирования в SQLite посты идут от новых к старым
+        assert [post_id for page in pages for post_id in page] == matching[::-1]
+
+    def test_exact_page(self, client, user_token_headers):
+        """Тест последней полной страницы без лишнего курсора"""
+        for n in range(2):
+            create_post(client, user_token_headers, f"Searchable {n}")
+
+        pages = search_pages(client, user_token_headers, {"q": "searchable", "limit": 2})
+
+        assert [len(page) for page in pages] == [2]
+
+    def test_invalid_cursor(self, client, user_token_headers):
+        """Тест некорректного курсора"""
+        response = client.get(
+            "/api/v1/posts/search", params={"q": "post", "cursor": "broken"}, headers=user_token_headers
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,90 @@
+import pytest
+
+from app.db.tarantool import presence
+
+
+class FakePresenceSpace:
+    """Пространство presence в памяти вместо Tarantool"""
+
+    def __init__(self):
+        self.tuples = {}
+
+    def call(self, function, args):
+        assert function == "box.space.presence:replace"
+        user_id, last_seen, expires_at = args[0]
+        self.tuples[user_id] = (user_id, last_seen, expires_at)
+        return [list(args[0])]
+
+    def eval(self, lua, args):
+        assert lua == presence.GET_MANY_LUA
+        user_ids, now = args
+        return [[
+            [user_id, self.tuples[user_id][1], self.tuples[user_id][2] > now]
+            for user_id in user_ids if user_id in self.tuples
+        ]]
+
+
+@pytest.fixture
+def presence_space(monkeypatch):
+    space = FakePresenceSpace()
+    monkeypatch.setattr(presence, "get_shared_tarantool_connection", lambda: space)
+    return space
+
+
+def block(client, headers, user_id):
+    response = client.post("/api/v1/blocks/", json={"user_id": user_id}, headers=headers)
+    assert response.status_code == 200
+
+
+class TestPresence:
+    """Тесты для онлайн-статуса пользователей"""
+
+    def test_heartbeat(self, client, presence_space, user_token_headers, other_token_headers,
+                       other_user, test_superuser):
+        """Тест статуса после heartbeat в порядке запроса"""
+        response = client.post("/api/v1/presence/heartbeat", headers=other_token_headers)
+        assert response.status_code == 204
+
+        response = client.get(
+            "/api/v1/presence/",
+            params={"user_ids": [test_superuser.id, other_user.id, test_superuser.id]},
+            headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        statuses = response.json()
+        assert [status["user_id"] for status in statuses] == [test_superuser.id, other_user.id]
+        assert statuses[0] == {"user_id": test_superuser.id, "online": False, "last_seen": None}
+        assert statuses[1]["online"] is True
+        assert statuses[1]["last_seen"] is not None
+
+    @pytest.mark.parametrize("blocker", ["viewer", "viewed"])
+    def test_blocked_users_offline(self, client, presence_space, user_token_headers, other_token_headers,
+                                   test_user, other_user, blocker):
+        """Тест блокировки в любую сторону"""
+        client.post("/api/v1/presence/heartbeat", headers=other_token_headers)
+        if blocker == "viewer":
+            block(client, user_token_headers, other_user.id)
+        else:
+            block(client, other_token_headers, test_user.id)
+
+        response = client.get(
+            "/api/v1/presence/", params={"user_ids": [other_user.id]}, headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [{"user_id": other_user.id, "online": False, "last_seen": None}]
+
+    def test_unavailable_tarantool(self, client, user_token_headers, other_user, monkeypatch):
+        """Тест ответа при недоступном Tarantool"""
+        def unavailable_tarantool():
+            raise ConnectionError("Tarantool is down")
+
+        monkeypatch.setattr(presence, "get_shared_tarantool_connection", unavailable_tarantool)
+
+        response = client.get(
+            "/api/v1/presence/", params={"user_ids": [other_user.id]}, headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [{"user_id": other_user.id, "online": False, "last_seen": None}]
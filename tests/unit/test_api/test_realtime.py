@@ -0,0 +1,131 @@
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocketDisconnect
+
+import app.api.endpoints.realtime as realtime
+from app.core.hub import ConnectionHub
+from app.db.tarantool import presence
+
+
+def make_event(event_id, user_ids, data=None):
+    return {"id": event_id, "type": "message.created", "users": user_ids, "data": data or {}}
+
+
+def parse_sse(body):
+    """Разбирает поток Server-Sent Events на список блоков"""
+    blocks = []
+    for chunk in body.strip().split("\n\n"):
+        fields = {}
+        for line in chunk.split("\n"):
+            name, _, value = line.partition(": ")
+            fields[name] = value
+        blocks.append(fields)
+    return blocks
+
+
+@pytest.fixture
+def event_hub(db_session, monkeypatch):
+    """Отдельный хаб событий; токен проверяется в той же тестовой базе"""
+    event_hub = ConnectionHub(queue_size=10, replay_size=10, replay_max_bytes=1024 * 1024)
+    monkeypatch.setattr(realtime, "hub", event_hub)
+    monkeypatch.setattr(realtime, "SessionLocal", lambda: Session(bind=db_session.connection()))
+    monkeypatch.setattr(presence, "touch", lambda user_id: None)
+    return event_hub
+
+
+@pytest.fixture
+def closing_subscriptions(event_hub, monkeypatch):
+    """Поток завершается после повтора, как у слишком медленного клиента"""
+    subscribe = event_hub.subscribe
+
+    def subscribe_and_close(user_id):
+        subscription = subscribe(user_id)
+        subscription.queue.put_nowait(None)
+        return subscription
+
+    monkeypatch.setattr(event_hub, "subscribe", subscribe_and_close)
+
+
+def access_token(headers):
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+class TestWebSocketEvents:
+    """Тесты для WebSocket-потока событий"""
+
+    @pytest.mark.parametrize("url", ["/api/v1/ws", "/api/v1/ws?token=invalid"])
+    def test_rejects_missing_or_invalid_token(self, client, event_hub, url):
+        """Тест закрытия соединения без действительного токена"""
+        with pytest.raises(WebSocketDisconnect) as error:
+            with client.websocket_connect(url):
+                pass
+
+        assert error.value.code == 1008
+
+    @pytest.mark.parametrize("transport", ["query", "header"])
+    def test_receives_events(self, client, event_hub, user_token_headers, test_user, transport):
+        """Тест доставки события по токену из query-параметра или заголовка"""
+        if transport == "query":
+            connection = client.websocket_connect(f"/api/v1/ws?token={access_token(user_token_headers)}")
+        else:
+            connection = client.websocket_connect("/api/v1/ws", headers=user_token_headers)
+
+        with connection as websocket:
+            deadline = time.monotonic() + 5
+            while not event_hub.is_online(test_user.id) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            event_hub.dispatch_threadsafe(make_event("a", [test_user.id], {"text": "hi"}))
+
+            frame = websocket.receive_json()
+
+        assert frame == {"id": "a", "type": "message.created", "data": {"text": "hi"}}
+
+
+class TestEventStream:
+    """Тесты для потока Server-Sent Events"""
+
+    def test_requires_token(self, client, event_hub):
+        """Тест запроса без токена"""
+        response = client.get("/api/v1/events")
+
+        assert response.status_code == 403
+
+    def test_rejects_query_token(self, client, event_hub, user_token_headers):
+        """Тест токена в query-параметре, который попал бы в журналы доступа"""
+        response = client.get(f"/api/v1/events?token={access_token(user_token_headers)}")
+
+        assert response.status_code == 403
+
+    def test_rejects_invalid_token(self, client, event_hub):
+        """Тест недействительного токена"""
+        response = client.get("/api/v1/events", headers={"Authorization": "Bearer invalid"})
+
+        assert response.status_code == 403
+
+    def test_replay_after_last_event_id(self, client, event_hub, closing_subscriptions,
+                                        user_token_headers, test_user, other_user):
+        """Тест повтора пропущенных событий по Last-Event-ID"""
+        event_hub.dispatch(make_event("a", [test_user.id]))
+        event_hub.dispatch(make_event("b", [test_user.id, other_user.id], {"text": "hi"}))
+        event_hub.dispatch(make_event("c", [other_user.id]))
+
+        response = client.get(
+            "/api/v1/events", headers={**user_token_headers, "Last-Event-ID": "a"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        blocks = parse_sse(response.text)
+        assert "retry" in blocks[0]
+        assert blocks[1:] == [{"id": "b", "event": "message.created", "data": '{"text":"hi"}'}]
+
+    def test_reset_for_unknown_event(self, client, event_hub, closing_subscriptions, user_token_headers):
+        """Тест сброса, если событие уже вытеснено из буфера"""
+        response = client.get(
+            "/api/v1/events", headers={**user_token_headers, "Last-Event-ID": "gone"}
+        )
+
+        assert response.status_code == 200
+        assert [block.get("event") for block in parse_sse(response.text)[1:]] == ["reset"]
@@ -270,4 +270,38 @@ class TestUserValidation:
         updated_user = response.json()
         assert updated_user["bio"] == "Just updated bio"
         # Другие поля должны остаться без изменений
-        assert updated_user["username"] == "testuser"
\ No newline at end of file
+        assert updated_user["username"] == "testuser"
+
+
+class TestUserMultiGet:
+    """Тесты для получения нескольких профилей"""
+    
+    def test_multi_get_users(self, client, user_token_headers, other_user, test_superuser):
+        """Тест получения нескольких профилей в порядке запроса"""
+        response = client.get(
+            "/api/v1/users/",
+            params={"ids": [other_user.id, 9999, test_superuser.id, other_user.id]},
+            headers=user_token_headers
+        )
+        
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json()] == [other_user.id, test_superuser.id]
+    
+    def test_multi_get_skips_inactive_and_blocked_users(self, client, user_token_headers, superuser_token_headers,
+                                                        db_session, test_user, other_user, test_superuser):
+        """Тест пропуска неактивных и заблокированных пользователей"""
+        other_user.is_active = False
+        db_session.commit()
+        response = client.post(
+            "/api/v1/blocks/", json={"user_id": test_user.id}, headers=superuser_token_headers
+        )
+        assert response.status_code == 200
+        
+        response = client.get(
+            "/api/v1/users/",
+            params={"ids": [other_user.id, test_superuser.id, test_user.id]},
+            headers=user_token_headers
+        )
+        
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json()] == [test_user.id]
@@ -0,0 +1,38 @@
+from app.core.bloom import WORD_BITS, bloom_parameters, contains, word_masks
+
+
+def build(items, parameters):
+    words = [0] * parameters.words
+    for index, mask in word_masks(items, parameters).items():
+        words[index] |= mask
+    return words
+
+
+class TestBloomFilter:
+    """Тесты для фильтра Блума просмотренных постов"""
+    
+    def test_parameters(self):
+        """Тест: размер и число хешей для заданной вероятности ошибки"""
+        parameters = bloom_parameters(2000, 0.01)
+        assert parameters.bits % WORD_BITS == 0
+        assert 19000 <= parameters.bits <= 19300
+        assert parameters.hashes == 7
+    
+    def test_no_false_negatives(self):
+        """Тест: все добавленные элементы найдены"""
+        parameters = bloom_parameters(1000, 0.01)
+        words = build(range(1, 1001), parameters)
+        assert all(contains(words, item, parameters) for item in range(1, 1001))
+    
+    def test_false_positive_rate(self):
+        """Тест: доля ложных срабатываний близка к заданной"""
+        parameters = bloom_parameters(1000, 0.01)
+        words = build(range(1, 1001), parameters)
+        false_positives = sum(contains(words, item, parameters) for item in range(10**6, 10**6 + 20000))
+        assert false_positives / 20000 < 0.02
+    
+    def test_size_mismatch(self):
+        """Тест: фильтр другого размера считается пустым"""
+        parameters = bloom_parameters(1000, 0.01)
+        words = build([1], bloom_parameters(2000, 0.01))
+        assert not contains(words, 1, parameters)
@@ -0,0 +1,89 @@
+import os
+import time
+
+import numpy as np
+
+from app.core.graph import CURRENT_LINK, SocialGraph, write_snapshot
+from app.core.suggestions import build_adjacency
+
+
+def make_adjacency(pairs, size=6):
+    sources = np.array([a for a, _ in pairs], dtype=np.int32)
+    targets = np.array([b for _, b in pairs], dtype=np.int32)
+    return build_adjacency(sources, targets, size)
+
+
+def changed(user_id, friend_id, accepted, changed_at=None):
+    return {"data": {
+        "user_id": user_id,
+        "friend_id": friend_id,
+        "accepted": accepted,
+        "changed_at": changed_at if changed_at is not None else time.time(),
+    }}
+
+
+class TestSocialGraph:
+    """Тесты для снимка графа дружб"""
+    
+    def test_snapshot_lookup(self, tmp_path):
+        """Тест: друзья читаются из снимка по возрастанию"""
+        write_snapshot(str(tmp_path), make_adjacency([(1, 3), (1, 2), (2, 4)]), time.time())
+        graph = SocialGraph(str(tmp_path))
+        
+        assert graph.reload()
+        assert graph.friend_ids(1).tolist() == [2, 3]
+        assert graph.friend_ids(4).tolist() == [2]
+        assert graph.friend_ids(100).tolist() == []
+        assert graph.are_friends(2, 4)
+        assert not graph.are_friends(1, 4)
+    
+    def test_delta_log(self, tmp_path):
+        """Тест: изменения после снимка накладываются поверх него"""
+        write_snapshot(str(tmp_path), make_adjacency([(1, 2), (1, 3)]), time.time())
+        graph = SocialGraph(str(tmp_path))
+        graph.reload()
+        
+        graph.apply_event(changed(1, 3, False))
+        graph.apply_event(changed(4, 1, True))
+        
+        assert graph.friend_ids(1).tolist() == [2, 4]
+        assert graph.friend_ids(3).tolist() == []
+        assert graph.are_friends(4, 1)
+        assert graph.delta_size == 2
+    
+    def test_delta_copy_on_write(self, tmp_path):
+        """Тест: событие не меняет журнал, который уже читает другой поток"""
+        write_snapshot(str(tmp_path), make_adjacency([(1, 2)]), time.time())
+        graph = SocialGraph(str(tmp_path))
+        graph.reload()
+        graph.apply_event(changed(1, 3, True))
+        changes = graph._delta[1]
+        
+        graph.apply_event(changed(1, 4, True))
+        
+        assert list(changes) == [3]
+        assert graph.friend_ids(1).tolist() == [2, 3, 4]
+    
+    def test_swap_prunes_delta(self, tmp_path):
+        """Тест: новый снимок подменяет старый, журнал очищается от вошедших в него изменений"""
+        write_snapshot(str(tmp_path), make_adjacency([(1, 2)]), time.time() - 1000)
+        graph = SocialGraph(str(tmp_path))
+        graph.reload()
+        graph.apply_event(changed(1, 3, True, changed_at=time.time() - 500))
+        graph.apply_event(changed(1, 4, True))
+        
+        write_snapshot(str(tmp_path), make_adjacency([(1, 2), (1, 3)]), time.time() - 1)
+        
+        assert graph.reload()
+        assert not graph.reload()
+        assert graph.delta_size == 1
+        assert graph.friend_ids(1).tolist() == [2, 3, 4]
+        assert len([name for name in os.listdir(tmp_path) if name.startswith("snapshot-")]) == 2
+        assert os.path.islink(tmp_path / CURRENT_LINK)
+    
+    def test_no_snapshot(self, tmp_path):
+        """Тест: без снимка граф не загружен"""
+        graph = SocialGraph(str(tmp_path))
+        
+        assert not graph.reload()
+        assert graph.friend_ids(1) is None
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core.hub import EVENT_OVERHEAD_BYTES, ConnectionHub
+
+# Размер события с пустыми данными в буфере повтора
+EMPTY_EVENT_BYTES = EVENT_OVERHEAD_BYTES + len("{}")
+
+
+def make_event(event_id, user_ids, event_type="message.created", data=None):
+    return {"id": event_id, "type": event_type, "users": user_ids, "data": data or {}}
+
+
+@pytest.fixture
+def hub():
+    loop = asyncio.new_event_loop()
+    hub = ConnectionHub(queue_size=2, replay_size=3, replay_max_bytes=3 * EMPTY_EVENT_BYTES)
+    hub.attach(loop)
+    yield hub
+    loop.close()
+
+
+class TestConnectionHub:
+    """Тесты для хаба подключенных клиентов"""
+    
+    def test_dispatch_to_recipients(self, hub):
+        """Тест доставки события только получателям"""
+        recipient = hub.subscribe(1)
+        other = hub.subscribe(2)
+        
+        hub.dispatch(make_event("a", [1]))
+        
+        assert recipient.queue.get_nowait()["id"] == "a"
+        assert other.queue.empty()
+        assert hub.stats()["events_delivered"] == 1
+    
+    def test_unsubscribe(self, hub):
+        """Тест отписки клиента"""
+        subscription = hub.subscribe(1)
+        hub.unsubscribe(subscription)
+        
+        hub.dispatch(make_event("a", [1]))
+        
+        assert subscription.queue.empty()
+        assert not hub.is_online(1)
+    
+    def test_slow_consumer_overflow(self, hub):
+        """Тест отключения медленного клиента"""
+        subscription = hub.subscribe(1)
+        
+        for event_id in ("a", "b", "c", "d"):
+            hub.dispatch(make_event(event_id, [1]))
+        
+        assert subscription.overflowed
+        assert subscription.queue.get_nowait() is None
+        assert subscription.queue.empty()
+        assert hub.stats()["overflows"] == 1
+    
+    def test_handlers(self, hub):
+        """Тест внутренних обработчиков событий"""
+        seen = []
+        hub.add_handler("user.updated", seen.append)
+        
+        hub.dispatch(make_event("a", None, "user.updated"))
+        hub.dispatch(make_event("b", [1]))
+        
+        assert [event["id"] for event in seen] == ["a"]
+    
+    def test_replay(self, hub):
+        """Тест повтора пропущенных событий по Last-Event-ID"""
+        for event_id in ("a", "b", "c", "d"):
+            hub.dispatch(make_event(event_id, [1]))
+        
+        assert [event["id"] for event in hub.replay(1, "b")] == ["c", "d"]
+        assert hub.replay(1, "d") == []
+        # "a" was pushed out of the buffer
+        assert hub.replay(1, "a") is None
+    
+    def test_replay_evicts_least_recent_users(self, hub):
+        """Тест вытеснения событий наименее активных пользователей"""
+        hub.dispatch(make_event("a", [1]))
+        hub.dispatch(make_event("b", [2]))
+        hub.dispatch(make_event("c", [1]))
+        hub.dispatch(make_event("d", [3]))
+        
+        assert hub.replay(2, "b") is None
+        assert [event["id"] for event in hub.replay(1, "a")] == ["c"]
+        assert hub.stats()["replay_bytes"] == 3 * EMPTY_EVENT_BYTES
+    
+    def test_replay_bounded_by_size(self, hub):
+        """Тест ограничения буфера по объему данных событий"""
+        hub.dispatch(make_event("a", [1]))
+        hub.dispatch(make_event("b", [2], data={"text": "x" * 3 * EMPTY_EVENT_BYTES}))
+        
+        # The large event pushes out the older one and then does not fit itself
+        assert hub.replay(1, "a") is None
+        assert hub.replay(2, "b") is None
+        assert hub.stats()["replay_users"] == 0
+        assert hub.stats()["replay_bytes"] == 0
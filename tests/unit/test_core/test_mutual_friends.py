@@ -0,0 +1,19 @@
+from app.core.mutual_friends import intersect_sorted
+
+
+class TestIntersectSorted:
+    """Тесты для пересечения отсортированных списков друзей"""
+    
+    def test_common_ids(self):
+        """Тест: общие элементы возвращаются по возрастанию"""
+        assert intersect_sorted([1, 3, 5, 7, 9], [2, 3, 4, 7, 10]) == [3, 7]
+    
+    def test_no_common_ids(self):
+        """Тест: без общих элементов результат пустой"""
+        assert intersect_sorted([1, 2], [3, 4]) == []
+        assert intersect_sorted([], [1, 2]) == []
+    
+    def test_different_lengths(self):
+        """Тест: списки разной длины"""
+        assert intersect_sorted([5], list(range(100))) == [5]
+        assert intersect_sorted(list(range(0, 100, 2)), list(range(0, 100, 3))) == list(range(0, 100, 6))
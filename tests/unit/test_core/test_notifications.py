@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.notifications import NotificationBuffer
+from app.models.notification import Notification, NotificationKind
+
+
+def unavailable_database():
+    raise ConnectionError("Database is down")
+
+
+@pytest.fixture
+def buffer(db_session):
+    return NotificationBuffer(
+        window_seconds=3600,
+        sample_size=2,
+        max_entries=100,
+        session_factory=lambda: db_session,
+    )
+
+
+class TestNotificationBuffer:
+    """Тесты для буфера агрегированных уведомлений"""
+    
+    def test_coalesce_within_window(self, buffer, db_session):
+        """Тест объединения событий в одно уведомление"""
+        for actor_id in (2, 3, 4):
+            buffer.add(1, NotificationKind.POST_LIKE, 10, actor_id, datetime(2024, 1, 1, 12, actor_id))
+        
+        assert buffer.flush() == 1
+        
+        notification = db_session.query(Notification).one()
+        assert notification.actor_count == 3
+        assert notification.sample_actor_ids == [4, 3]
+        assert notification.created_at == datetime(2024, 1, 1, 12, 2)
+        assert notification.updated_at == datetime(2024, 1, 1, 12, 4)
+    
+    def test_separate_windows_and_targets(self, buffer, db_session):
+        """Тест разных окон и целей"""
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2, datetime(2024, 1, 1, 12, 0))
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2, datetime(2024, 1, 1, 13, 0))
+        buffer.add(1, NotificationKind.POST_LIKE, 11, 2, datetime(2024, 1, 1, 12, 0))
+        buffer.add(1, NotificationKind.POST_COMMENT, 10, 2, datetime(2024, 1, 1, 12, 0))
+        
+        assert buffer.flush() == 4
+        assert db_session.query(Notification).count() == 4
+    
+    def test_merge_with_stored_notification(self, buffer, db_session):
+        """Тест дополнения уже записанного уведомления"""
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2, datetime(2024, 1, 1, 12, 0))
+        buffer.flush()
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 3, datetime(2024, 1, 1, 12, 5))
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2, datetime(2024, 1, 1, 12, 6))
+        buffer.flush()
+        
+        notification = db_session.query(Notification).one()
+        assert notification.actor_count == 2
+        assert notification.sample_actor_ids == [2, 3]
+        assert notification.updated_at == datetime(2024, 1, 1, 12, 6)
+    
+    def test_count_distinct_actors(self, buffer, db_session):
+        """Тест подсчета повторных событий одного участника"""
+        for minute in range(5):
+            buffer.add(1, NotificationKind.POST_LIKE, 10, 2, datetime(2024, 1, 1, 12, minute))
+        
+        assert buffer.flush() == 1
+        
+        notification = db_session.query(Notification).one()
+        assert notification.actor_count == 1
+        assert notification.sample_actor_ids == [2]
+    
+    def test_count_repeat_actor_outside_sample(self, buffer, db_session):
+        """Тест повторного события участника, вытесненного из выборки"""
+        for minute, actor_id in enumerate((2, 3, 4, 2)):
+            buffer.add(1, NotificationKind.POST_LIKE, 10, actor_id, datetime(2024, 1, 1, 12, minute))
+        buffer.flush()
+        # Участник 2 уже не входит в выборку из двух последних
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 3, datetime(2024, 1, 1, 12, 10))
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 4, datetime(2024, 1, 1, 12, 11))
+        buffer.flush()
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2, datetime(2024, 1, 1, 12, 12))
+        buffer.flush()
+        
+        notification = db_session.query(Notification).one()
+        assert notification.actor_count == 3
+        assert notification.sample_actor_ids == [2, 4]
+    
+    def test_skip_own_actions(self, buffer):
+        """Тест пропуска собственных действий"""
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 1)
+        
+        assert buffer.flush() == 0
+    
+    def test_requeue_on_failure(self):
+        """Тест сохранения событий в буфере при ошибке записи"""
+        buffer = NotificationBuffer(
+            window_seconds=3600,
+            sample_size=2,
+            max_entries=100,
+            session_factory=unavailable_database,
+        )
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2)
+        buffer.flush()
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 3)
+        buffer.add(1, NotificationKind.POST_LIKE, 10, 2)
+        
+        assert buffer.flush() == 0
+        pending = list(buffer._pending.values())
+        assert len(pending) == 1
+        assert pending[0].actor_count == 2
+        assert pending[0].actor_ids == [2, 3]
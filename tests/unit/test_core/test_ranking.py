@@ -0,0 +1,58 @@
+import numpy as np
+from scipy import sparse
+
+from app.core.ranking import affinity_rows, rank, score_candidates
+
+
+def scores(author_ids, ages, likes=None, comments=None, seen=None, affinity=None):
+    count = len(author_ids)
+    affinity = affinity or {}
+    return score_candidates(
+        author_ids=np.array(author_ids),
+        ages=np.array(ages, dtype=np.float64),
+        likes=np.array(likes or [0] * count, dtype=np.float64),
+        comments=np.array(comments or [0] * count, dtype=np.float64),
+        seen=np.array(seen or [False] * count),
+        affinity_author_ids=np.array(sorted(affinity), dtype=np.int64),
+        affinity=np.array([affinity[author_id] for author_id in sorted(affinity)], dtype=np.float64),
+    )
+
+
+class TestScoreCandidates:
+    """Тесты для оценки кандидатов ленты"""
+    
+    def test_affinity(self):
+        """Тест: пост близкого друга выше более свежего поста другого автора"""
+        result = scores([1, 2], [3600, 1800], affinity={2: 0.1, 1: 3.0})
+        assert list(rank(result)) == [0, 1]
+    
+    def test_recency(self):
+        """Тест: при прочих равных свежий пост выше"""
+        result = scores([1, 1, 1], [7200, 60, 86400])
+        assert list(rank(result)) == [1, 0, 2]
+    
+    def test_engagement_and_seen(self):
+        """Тест: вовлечённость поднимает пост, просмотр опускает"""
+        result = scores([1, 1, 1], [60, 60, 60], likes=[0, 50, 50], comments=[0, 10, 10], seen=[False, False, True])
+        assert list(rank(result)) == [1, 0, 2]
+    
+    def test_without_affinity(self):
+        """Тест: без сохранённой близости ранжирование по свежести"""
+        result = scores([5, 6], [100, 10])
+        assert list(rank(result)) == [1, 0]
+
+
+class TestAffinityRows:
+    """Тесты для расчёта близости к авторам"""
+    
+    def test_top_authors(self):
+        """Тест: лучшие авторы по возрастанию id, близость log1p"""
+        interactions = sparse.csr_matrix(np.array([
+            [0, 5, 1, 9],
+            [0, 0, 0, 0],
+            [2, 0, 0, 0],
+            [0, 0, 0, 0],
+        ], dtype=np.float32))
+        rows = list(affinity_rows(interactions, 2))
+        assert [(viewer_id, author_ids) for viewer_id, author_ids, _ in rows] == [(0, [1, 3]), (2, [0])]
+        assert np.allclose(rows[0][2], np.log1p([5, 9]))
@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.core.suggestions import build_adjacency, compute_all, top_suggestions
+
+
+def make_graph():
+    # 1 - 2, 1 - 3, 2 - 4, 3 - 4, 3 - 5, 4 - 6; 2 - 1 is a mirrored row
+    sources = np.array([1, 1, 2, 3, 3, 4, 2], dtype=np.int32)
+    targets = np.array([2, 3, 4, 4, 5, 6, 1], dtype=np.int32)
+    return build_adjacency(sources, targets, 7)
+
+
+class TestFriendSuggestions:
+    """Тесты для рекомендаций друзей по общим друзьям"""
+    
+    def test_adjacency_is_symmetric(self):
+        """Тест: матрица смежности симметрична, зеркальные строки не удваиваются"""
+        adjacency = make_graph()
+        
+        assert (adjacency != adjacency.T).nnz == 0
+        assert adjacency[1, 2] == 1
+        assert adjacency.sum() == 12
+    
+    def test_mutual_friend_counts(self):
+        """Тест: кандидаты упорядочены по числу общих друзей, друзья исключены"""
+        adjacency = make_graph()
+        
+        result = dict(top_suggestions(adjacency, np.array([1, 4], dtype=np.int32), 10))
+        
+        assert result[1] == [(4, 2), (5, 1)]
+        assert result[4] == [(1, 2), (5, 1)]
+    
+    def test_top_k(self):
+        """Тест: сохраняются только лучшие кандидаты"""
+        adjacency = make_graph()
+        
+        result = dict(top_suggestions(adjacency, np.array([1], dtype=np.int32), 1))
+        
+        assert result[1] == [(4, 2)]
+    
+    def test_compute_all_in_batches(self):
+        """Тест: расчёт для всех пользователей с друзьями пачками"""
+        adjacency = make_graph()
+        batches = []
+        
+        computed = compute_all(adjacency, 10, 2, batches.append)
+        
+        assert computed == 6
+        assert [len(batch) for batch in batches] == [2, 2, 2]
+        result = dict(row for batch in batches for row in batch)
+        assert result[6] == [(2, 1), (3, 1)]
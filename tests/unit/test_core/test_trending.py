@@ -0,0 +1,48 @@
+from app.core.trending import TrendingTags
+
+
+def counter():
+    return TrendingTags("test", k=3, width=256, depth=4, bucket_seconds=60, buckets=5)
+
+
+class TestTrendingTags:
+    """Тесты для подсчёта популярных хештегов"""
+    
+    def test_top_tags(self):
+        """Тест: самые частые хештеги по убыванию"""
+        trending = counter()
+        trending.add(["a"] * 5 + ["b"] * 3 + ["c"] * 7 + ["d"], now=1000)
+        assert trending.top(now=1000) == [("c", 7), ("a", 5), ("b", 3)]
+        assert trending.top(2, now=1000) == [("c", 7), ("a", 5)]
+    
+    def test_candidates_bounded(self):
+        """Тест: редкие хештеги вытесняются, счётчики частых сохраняются"""
+        trending = counter()
+        trending.add(["hot"] * 10, now=1000)
+        trending.add([f"tag{i}" for i in range(100)], now=1000)
+        assert len(trending._candidates) <= trending.capacity
+        assert trending.top(1, now=1000) == [("hot", 10)]
+    
+    def test_window_expiry(self):
+        """Тест: старые корзины выпадают из окна"""
+        trending = counter()
+        trending.add(["old"] * 5, now=1000)
+        trending.add(["new"] * 2, now=1000 + 4 * 60)
+        assert trending.top(now=1000 + 4 * 60) == [("old", 5), ("new", 2)]
+        assert trending.top(now=1000 + 5 * 60) == [("new", 2)]
+        assert trending.top(now=1000 + 20 * 60) == []
+    
+    def test_checkpoint(self):
+        """Тест: восстановление из контрольной точки"""
+        trending = counter()
+        trending.add(["a"] * 4 + ["b"] * 2, now=1000)
+        restored = counter()
+        assert restored.restore(trending.state(), now=1060)
+        assert restored.top(now=1060) == [("a", 4), ("b", 2)]
+        restored.add(["b"] * 3, now=1060)
+        assert restored.top(now=1060) == [("b", 5), ("a", 4)]
+    
+    def test_checkpoint_shape_mismatch(self):
+        """Тест: контрольная точка другого размера не загружается"""
+        state = TrendingTags("test", k=3, width=128, depth=4, bucket_seconds=60, buckets=5).state()
+        assert not counter().restore(state)
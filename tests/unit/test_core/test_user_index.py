@@ -0,0 +1,116 @@
+import random
+
+from app.core.user_index import SortedKeys, UserPrefixIndex, indexed_user, name_keys
+
+
+def make_event(user_id, username, full_name=None, is_active=True):
+    return {
+        "type": "user.changed",
+        "data": {"id": user_id, "username": username, "full_name": full_name, "is_active": is_active},
+    }
+
+
+def make_index():
+    index = UserPrefixIndex()
+    index.replace({
+        1: indexed_user("alice", "Alice Smith", None),
+        2: indexed_user("bob", "Bob Marley", None),
+        3: indexed_user("bobby", None, None),
+        4: indexed_user("boris", "Борис Ёлкин", None),
+    })
+    return index
+
+
+class TestUserPrefixIndex:
+    """Тесты для префиксного индекса пользователей"""
+    
+    def test_name_keys(self):
+        """Тест ключей: имя пользователя, полное имя и его слова"""
+        assert name_keys("Bob", "Bob  Marley") == ("bob", "bob marley", "marley")
+        assert name_keys("boris", "Борис Ёлкин") == ("boris", "борис елкин", "елкин")
+    
+    def test_search_by_prefix(self):
+        """Тест поиска по началу имени в алфавитном порядке"""
+        index = make_index()
+        
+        assert index.search("bo", 10) == [2, 3, 4]
+        assert index.search("BO", 2) == [2, 3]
+        assert index.search("mar", 10) == [2]
+        assert index.search("ёлк", 10) == [4]
+        assert index.search("zzz", 10) == []
+    
+    def test_friends_first(self):
+        """Тест: друзья выше остальных, текущий пользователь исключён"""
+        index = make_index()
+        
+        assert index.search("bo", 10, friend_ids=[4]) == [4, 2, 3]
+        assert index.search("bo", 1, friend_ids=[4]) == [4]
+        assert index.search("bo", 10, exclude_id=2) == [3, 4]
+    
+    def test_apply_events(self):
+        """Тест обновления индекса событиями изменения пользователей"""
+        index = make_index()
+        
+        index.apply_event(make_event(5, "bond", "James Bond"))
+        index.apply_event(make_event(2, "robert", "Bob Marley"))
+        index.apply_event(make_event(3, "bobby", is_active=False))
+        
+        assert index.search("bo", 10) == [2, 5, 4]
+        assert index.search("rob", 10) == [2]
+        assert index.get(3) is None
+        assert len(index) == 4
+    
+    def test_events_during_load_are_kept(self):
+        """Тест: изменения во время загрузки применяются поверх снимка"""
+        index = UserPrefixIndex()
+        index._loading = True
+        index.apply_event(make_event(7, "newcomer"))
+        
+        index.replace({1: indexed_user("alice", None, None)})
+        
+        assert index.loaded
+        assert index.search("new", 10) == [7]
+
+
+class TestSortedKeys:
+    """Тесты для отсортированных ключей, разбитых на блоки"""
+    
+    def test_matches_sorted_list(self):
+        """Тест: вставки и удаления дают тот же порядок, что и полная сортировка"""
+        rng = random.Random(1)
+        entries = sorted((rng.choice("abcdef") * rng.randint(1, 3), user_id) for user_id in range(50))
+        keys = SortedKeys(entries, chunk_size=4)
+        expected = list(entries)
+        
+        for user_id in range(50, 300):
+            if expected and rng.random() < 0.4:
+                key, removed_id = expected.pop(rng.randrange(len(expected)))
+                assert keys.remove(key, removed_id)
+            else:
+                key = rng.choice("abcdef") * rng.randint(1, 3)
+                keys.add(key, user_id)
+                expected.append((key, user_id))
+            
+            assert len(keys) == len(expected)
+            assert [key for key, _ in keys.iter_from("")] == sorted(key for key, _ in expected)
+            assert sorted(keys.iter_from("")) == sorted(expected)
+        
+        assert [key for key, _ in keys.iter_from("c")] == sorted(key for key, _ in expected if key >= "c")
+    
+    def test_remove_equal_keys_across_chunks(self):
+        """Тест удаления одного из одинаковых ключей в соседнем блоке"""
+        keys = SortedKeys([("bob", user_id) for user_id in range(10)], chunk_size=3)
+        
+        assert keys.remove("bob", 8)
+        assert not keys.remove("bob", 8)
+        assert not keys.remove("bobby", 1)
+        assert sorted(user_id for _, user_id in keys.iter_from("bob")) == [0, 1, 2, 3, 4, 5, 6, 7, 9]
+    
+    def test_empty(self):
+        """Тест пустого индекса"""
+        keys = SortedKeys()
+        
+        assert list(keys.iter_from("a")) == []
+        assert not keys.remove("a", 1)
+        keys.add("a", 1)
+        assert list(keys.iter_from("")) == [("a", 1)]
@@ -0,0 +1,36 @@
+from app.core.visibility import contains, visible_feed_entries
+from app.db.tarantool.news_feed import FeedEntry
+
+
+def entry(post_id, author_id, visibility="public"):
+    return FeedEntry(post_id=post_id, created_at=1000 - post_id, author_id=author_id, visibility=visibility)
+
+
+class TestContains:
+    """Тесты для поиска в отсортированном списке id"""
+    
+    def test_contains(self):
+        """Тест: присутствующие и отсутствующие id"""
+        assert contains([2, 5, 9], 5)
+        assert not contains([2, 5, 9], 6)
+        assert not contains([2, 5, 9], 10)
+        assert not contains([], 1)
+
+
+class TestVisibleFeedEntries:
+    """Тесты для фильтрации ленты по видимости"""
+    
+    def test_public_posts_visible(self):
+        """Тест: публичные посты видны всем, кроме скрытых пользователей"""
+        entries = [entry(1, 10), entry(2, 11), entry(3, 12)]
+        assert visible_feed_entries(entries, 1, frozenset({11}), []) == [entry(1, 10), entry(3, 12)]
+    
+    def test_friends_only_posts(self):
+        """Тест: посты для друзей видны только друзьям автора"""
+        entries = [entry(1, 10, "friends"), entry(2, 11, "friends")]
+        assert visible_feed_entries(entries, 1, frozenset(), [11, 20]) == [entry(2, 11, "friends")]
+    
+    def test_own_posts_always_visible(self):
+        """Тест: свои посты видны всегда"""
+        entries = [entry(1, 1, "friends")]
+        assert visible_feed_entries(entries, 1, frozenset({1}), []) == entries
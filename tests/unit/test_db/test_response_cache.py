@@ -0,0 +1,135 @@
+import pytest
+
+from app.db.tarantool.response_cache import (
+    GET_MANY_LUA,
+    INVALIDATE_LUA,
+    SET_MANY_LUA,
+    ResponseCache,
+    make_etag,
+    post_comments_keys,
+    post_key,
+)
+
+
+def unavailable_tarantool():
+    raise ConnectionError("Tarantool is down")
+
+
+class FakeTarantool:
+    """Скрипты кеша ответов, выполняемые в памяти"""
+    
+    def __init__(self):
+        self.rows = {}
+        self.generations = {}
+    
+    def eval(self, script, args):
+        if script == GET_MANY_LUA:
+            keys, now = args
+            found = [self.rows[key][:4] for key in keys if key in self.rows]
+            missing = [[key, self.generations.get(key, 0)] for key in keys if key not in self.rows]
+            return [found, missing]
+        if script == SET_MANY_LUA:
+            rows, expires_at = args
+            stored = []
+            for key, etag, body, meta, generation in rows:
+                if self.generations.get(key, 0) == generation:
+                    self.rows[key] = [key, etag, body, meta, expires_at]
+                    stored.append(key)
+            return [stored]
+        if script == INVALIDATE_LUA:
+            keys, expires_at = args
+            for key in keys:
+                self.rows.pop(key, None)
+                self.generations[key] = self.generations.get(key, 0) + 1
+            return []
+        raise AssertionError("unexpected script")
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(
+        ttl=60,
+        l1_ttl=60,
+        l1_max_entries=2,
+        connection_factory=unavailable_tarantool,
+    )
+
+
+class TestResponseCache:
+    """Тесты для кеша отрендеренных ответов"""
+    
+    def test_set_and_get(self, cache):
+        """Тест сохранения и чтения ответа"""
+        entry = cache.set(post_key(1), b'{"id":1}', {"user_id": 5})
+        
+        cached = cache.get(post_key(1))
+        
+        assert cached == entry
+        assert cached.body == b'{"id":1}'
+        assert cached.etag == make_etag(b'{"id":1}')
+        assert cached.meta == {"user_id": 5}
+    
+    def test_miss(self, cache):
+        """Тест промаха кеша"""
+        assert cache.get(post_key(1)) is None
+        assert cache.stats()["misses"] == 1
+    
+    def test_invalidate_post(self, cache):
+        """Тест инвалидации поста и страниц комментариев"""
+        cache.set(post_key(1), b"post")
+        for key in post_comments_keys(1):
+            cache.set(key, b"comments")
+        
+        cache.invalidate_post(1)
+        
+        assert cache.get_many([post_key(1), *post_comments_keys(1)]) == {}
+    
+    def test_l1_eviction(self, cache):
+        """Тест вытеснения самых старых записей из L1"""
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    
+    def test_stats(self, cache):
+        """Тест метрик попаданий и сэкономленных байт"""
+        cache.set("a", b"12345")
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        
+        stats = cache.stats()
+        assert stats["l1_hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["bytes_saved"] == 10
+        assert stats["hit_ratio"] == pytest.approx(2 / 3)
+    
+    def test_disabled(self):
+        """Тест выключенного кеша"""
+        cache = ResponseCache(
+            ttl=60, l1_ttl=60, l1_max_entries=10,
+            connection_factory=unavailable_tarantool, enabled=False,
+        )
+        entry = cache.set("a", b"body")
+        
+        assert entry.etag == make_etag(b"body")
+        assert cache.get("a") is None
+
+    def test_set_after_invalidate(self):
+        """Тест: тело, загруженное до инвалидации, не попадает в кеш"""
+        tarantool = FakeTarantool()
+        cache = ResponseCache(ttl=60, l1_ttl=60, l1_max_entries=10, connection_factory=lambda: tarantool)
+        
+        cached, generation = cache.get_with_generation(post_key(1))
+        assert cached is None
+        cache.invalidate_post(1)
+        cache.set(post_key(1), b"old", generation=generation)
+        
+        assert cache.get(post_key(1)) is None
+        
+        cached, generation = cache.get_with_generation(post_key(1))
+        cache.set(post_key(1), b"new", generation=generation)
+        cache.clear_l1()
+        assert cache.get(post_key(1)).body == b"new"
@@ -0,0 +1,29 @@
+from app.models.comment import PATH_END, comment_path, path_ids
+
+
+class TestCommentPaths:
+    """Тесты для материализованных путей комментариев"""
+    
+    def test_path(self):
+        """Тест: путь ответа продолжает путь родителя"""
+        root = comment_path(None, 12)
+        reply = comment_path(root, 345)
+        assert root == "0000000012"
+        assert reply.startswith(root)
+        assert path_ids(reply) == [12, 345]
+    
+    def test_thread_order(self):
+        """Тест: сортировка путей даёт порядок обхода ветки"""
+        root = comment_path(None, 9)
+        first = comment_path(root, 10)
+        nested = comment_path(first, 100)
+        second = comment_path(root, 11)
+        next_root = comment_path(None, 10)
+        assert sorted([next_root, second, nested, first, root]) == [root, first, nested, second, next_root]
+    
+    def test_subtree_range(self):
+        """Тест: ответы лежат в диапазоне [path, path + PATH_END), соседи - нет"""
+        root = comment_path(None, 9)
+        nested = comment_path(comment_path(root, 10), 100)
+        assert root <= nested < root + PATH_END
+        assert not comment_path(None, 10) < root + PATH_END
@@ -0,0 +1,18 @@
+from app.models.friendship import Friendship, FriendshipStatus
+
+
+class TestFriendshipModel:
+    """Тесты для модели Friendship"""
+    
+    def test_pair_is_ordered(self):
+        """Тест: пара пользователей хранится по возрастанию id"""
+        assert Friendship.pair(5, 2) == (2, 5)
+        assert Friendship.pair(2, 5) == (2, 5)
+    
+    def test_recipient_and_other(self):
+        """Тест: получатель заявки и второй пользователь пары"""
+        friendship = Friendship(user_low_id=2, user_high_id=5, requester_id=5, status=FriendshipStatus.PENDING)
+        
+        assert friendship.recipient_id == 2
+        assert friendship.other_id(2) == 5
+        assert friendship.other_id(5) == 2
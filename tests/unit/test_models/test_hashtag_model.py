@@ -0,0 +1,25 @@
+from app.models.hashtag import MAX_HASHTAGS_PER_POST, extract_hashtags, normalize_hashtag
+
+
+class TestHashtags:
+    """Тесты для извлечения хештегов"""
+    
+    def test_extract(self):
+        """Тест: хештеги в нижнем регистре без повторов"""
+        assert extract_hashtags("#Python и #python, #FastAPI! #привет") == ["python", "fastapi", "привет"]
+    
+    def test_not_hashtags(self):
+        """Тест: решётка внутри слова и пустые теги не считаются"""
+        assert extract_hashtags("a#b ## # c#") == []
+        assert extract_hashtags(None) == []
+    
+    def test_limit(self):
+        """Тест: не больше MAX_HASHTAGS_PER_POST хештегов"""
+        content = " ".join(f"#t{i}" for i in range(MAX_HASHTAGS_PER_POST + 10))
+        assert len(extract_hashtags(content)) == MAX_HASHTAGS_PER_POST
+    
+    def test_normalize(self):
+        """Тест: нормализация хештега из URL"""
+        assert normalize_hashtag("#News") == "news"
+        assert normalize_hashtag("news-today") is None
+        assert normalize_hashtag("") is None
@@ -0,0 +1,19 @@
+from app.models.mention import MAX_MENTIONS_PER_CONTENT, extract_mentions
+
+
+class TestMentions:
+    """Тесты для извлечения упоминаний"""
+    
+    def test_extract(self):
+        """Тест: имена пользователей без повторов в порядке появления"""
+        assert extract_mentions("@bob, @alice и снова @bob!") == ["bob", "alice"]
+    
+    def test_not_mentions(self):
+        """Тест: адреса почты, двойные @ и имена с подчёркиванием не считаются"""
+        assert extract_mentions("mail@example.com @@bob @ bob @some_user") == []
+        assert extract_mentions(None) == []
+    
+    def test_limit(self):
+        """Тест: не больше MAX_MENTIONS_PER_CONTENT упоминаний"""
+        content = " ".join(f"@user{i}" for i in range(MAX_MENTIONS_PER_CONTENT + 10))
+        assert len(extract_mentions(content)) == MAX_MENTIONS_PER_CONTENT